@@ -11,10 +11,12 @@ os.environ['VERCEL'] = '1'
 # 添加父目录到 Python 路径
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# 导入 Flask 应用
-from app import app as flask_app
+# 创建 Flask 应用（导入阶段不连接数据库，首个请求时才做一次结构检查，见 app.ensure_database）
+from app import ServerlessConfig, create_app
 from flask import Flask
 
+flask_app = create_app(ServerlessConfig)
+
 # 验证 app 是 Flask 实例
 if not isinstance(flask_app, Flask):
     raise TypeError(f"Expected Flask instance, got {type(flask_app)}")
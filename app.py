@@ -1,1828 +1,445 @@
-# 工作待办清单桌面应用_精美版.py - 增强版（支持多人协作和完成度管理）
+# app.py - 工作待办清单 Web 应用（支持多人协作和完成度管理）
+#
+# 桌面版（launch.py / 工作待办清单桌面应用_精美版.py）和 Vercel 部署（api/index.py、todo_app.py）
+# 共用同一个应用工厂 create_app(config)，环境差异（文件位置、GitHub 同步、自动打开浏览器）
+# 由配置决定：
+#   create_app(DesktopConfig)      本地文件 + 自动打开浏览器
+#   create_app(ServerlessConfig)   从 GitHub 同步任务到数据库
+#   create_app({'TODO_FILE': ...}) 在默认配置上覆盖部分配置项
 import os
-import re
 import json
-import hashlib
+import logging
+import threading
+from functools import partial
+import time
 from datetime import datetime
-from flask import Flask, render_template_string, request, jsonify
+from flask import Blueprint, Flask, Response, current_app, render_template, request, jsonify
 from pathlib import Path
 
-# #region agent log
-try:
-    import requests
-    import base64
-    # Log successful import
-    log_data = {
-        "sessionId": "debug-session",
-        "runId": "run1",
-        "hypothesisId": "A",
-        "location": "app.py:9",
-        "message": "requests import successful",
-        "data": {"module": "requests", "status": "ok"},
-        "timestamp": int(__import__('time').time() * 1000)
-    }
-    with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-        f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-except ImportError as e:
-    # Log import failure
-    log_data = {
-        "sessionId": "debug-session",
-        "runId": "run1",
-        "hypothesisId": "A",
-        "location": "app.py:9",
-        "message": "requests import failed",
-        "data": {"error": str(e), "status": "failed"},
-        "timestamp": int(__import__('time').time() * 1000)
-    }
-    with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-        f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-    raise
-# #endregion
+import database
+from database import (
+    init_database, get_all_tasks, create_task, update_task_progress,
+    update_task, get_task_updates, delete_task, get_users, get_tasks_page,
+    search_tasks, get_task_stats, apply_task_changes,
+    sync_markdown_tasks, get_task, get_change_version, get_changes, schedule_snapshot, tasks_to_dicts, TOGGLE_NOTE
+)
+from app_logging import get_logger
+from github_fetcher import GitHubFetcher
+from status_store import StatusStore
+from static_assets import init_static_assets
+from markdown_parser import (
+    parse_markdown_tasks, read_markdown_tasks_cached, parse_recommendations, parse_cache
+)
 
-# 仅在非 Vercel 环境中导入这些模块
-if not os.environ.get('VERCEL'):
-    import webbrowser
-    import threading
+logger = get_logger()
 
-# 导入数据库模块
-try:
-    from database import (
-        init_database, get_all_tasks, create_task, update_task_progress,
-        update_task, get_task_updates, delete_task, get_users
-    )
+APP_DIR = Path(__file__).parent
+
+class Config:
+    """公共配置"""
+    # 是否使用数据库（数据库初始化失败时会自动关闭，回退到 Markdown + JSON 模式）
     USE_DATABASE = True
-except ImportError:
-    USE_DATABASE = False
-    print("Warning: database module not found, using legacy JSON mode")
-
-app = Flask(__name__)
-
-# 文件路径配置
-# 在 Vercel 环境中，使用当前目录；本地开发时使用父目录
-if os.environ.get('VERCEL'):
-    # Vercel 环境：使用当前文件所在目录
-    BASE_DIR = Path(__file__).parent
-    # Vercel 环境中这些文件不存在，使用空列表
+    # 数据库文件，None 表示使用 database.py 的默认位置（TODO_DB_FILE 环境变量）
+    DB_FILE = None
+    # 任务清单、推荐改变清单和旧版 JSON 状态文件，None 表示不读取
     TODO_FILE = None
     RECOMMEND_FILE = None
-    STATUS_FILE = BASE_DIR / "任务状态.json"  # 使用相对路径
-else:
-    # 本地开发环境
-    BASE_DIR = Path(__file__).parent.parent.parent
-    TODO_FILE = BASE_DIR / "工作待办清单.md"
-    RECOMMEND_FILE = BASE_DIR / "RAG知识库" / "14_工作内容管理库" / "02_推荐改变清单.md"
-    STATUS_FILE = BASE_DIR / "工具和脚本" / "工具脚本" / "任务状态.json"
-
-# 初始化数据库（如果可用）
-if USE_DATABASE:
+    STATUS_FILE = None
+    # 是否从 GitHub 仓库同步任务清单到数据库
+    GITHUB_SYNC = False
+    GITHUB_REPO_OWNER = "mashitan1111"
+    GITHUB_REPO_NAME = "todo-list-app"
+    GITHUB_BRANCH = "main"
+    # 任务清单在仓库中可能的路径（按优先级）
+    GITHUB_TASK_PATHS = [
+        "圆心工作/工作待办清单.md",
+        "工作待办清单.md"
+    ]
+    # 页面通过 SSE（/api/changes/stream）接收变更，关闭时改为定时轮询 /api/changes。
+    # 每个 SSE 连接占用一个工作线程，单个进程最多同时保持 MAX_CHANGE_STREAMS 个，
+    # 超出时返回 503，页面改为轮询（serve.py 按每个进程的线程数设置这个上限）
+    CHANGES_STREAM = os.environ.get('TODO_CHANGES_STREAM', '1') == '1'
+    MAX_CHANGE_STREAMS = int(os.environ.get('TODO_MAX_CHANGE_STREAMS', '4'))
+    # 数据库快照（配置了 TODO_SNAPSHOT_URL 时）两次上传的最短间隔（秒），间隔内的写入合并上传
+    SNAPSHOT_INTERVAL = float(os.environ.get('TODO_SNAPSHOT_INTERVAL', '5'))
+    # run_app() 使用的监听地址，以及启动后是否自动打开浏览器
+    HOST = '127.0.0.1'
+    PORT = 5000
+    OPEN_BROWSER = False
+
+class DesktopConfig(Config):
+    """桌面版：读写工作目录中的 Markdown 清单和状态文件"""
+    WORKSPACE_DIR = APP_DIR.parent.parent
+    TODO_FILE = WORKSPACE_DIR / "工作待办清单.md"
+    RECOMMEND_FILE = WORKSPACE_DIR / "RAG知识库" / "14_工作内容管理库" / "02_推荐改变清单.md"
+    STATUS_FILE = WORKSPACE_DIR / "工具和脚本" / "工具脚本" / "任务状态.json"
+    OPEN_BROWSER = True
+
+class ServerlessConfig(Config):
+    """Vercel：本地没有任务清单，任务从 GitHub 同步到 /tmp 下的数据库"""
+    STATUS_FILE = APP_DIR / "任务状态.json"
+    GITHUB_SYNC = True
+    # serverless 函数不适合长连接（按时长计费且有执行时间上限），页面使用轮询
+    CHANGES_STREAM = False
+    # 实例随时可能被冻结或回收，定时器和 atexit 不一定执行，每次写入后同步上传快照
+    SNAPSHOT_INTERVAL = 0
+
+def default_config():
+    """未指定配置时按运行环境选择"""
+    return ServerlessConfig if os.environ.get('VERCEL') else DesktopConfig
+
+def create_app(config=None):
+    """创建应用实例
+
+    config 可以是配置类（如 DesktopConfig）、配置对象，或只包含要覆盖的配置项的字典。
+    """
+    app = Flask(__name__)
+    app.config.from_object(default_config())
+    if isinstance(config, dict):
+        app.config.update(config)
+    elif config is not None:
+        app.config.from_object(config)
+
+    # 数据库连接是进程级的，同一进程中的多个应用实例必须使用同一个数据库文件
+    if app.config['USE_DATABASE']:
+        bind_db_file(app.config['DB_FILE'] or database.DB_FILE)
+
+    # 每个应用实例的运行状态
+    app.extensions['todo'] = {
+        # 旧版 JSON 状态文件：修改合并写入，原子替换并加文件锁
+        'status_store': StatusStore(app.config['STATUS_FILE']),
+        'github_fetcher': GitHubFetcher(app.config['GITHUB_REPO_OWNER'], app.config['GITHUB_REPO_NAME'],
+                                        ref=app.config['GITHUB_BRANCH']) if app.config['GITHUB_SYNC'] else None,
+        'last_sync_at': 0.0,
+        # 当前进程中保持的 SSE 连接数
+        'change_streams': threading.BoundedSemaphore(max(1, app.config['MAX_CHANGE_STREAMS'])),
+    }
+
+    # 页面模板在 templates/，CSS/JS 在 static/（带指纹长期缓存，响应按需压缩）
+    init_static_assets(app)
+    app.register_blueprint(bp)
+    return app
+
+# 最近一次 create_app() 绑定的数据库文件
+_bound_db_file = None
+
+def bind_db_file(db_file):
+    """把进程级的 database.DB_FILE 设为 db_file
+
+    之前创建的应用已绑定另一个文件时抛出 RuntimeError，否则后创建的应用会悄悄切换
+    前一个应用的数据库。database.DB_FILE 在两次调用之间被直接修改过（如测试夹具）时视为有意切换。
+    """
+    global _bound_db_file
+    db_file = Path(db_file)
+    if (_bound_db_file is not None and Path(database.DB_FILE) == _bound_db_file
+            and db_file.resolve() != _bound_db_file.resolve()):
+        raise RuntimeError(f"DB_FILE {db_file} conflicts with {_bound_db_file} used by another app "
+                           "in this process (the database connection is process-wide)")
+    database.DB_FILE = _bound_db_file = db_file
+
+def app_state():
+    """当前应用实例的运行状态"""
+    return current_app.extensions['todo']
+
+def use_database():
+    """当前应用实例是否使用数据库"""
+    return current_app.config['USE_DATABASE']
+
+bp = Blueprint('todo', __name__)
+
+# 批量更新接口单次最多处理的条目数
+MAX_BATCH_SIZE = 1000
+
+# 数据库在第一个需要它的请求时才初始化，冷启动导入阶段不做 DDL。
+# init_database() 在进程内只检查一次 PRAGMA user_version，结构已是最新版本时不执行迁移
+def ensure_database():
+    """确保数据库可用，初始化失败时回退到 Markdown + JSON 模式"""
+    if not use_database():
+        return False
     try:
         init_database()
-        print("Database initialized successfully")
     except Exception as e:
         print(f"Database initialization failed: {e}")
-        USE_DATABASE = False
+        current_app.config['USE_DATABASE'] = False
+    return use_database()
 
-def read_markdown_tasks(file_path):
-    """读取Markdown文件中的任务（支持多行任务）"""
-    if file_path is None or not file_path.exists():
-        return []
-    
-    tasks = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    # 修复：使用更强大的正则表达式支持多行任务
-    # 匹配 - [ ] 或 - [x] 格式的任务，支持多行内容
-    # 使用非贪婪匹配，直到遇到下一个任务标记或文件结尾
-    pattern = r'- \[([ x])\] ((?:[^\n]|(?:\n(?!- \[)))+?)(?=\n- \[|$)'
-    matches = re.finditer(pattern, content, re.MULTILINE | re.DOTALL)
-    
-    for match in matches:
-        status = match.group(1)
-        task_text = match.group(2)
-        
-        # 清理任务文本：移除多余的空白行，但保留换行符
-        task_lines = [line.rstrip() for line in task_text.split('\n')]
-        task_text = '\n'.join(task_lines).strip()
-        
-        # 检测优先级标记
-        priority = 'normal'
-        if '【紧急】' in task_text or '【P0】' in task_text:
-            priority = 'urgent'
-        elif '【P1】' in task_text:
-            priority = 'high'
-        elif '【P2】' in task_text:
-            priority = 'normal'
-        
-        # 检测任务来源
-        source = ''
-        if '来源：' in task_text:
-            source_match = re.search(r'来源：(.+?)(?=\n|$)', task_text)
-            if source_match:
-                source = source_match.group(1).strip()
-        
-        # 生成任务ID（使用哈希值，更稳定）
-        task_id = hashlib.md5(task_text.encode('utf-8')).hexdigest()
-        
-        tasks.append({
-            'id': task_id,
-            'text': task_text,
-            'completed': status == 'x',
-            'original_status': status,
-            'priority': priority,
-            'source': source
-        })
-    
-    return tasks
+@bp.before_app_request
+def prepare_database():
+    """静态资源请求不触发数据库初始化"""
+    if request.endpoint != 'static':
+        ensure_database()
+
+SNAPSHOT_CONFLICT_ERROR = 'Database snapshot conflict: a newer snapshot could not be restored, try again later'
+
+@bp.before_app_request
+def reject_writes_on_conflict():
+    """本地数据库落后于存储中的快照且无法恢复时拒绝写请求，避免修改在下次上传时丢失"""
+    if request.method in ('GET', 'HEAD', 'OPTIONS') or not use_database():
+        return None
+    if database.snapshot_conflict():
+        return jsonify({'success': False, 'error': SNAPSHOT_CONFLICT_ERROR}), 409
+    return None
+
+@bp.after_app_request
+def persist_database(response):
+    """数据有变化时保存数据库快照（仅配置了 TODO_SNAPSHOT_URL 时）
+
+    在响应发送完成后执行，上传不计入请求耗时；SNAPSHOT_INTERVAL 秒内的多次写入合并为一次上传
+    （见 database.schedule_snapshot）。
+    """
+    if use_database() and request.endpoint != 'static' and database.get_snapshot_store() is not None:
+        response.call_on_close(partial(upload_snapshot, current_app.config['SNAPSHOT_INTERVAL']))
+    return response
+
+def upload_snapshot(interval):
+    try:
+        metrics = schedule_snapshot(interval)
+        if metrics:
+            logger.debug("Database snapshot saved", extra={"data": metrics})
+    except Exception as e:
+        logger.warning("Database snapshot failed", extra={"data": {"error": str(e)}})
 
 def read_recommendations(file_path):
-    """读取推荐改变清单"""
-    if file_path is None or not file_path.exists():
-        return []
-    
-    recommendations = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-        pattern = r'#### \[(\d{4}-\d{2}-\d{2})\] 推荐改变 #(\d+)'
-        matches = re.finditer(pattern, content)
-        
-        for match in matches:
-            date = match.group(1)
-            num = match.group(2)
-            start = match.end()
-            next_match = re.search(r'#### \[', content[start:])
-            end = start + next_match.start() if next_match else len(content)
-            section = content[start:end]
-            
-            content_match = re.search(r'##### 改变内容\n(.+?)(?=#####|$)', section, re.DOTALL)
-            reason_match = re.search(r'##### 推荐理由\n(.+?)(?=#####|$)', section, re.DOTALL)
-            
-            if content_match:
-                recommendations.append({
-                    'date': date,
-                    'num': num,
-                    'content': content_match.group(1).strip(),
-                    'reason': reason_match.group(1).strip() if reason_match else ''
-                })
-    
-    return recommendations
+    """读取推荐改变清单（文件未变化时使用缓存的解析结果）"""
+    return parse_cache.get(file_path, parse_recommendations, default=[])
 
 def load_status():
-    """加载任务状态"""
-    if STATUS_FILE and STATUS_FILE.exists():
-        with open(STATUS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return {}
-
-def save_status(status):
-    """保存任务状态"""
-    if STATUS_FILE is None:
-        return  # Vercel 环境中不保存状态文件
-    STATUS_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(STATUS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(status, f, ensure_ascii=False, indent=2)
+    """加载任务状态（返回副本）"""
+    return app_state()['status_store'].load()
 
-def fetch_from_github(github_path):
-    """从 GitHub 仓库读取文件内容（Vercel 环境使用）"""
-    # #region agent log
-    log_data = {
-        "sessionId": "debug-session",
-        "runId": "run1",
-        "hypothesisId": "B",
-        "location": "app.py:185",
-        "message": "fetch_from_github called",
-        "data": {"github_path": github_path, "vercel": bool(os.environ.get('VERCEL'))},
-        "timestamp": int(__import__('time').time() * 1000)
+def load_legacy_tasks():
+    """从 Markdown 读取任务并套用 JSON 中保存的完成状态"""
+    tasks = read_markdown_tasks_cached(current_app.config['TODO_FILE'])
+    status = load_status()
+    for task in tasks:
+        if task['id'] in status:
+            task['completed'] = status[task['id']]
+    return tasks
+
+def page_counts(urgent, high, normal, completed, total):
+    """首页头部计数（首页渲染和变更接口共用）"""
+    return {
+        'urgent_count': urgent,
+        'high_count': high,
+        'normal_count': normal,
+        'total_pending': urgent + high + normal,
+        'completed_count': completed,
+        'completion_rate': round(completed / total * 100, 1) if total else 0
     }
-    try:
-        with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-    except: pass
-    # #endregion
+
+def count_tasks(tasks):
+    """按首页的分组规则统计任务列表"""
+    urgent = high = normal = completed = 0
+    for task in tasks:
+        if task['completed']:
+            completed += 1
+        elif task.get('priority') == 'urgent':
+            urgent += 1
+        elif task.get('priority') == 'high':
+            high += 1
+        elif task.get('priority') in ['normal', None]:
+            normal += 1
+    return page_counts(urgent, high, normal, completed, len(tasks))
+
+def stats_counts(stats):
+    """由 get_task_stats() 的结果得到头部计数"""
+    return page_counts(stats['urgent_pending'], stats['high_pending'], stats['normal_pending'],
+                       stats['completed'], stats['total'])
+
+def database_counts():
+    """数据库模式的头部计数（读取增量维护的统计表）"""
+    return stats_counts(get_task_stats())
+
+def with_task_and_stats(result, task_id):
+    """变更成功时附上更新后的任务和头部计数，前端据此局部更新页面"""
+    if not result.get('success'):
+        return result
+    task = get_task(task_id)
+    return dict(result, task=task.to_dict() if task else None, stats=database_counts())
+
+def fetch_from_github(github_path):
+    """从 GitHub 仓库读取文件内容（仅开启 GITHUB_SYNC 时）"""
+    fetcher = app_state()['github_fetcher']
+    logger.debug("fetch_from_github called", extra={"data": {"github_path": github_path, "github_sync": fetcher is not None}})
     
-    if not os.environ.get('VERCEL'):
+    if fetcher is None:
         return None
     
-    # GitHub 仓库信息
-    repo_owner = "mashitan1111"
-    repo_name = "todo-list-app"
-    branch = "main"
-    
-    # 确保路径使用正斜杠
-    github_path = github_path.replace("\\", "/")
-    
-    # 构建 GitHub API URL
-    api_url = f"https://api.github.com/repos/{repo_owner}/{repo_name}/contents/{github_path}"
-    
-    try:
-        response = requests.get(api_url, params={"ref": branch}, timeout=10)
-        # #region agent log
-        log_data = {
-            "sessionId": "debug-session",
-            "runId": "run1",
-            "hypothesisId": "B",
-            "location": "app.py:202",
-            "message": "GitHub API response",
-            "data": {"status_code": response.status_code, "url": api_url},
-            "timestamp": int(__import__('time').time() * 1000)
-        }
-        try:
-            with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-                f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-        except: pass
-        # #endregion
-        
-        if response.status_code == 200:
-            data = response.json()
-            if data.get("content"):
-                # Base64 解码（GitHub API 返回的 content 是 base64 编码的）
-                content = base64.b64decode(data["content"]).decode('utf-8')
-                # #region agent log
-                log_data = {
-                    "sessionId": "debug-session",
-                    "runId": "run1",
-                    "hypothesisId": "B",
-                    "location": "app.py:207",
-                    "message": "GitHub content fetched",
-                    "data": {"content_length": len(content), "first_100_chars": content[:100]},
-                    "timestamp": int(__import__('time').time() * 1000)
-                }
-                try:
-                    with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-                        f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-                except: pass
-                # #endregion
-                return content
-        elif response.status_code == 404:
-            print(f"File not found on GitHub: {github_path}")
-    except Exception as e:
-        print(f"Error fetching from GitHub ({github_path}): {e}")
-        # #region agent log
-        log_data = {
-            "sessionId": "debug-session",
-            "runId": "run1",
-            "hypothesisId": "B",
-            "location": "app.py:212",
-            "message": "GitHub fetch error",
-            "data": {"error": str(e), "github_path": github_path},
-            "timestamp": int(__import__('time').time() * 1000)
-        }
-        try:
-            with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-                f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-        except: pass
-        # #endregion
-    
-    return None
+    content = fetcher.fetch(github_path)
+    if content and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("GitHub content fetched", extra={"data": {"content_length": len(content), "first_100_chars": content[:100]}})
+    return content
 
-def sync_tasks_from_github():
-    """从 GitHub 同步任务到数据库（仅在 Vercel 环境且数据库为空时）"""
-    # #region agent log
-    log_data = {
-        "sessionId": "debug-session",
-        "runId": "run1",
-        "hypothesisId": "A",
-        "location": "app.py:216",
-        "message": "sync_tasks_from_github called",
-        "data": {"USE_DATABASE": USE_DATABASE, "VERCEL": bool(os.environ.get('VERCEL'))},
-        "timestamp": int(__import__('time').time() * 1000)
-    }
-    try:
-        with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-    except: pass
-    # #endregion
+# 两次 GitHub 同步之间的最短间隔（秒）；内容未变化时一次同步只需一个 304 请求和一次哈希比较
+SYNC_INTERVAL_SECONDS = int(os.environ.get('TODO_SYNC_INTERVAL', '60'))
+
+def sync_tasks_from_github(force=False, allow_mass_removal=False):
+    """从 GitHub 增量同步任务到数据库（仅开启 GITHUB_SYNC 时）
+
+    未到同步间隔时直接返回（force=True 时忽略间隔）。allow_mass_removal=True 时
+    确认应用被删除保护跳过的删除（见 database.SYNC_MAX_REMOVE_RATIO）。有任务变化时返回 True。
+    """
+    state = app_state()
+    config = current_app.config
+    logger.debug("sync_tasks_from_github called", extra={"data": {"USE_DATABASE": use_database(), "GITHUB_SYNC": config['GITHUB_SYNC']}})
+    
+    if not use_database() or state['github_fetcher'] is None:
+        return False
     
-    if not USE_DATABASE or not os.environ.get('VERCEL'):
+    now = time.monotonic()
+    if not force and now - state['last_sync_at'] < SYNC_INTERVAL_SECONDS:
         return False
+    state['last_sync_at'] = now
     
     try:
-        # 检查数据库是否为空
-        tasks = get_all_tasks()
-        # #region agent log
-        log_data = {
-            "sessionId": "debug-session",
-            "runId": "run1",
-            "hypothesisId": "A",
-            "location": "app.py:223",
-            "message": "Database task count",
-            "data": {"task_count": len(tasks) if tasks else 0},
-            "timestamp": int(__import__('time').time() * 1000)
-        }
-        try:
-            with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-                f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-        except: pass
-        # #endregion
-        
-        if tasks:
-            return False  # 数据库已有数据，不需要同步
-        
-        # 从 GitHub 读取 Markdown 文件
-        # 尝试多个可能的路径
-        github_paths = [
-            "圆心工作/工作待办清单.md",
-            "工作待办清单.md"
-        ]
-        
-        content = None
-        for path in github_paths:
-            content = fetch_from_github(path)
-            if content:
-                break
+        # 从 GitHub 读取 Markdown 文件（并发探测多个可能的路径）
+        path, content = state['github_fetcher'].fetch_first(config['GITHUB_TASK_PATHS'])
         
-        # #region agent log
-        log_data = {
-            "sessionId": "debug-session",
-            "runId": "run1",
-            "hypothesisId": "A",
-            "location": "app.py:240",
-            "message": "GitHub content check",
-            "data": {"content_found": bool(content), "content_length": len(content) if content else 0},
-            "timestamp": int(__import__('time').time() * 1000)
-        }
-        try:
-            with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-                f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-        except: pass
-        # #endregion
+        logger.debug("GitHub content check", extra={"data": {"content_found": bool(content), "content_length": len(content) if content else 0}})
         
         if not content:
             print("Could not fetch tasks from GitHub")
             return False
         
-        # 解析 Markdown 任务
-        tasks = []
-        pattern = r'- \[([ x])\] ((?:[^\n]|(?:\n(?!- \[)))+?)(?=\n- \[|$)'
-        matches = re.finditer(pattern, content, re.MULTILINE | re.DOTALL)
-        match_count = 0
-        
-        for match in matches:
-            match_count += 1
-            status = match.group(1)
-            task_text = match.group(2)
-            
-            # 清理任务文本
-            task_lines = [line.rstrip() for line in task_text.split('\n')]
-            task_text = '\n'.join(task_lines).strip()
-            
-            # 检测优先级
-            priority = 'normal'
-            if '【紧急】' in task_text or '【P0】' in task_text:
-                priority = 'urgent'
-            elif '【P1】' in task_text:
-                priority = 'high'
-            
-            # 检测来源
-            source = ''
-            if '来源：' in task_text:
-                source_match = re.search(r'来源：(.+?)(?=\n|$)', task_text)
-                if source_match:
-                    source = source_match.group(1).strip()
-            
-            # 导入到数据库
-            try:
-                result = create_task(
-                    text=task_text,
-                    priority=priority,
-                    source=source,
-                    creator='GitHub Sync'
-                )
-                if result.get('success'):
-                    # 如果任务已完成，更新状态
-                    if status == 'x':
-                        update_task_progress(result['task_id'], 100, 'GitHub Sync', 'completed')
-                    tasks.append(task_text)
-            except Exception as e:
-                print(f"Error importing task: {e}")
-                # #region agent log
-                log_data = {
-                    "sessionId": "debug-session",
-                    "runId": "run1",
-                    "hypothesisId": "C",
-                    "location": "app.py:285",
-                    "message": "Task import error",
-                    "data": {"error": str(e), "task_text_preview": task_text[:50]},
-                    "timestamp": int(__import__('time').time() * 1000)
-                }
-                try:
-                    with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-                        f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-                except: pass
-                # #endregion
-                continue
-        
-        # #region agent log
-        log_data = {
-            "sessionId": "debug-session",
-            "runId": "run1",
-            "hypothesisId": "A",
-            "location": "app.py:288",
-            "message": "Sync completed",
-            "data": {"matches_found": match_count, "tasks_imported": len(tasks)},
-            "timestamp": int(__import__('time').time() * 1000)
-        }
+        source = f"github:{config['GITHUB_REPO_OWNER']}/{config['GITHUB_REPO_NAME']}@{config['GITHUB_BRANCH']}:{path}"
         try:
-            with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-                f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-        except: pass
-        # #endregion
+            result = sync_markdown_tasks(source, content, parse_markdown_tasks,
+                                         allow_mass_removal=allow_mass_removal)
+        except Exception as e:
+            print(f"Error importing tasks: {e}")
+            logger.warning("Task import error", extra={"data": {"error": str(e), "source": source}})
+            return False
+        
+        logger.debug("Sync completed", extra={"data": result})
         
-        print(f"Synced {len(tasks)} tasks from GitHub")
-        return len(tasks) > 0
+        if result['unchanged']:
+            return False
+        changes = result['added'] + result['removed'] + result['changed']
+        print(f"Synced from GitHub: {result['added']} added, {result['removed']} removed, {result['changed']} changed")
+        return changes > 0
     except Exception as e:
         print(f"Error syncing from GitHub: {e}")
         return False
 
-@app.route('/')
-def index():
-    """主页面"""
-    # #region agent log
-    log_data = {
-        "sessionId": "debug-session",
-        "runId": "run1",
-        "hypothesisId": "A",
-        "location": "app.py:294",
-        "message": "index() called",
-        "data": {"USE_DATABASE": USE_DATABASE, "VERCEL": bool(os.environ.get('VERCEL'))},
-        "timestamp": int(__import__('time').time() * 1000)
+# 首页每个分组首次渲染的任务数；数据库模式下其余任务由页面通过 /api/tasks 按游标分页加载
+INDEX_PAGE_SIZES = {'urgent': 20, 'high': 10, 'normal': 5, 'completed': 10}
+
+def group_filters(group):
+    """首页分组对应的 /api/tasks 筛选条件"""
+    if group == 'completed':
+        return {'completed': True}
+    return {'priority': group, 'completed': False}
+
+def load_index_groups():
+    """数据库模式：每个分组只读取首页显示的第一页，返回 (分组任务, 下一页游标)"""
+    groups, next_cursors = {}, {}
+    for group, size in INDEX_PAGE_SIZES.items():
+        page = get_tasks_page(group_filters(group), limit=size)
+        groups[group] = page['tasks']
+        next_cursors[group] = page['next_cursor']
+    return groups, next_cursors
+
+def group_legacy_tasks(tasks):
+    """旧版模式：按优先级和完成状态分组（没有 /api/tasks，未完成任务全部渲染）"""
+    return {
+        'urgent': [t for t in tasks if not t['completed'] and t.get('priority') == 'urgent'],
+        'high': [t for t in tasks if not t['completed'] and t.get('priority') == 'high'],
+        'normal': [t for t in tasks if not t['completed'] and t.get('priority') in ['normal', None]],
+        'completed': [t for t in tasks if t['completed']],
     }
-    try:
-        with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-            f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-    except: pass
-    # #endregion
+
+@bp.route('/')
+def index():
+    """主页面
+
+    数据库模式下每个分组只渲染第一页，头部和分组计数读取统计表；
+    "查看全部"和筛选由页面调用 /api/tasks 分页加载。
+    """
+    logger.debug("index() called", extra={"data": {"USE_DATABASE": use_database(), "GITHUB_SYNC": current_app.config['GITHUB_SYNC']}})
+    
+    # 页面数据对应的变更版本，前端从这里开始订阅变更（旧版模式为 None）
+    change_version = None
+    groups = None
+    next_cursors = {}
     
     # 优先使用数据库，否则回退到Markdown+JSON
-    if USE_DATABASE:
+    if use_database():
         try:
-            tasks = get_all_tasks()
-            # #region agent log
-            log_data = {
-                "sessionId": "debug-session",
-                "runId": "run1",
-                "hypothesisId": "A",
-                "location": "app.py:300",
-                "message": "Initial task load",
-                "data": {"task_count": len(tasks) if tasks else 0},
-                "timestamp": int(__import__('time').time() * 1000)
-            }
-            try:
-                with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-                    f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-            except: pass
-            # #endregion
-            
-            # 如果数据库为空且是 Vercel 环境，尝试从 GitHub 同步
-            if not tasks and os.environ.get('VERCEL'):
-                print("Database is empty, attempting to sync from GitHub...")
-                sync_result = sync_tasks_from_github()
-                # #region agent log
-                log_data = {
-                    "sessionId": "debug-session",
-                    "runId": "run1",
-                    "hypothesisId": "A",
-                    "location": "app.py:304",
-                    "message": "Sync result",
-                    "data": {"sync_success": sync_result},
-                    "timestamp": int(__import__('time').time() * 1000)
-                }
-                try:
-                    with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-                        f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-                except: pass
-                # #endregion
-                tasks = get_all_tasks()  # 重新加载
-                # #region agent log
-                log_data = {
-                    "sessionId": "debug-session",
-                    "runId": "run1",
-                    "hypothesisId": "A",
-                    "location": "app.py:305",
-                    "message": "After sync task load",
-                    "data": {"task_count": len(tasks) if tasks else 0},
-                    "timestamp": int(__import__('time').time() * 1000)
-                }
-                try:
-                    with open(r"c:\Users\温柔的男子啊\AppData\Roaming\Cursor\logs\20260104T213527\window1\exthost\ms-vscode.powershell\.cursor\debug.log", "a", encoding="utf-8") as f:
-                        f.write(json.dumps(log_data, ensure_ascii=False) + "\n")
-                except: pass
-                # #endregion
-            
-            # 转换数据库格式到前端格式
-            for task in tasks:
-                task['completed'] = task.get('progress', 0) >= 100 or task.get('status') == 'completed'
+            # 先取版本号再读任务：期间发生的变更会被重复推送一次，但不会漏掉
+            change_version = get_change_version()
+            counts = database_counts()
+            
+            # 开启 GitHub 同步时增量同步（按间隔节流，数据库为空时立即同步）
+            if current_app.config['GITHUB_SYNC']:
+                total = counts['total_pending'] + counts['completed_count']
+                sync_result = sync_tasks_from_github(force=not total)
+                logger.debug("Sync result", extra={"data": {"sync_success": sync_result}})
+                if sync_result:
+                    counts = database_counts()
+            
+            groups, next_cursors = load_index_groups()
+            logger.debug("Initial task load", extra={"data": {g: len(t) for g, t in groups.items()}})
         except Exception as e:
             print(f"Error loading from database: {e}, falling back to Markdown")
-            tasks = read_markdown_tasks(TODO_FILE) if TODO_FILE else []
-            status = load_status()
-            for task in tasks:
-                task_id = task['id']
-                if task_id in status:
-                    task['completed'] = status[task_id]
+            change_version = None
+            tasks = load_legacy_tasks()
     else:
-        tasks = read_markdown_tasks(TODO_FILE) if TODO_FILE else []
-        recommendations = read_recommendations(RECOMMEND_FILE) if RECOMMEND_FILE else []
+        tasks = read_markdown_tasks_cached(current_app.config['TODO_FILE'])
         status = load_status()
         
         # 修复：使用任务ID而不是完整文本作为key
+        migrated, stale_keys = {}, []
         for task in tasks:
             task_id = task['id']
             # 兼容旧版本：如果使用文本作为key的状态存在，迁移到ID
             task_text = task['text']
             if task_text in status:
-                # 迁移旧状态到新ID
-                status[task_id] = status[task_text]
-                del status[task_text]
-                save_status(status)
+                status[task_id] = status.pop(task_text)
+                migrated[task_id] = status[task_id]
+                stale_keys.append(task_text)
             
             if task_id in status:
                 task['completed'] = status[task_id]
-    
-    # 读取推荐（如果数据库不可用）
-    if not USE_DATABASE:
-        recommendations = read_recommendations(RECOMMEND_FILE) if RECOMMEND_FILE else []
-    else:
-        recommendations = read_recommendations(RECOMMEND_FILE) if RECOMMEND_FILE else []  # 仍然从文件读取推荐
-    
-    # 按优先级和完成状态分组
-    urgent_pending = [t for t in tasks if not t['completed'] and t.get('priority') == 'urgent']
-    high_pending = [t for t in tasks if not t['completed'] and t.get('priority') == 'high']
-    normal_pending = [t for t in tasks if not t['completed'] and t.get('priority') in ['normal', None]]
-    completed_tasks = [t for t in tasks if t['completed']]
-    
-    total_pending = len(urgent_pending) + len(high_pending) + len(normal_pending)
-    completion_rate = len(completed_tasks) / len(tasks) * 100 if tasks else 0
+        
+        # 所有迁移合并为一次写入
+        if migrated:
+            app_state()['status_store'].update(migrated, removals=stale_keys)
+    
+    # 推荐始终从文件读取（文件未变化时命中解析缓存）
+    recommendations = read_recommendations(current_app.config['RECOMMEND_FILE'])
+    
+    # 旧版模式：超出首屏的高优先级和普通任务渲染在折叠区中
+    hidden = {'high': [], 'normal': []}
+    if groups is None:
+        groups = group_legacy_tasks(tasks)
+        counts = page_counts(len(groups['urgent']), len(groups['high']), len(groups['normal']),
+                             len(groups['completed']), len(tasks))
+        for group in hidden:
+            hidden[group] = groups[group][INDEX_PAGE_SIZES[group]:]
+            groups[group] = groups[group][:INDEX_PAGE_SIZES[group]]
+        groups['completed'] = groups['completed'][:INDEX_PAGE_SIZES['completed']]
     
     # 获取用户列表（用于筛选）
-    users = get_users() if USE_DATABASE else []
-    
-    html = """
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>工作待办清单 - 圆心工作</title>
-        <style>
-            @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-            
-            * {
-                margin: 0;
-                padding: 0;
-                box-sizing: border-box;
-            }
-            
-            body {
-                font-family: 'Inter', 'Microsoft YaHei', -apple-system, BlinkMacSystemFont, sans-serif;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 50%, #f093fb 100%);
-                background-attachment: fixed;
-                min-height: 100vh;
-                padding: 20px;
-                color: #333;
-            }
-            
-            .container {
-                max-width: 1400px;
-                margin: 0 auto;
-            }
-            
-            /* 头部区域 */
-            .header {
-                background: rgba(255, 255, 255, 0.95);
-                backdrop-filter: blur(10px);
-                border-radius: 20px;
-                padding: 30px 40px;
-                margin-bottom: 30px;
-                box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }
-            
-            .header-top {
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 20px;
-            }
-            
-            .header-title {
-                font-size: 32px;
-                font-weight: 700;
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                -webkit-background-clip: text;
-                -webkit-text-fill-color: transparent;
-                background-clip: text;
-            }
-            
-            .header-date {
-                color: #666;
-                font-size: 14px;
-                font-weight: 400;
-            }
-            
-            /* 统计卡片 */
-            .stats-grid {
-                display: grid;
-                grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
-                gap: 20px;
-                margin-bottom: 30px;
-            }
-            
-            .stat-card {
-                background: linear-gradient(135deg, rgba(255, 255, 255, 0.9) 0%, rgba(255, 255, 255, 0.7) 100%);
-                backdrop-filter: blur(10px);
-                border-radius: 16px;
-                padding: 24px;
-                text-align: center;
-                box-shadow: 0 4px 20px rgba(0, 0, 0, 0.08);
-                border: 1px solid rgba(255, 255, 255, 0.3);
-                transition: all 0.3s ease;
-            }
-            
-            .stat-card:hover {
-                transform: translateY(-5px);
-                box-shadow: 0 8px 30px rgba(0, 0, 0, 0.15);
-            }
-            
-            .stat-card.urgent {
-                background: linear-gradient(135deg, #ff6b6b 0%, #ee5a6f 100%);
-                color: white;
-            }
-            
-            .stat-card.pending {
-                background: linear-gradient(135deg, #4ecdc4 0%, #44a08d 100%);
-                color: white;
-            }
-            
-            .stat-card.completed {
-                background: linear-gradient(135deg, #95e1d3 0%, #6bcf7f 100%);
-                color: white;
-            }
-            
-            .stat-card.recommend {
-                background: linear-gradient(135deg, #feca57 0%, #ff9ff3 100%);
-                color: white;
-            }
-            
-            .stat-number {
-                font-size: 42px;
-                font-weight: 700;
-                margin-bottom: 8px;
-                line-height: 1;
-            }
-            
-            .stat-label {
-                font-size: 14px;
-                font-weight: 500;
-                opacity: 0.9;
-            }
-            
-            /* 进度条 */
-            .progress-section {
-                background: rgba(255, 255, 255, 0.95);
-                backdrop-filter: blur(10px);
-                border-radius: 16px;
-                padding: 20px;
-                margin-bottom: 30px;
-                box-shadow: 0 4px 20px rgba(0, 0, 0, 0.08);
-            }
-            
-            .progress-header {
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 12px;
-            }
-            
-            .progress-title {
-                font-size: 16px;
-                font-weight: 600;
-                color: #333;
-            }
-            
-            .progress-percent {
-                font-size: 18px;
-                font-weight: 700;
-                color: #667eea;
-            }
-            
-            .progress-bar {
-                width: 100%;
-                height: 12px;
-                background: #e9ecef;
-                border-radius: 10px;
-                overflow: hidden;
-                position: relative;
-            }
-            
-            .progress-fill {
-                height: 100%;
-                background: linear-gradient(90deg, #667eea 0%, #764ba2 100%);
-                border-radius: 10px;
-                transition: width 0.5s ease;
-                box-shadow: 0 2px 10px rgba(102, 126, 234, 0.4);
-            }
-            
-            /* 任务区域 */
-            .tasks-container {
-                display: grid;
-                grid-template-columns: 1fr 1fr;
-                gap: 30px;
-                margin-bottom: 30px;
-            }
-            
-            @media (max-width: 1200px) {
-                .tasks-container {
-                    grid-template-columns: 1fr;
-                }
-            }
-            
-            .task-section {
-                background: rgba(255, 255, 255, 0.95);
-                backdrop-filter: blur(10px);
-                border-radius: 20px;
-                padding: 30px;
-                box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }
-            
-            .section-header {
-                display: flex;
-                align-items: center;
-                margin-bottom: 20px;
-                padding-bottom: 15px;
-                border-bottom: 2px solid #f0f0f0;
-            }
-            
-            .section-icon {
-                font-size: 24px;
-                margin-right: 12px;
-            }
-            
-            .section-title {
-                font-size: 20px;
-                font-weight: 600;
-                color: #333;
-                flex: 1;
-            }
-            
-            .section-count {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                padding: 4px 12px;
-                border-radius: 12px;
-                font-size: 14px;
-                font-weight: 600;
-            }
-            
-            /* 任务项 */
-            .task-group {
-                margin-bottom: 25px;
-            }
-            
-            .group-title {
-                font-size: 14px;
-                font-weight: 600;
-                color: #666;
-                text-transform: uppercase;
-                letter-spacing: 0.5px;
-                margin-bottom: 12px;
-                padding: 10px 15px;
-                background: rgba(102, 126, 234, 0.1);
-                border-radius: 8px;
-                cursor: pointer;
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                transition: all 0.3s ease;
-            }
-            
-            .group-title:hover {
-                background: rgba(102, 126, 234, 0.15);
-            }
-            
-            .group-title.collapsed .collapse-icon {
-                transform: rotate(-90deg);
-            }
-            
-            .collapse-icon {
-                font-size: 12px;
-                transition: transform 0.3s ease;
-                color: #667eea;
-            }
-            
-            .task-list {
-                overflow: hidden;
-                transition: max-height 0.3s ease;
-                max-height: 5000px;
-            }
-            
-            .task-list.collapsed {
-                max-height: 0;
-                overflow: hidden;
-            }
-            
-            .expand-btn {
-                text-align: center;
-                padding: 12px;
-                margin-top: 10px;
-                background: linear-gradient(135deg, rgba(102, 126, 234, 0.1) 0%, rgba(118, 75, 162, 0.1) 100%);
-                border-radius: 8px;
-                cursor: pointer;
-                color: #667eea;
-                font-weight: 600;
-                font-size: 14px;
-                transition: all 0.3s ease;
-                border: 2px dashed rgba(102, 126, 234, 0.3);
-            }
-            
-            .expand-btn:hover {
-                background: linear-gradient(135deg, rgba(102, 126, 234, 0.2) 0%, rgba(118, 75, 162, 0.2) 100%);
-                border-color: rgba(102, 126, 234, 0.5);
-                transform: translateY(-2px);
-            }
-            
-            .task-list-hidden {
-                display: none;
-            }
-            
-            .task-list-hidden.expanded {
-                display: block;
-                animation: fadeIn 0.3s ease;
-            }
-            
-            .task-item {
-                background: #f8f9fa;
-                border-radius: 12px;
-                padding: 16px;
-                margin-bottom: 10px;
-                display: flex;
-                align-items: flex-start;
-                transition: all 0.3s ease;
-                border: 2px solid transparent;
-                cursor: pointer;
-            }
-            
-            .task-item:hover {
-                background: #e9ecef;
-                transform: translateX(5px);
-                border-color: #667eea;
-                box-shadow: 0 4px 12px rgba(102, 126, 234, 0.15);
-            }
-            
-            .task-item.completed {
-                opacity: 0.6;
-                background: #f0f0f0;
-            }
-            
-            .task-item.urgent {
-                border-left: 4px solid #ff6b6b;
-            }
-            
-            .task-item.high {
-                border-left: 4px solid #feca57;
-            }
-            
-            .task-item.normal {
-                border-left: 4px solid #4ecdc4;
-            }
-            
-            .task-checkbox {
-                width: 22px;
-                height: 22px;
-                margin-right: 12px;
-                margin-top: 2px;
-                cursor: pointer;
-                accent-color: #667eea;
-                flex-shrink: 0;
-            }
-            
-            .task-content {
-                flex: 1;
-            }
-            
-            .task-text {
-                font-size: 15px;
-                line-height: 1.6;
-                color: #333;
-                margin-bottom: 4px;
-            }
-            
-            .task-item.completed .task-text {
-                text-decoration: line-through;
-                color: #999;
-            }
-            
-            .task-source {
-                font-size: 12px;
-                color: #999;
-                margin-top: 4px;
-                font-style: italic;
-            }
-            
-            /* 推荐工作 */
-            .recommendations-section {
-                background: rgba(255, 255, 255, 0.95);
-                backdrop-filter: blur(10px);
-                border-radius: 20px;
-                padding: 30px;
-                box-shadow: 0 8px 32px rgba(0, 0, 0, 0.1);
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }
-            
-            .recommendation-item {
-                background: linear-gradient(135deg, #fff9e6 0%, #fff3cd 100%);
-                border-left: 4px solid #feca57;
-                border-radius: 12px;
-                padding: 20px;
-                margin-bottom: 15px;
-                transition: all 0.3s ease;
-            }
-            
-            .recommendation-item:hover {
-                transform: translateX(5px);
-                box-shadow: 0 4px 12px rgba(254, 202, 87, 0.3);
-            }
-            
-            .recommendation-header {
-                display: flex;
-                align-items: center;
-                margin-bottom: 12px;
-            }
-            
-            .recommendation-badge {
-                background: #feca57;
-                color: #333;
-                padding: 4px 10px;
-                border-radius: 8px;
-                font-size: 12px;
-                font-weight: 600;
-                margin-right: 10px;
-            }
-            
-            .recommendation-date {
-                font-size: 12px;
-                color: #666;
-            }
-            
-            .recommendation-content {
-                font-size: 15px;
-                line-height: 1.7;
-                color: #333;
-                margin-bottom: 8px;
-            }
-            
-            .recommendation-reason {
-                font-size: 13px;
-                color: #666;
-                font-style: italic;
-                padding-top: 8px;
-                border-top: 1px solid rgba(0, 0, 0, 0.1);
-            }
-            
-            /* 按钮 */
-            .btn-refresh {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-                border: none;
-                border-radius: 12px;
-                padding: 12px 24px;
-                font-size: 14px;
-                font-weight: 600;
-                cursor: pointer;
-                transition: all 0.3s ease;
-                box-shadow: 0 4px 15px rgba(102, 126, 234, 0.3);
-                margin-bottom: 20px;
-            }
-            
-            .btn-refresh:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 6px 20px rgba(102, 126, 234, 0.4);
-            }
-            
-            .btn-refresh:active {
-                transform: translateY(0);
-            }
-            
-            /* 空状态 */
-            .empty-state {
-                text-align: center;
-                padding: 40px 20px;
-                color: #999;
-            }
-            
-            .empty-icon {
-                font-size: 48px;
-                margin-bottom: 16px;
-                opacity: 0.5;
-            }
-            
-            .empty-text {
-                font-size: 16px;
-            }
-            
-            /* 动画 */
-            @keyframes fadeIn {
-                from {
-                    opacity: 0;
-                    transform: translateY(20px);
-                }
-                to {
-                    opacity: 1;
-                    transform: translateY(0);
-                }
-            }
-            
-            .task-item, .recommendation-item {
-                animation: fadeIn 0.3s ease;
-            }
-            
-            /* 任务创建模态框 */
-            .modal {
-                display: none;
-                position: fixed;
-                z-index: 1000;
-                left: 0;
-                top: 0;
-                width: 100%;
-                height: 100%;
-                background-color: rgba(0, 0, 0, 0.5);
-                backdrop-filter: blur(5px);
-            }
-            
-            .modal-content {
-                background-color: white;
-                margin: 5% auto;
-                padding: 30px;
-                border-radius: 20px;
-                width: 90%;
-                max-width: 600px;
-                box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3);
-                animation: slideDown 0.3s ease;
-            }
-            
-            @keyframes slideDown {
-                from {
-                    transform: translateY(-50px);
-                    opacity: 0;
-                }
-                to {
-                    transform: translateY(0);
-                    opacity: 1;
-                }
-            }
-            
-            .modal-header {
-                display: flex;
-                justify-content: space-between;
-                align-items: center;
-                margin-bottom: 20px;
-                padding-bottom: 15px;
-                border-bottom: 2px solid #f0f0f0;
-            }
-            
-            .modal-title {
-                font-size: 24px;
-                font-weight: 600;
-                color: #333;
-            }
-            
-            .close {
-                font-size: 28px;
-                font-weight: bold;
-                color: #999;
-                cursor: pointer;
-                transition: color 0.3s;
-            }
-            
-            .close:hover {
-                color: #333;
-            }
-            
-            .form-group {
-                margin-bottom: 20px;
-            }
-            
-            .form-label {
-                display: block;
-                margin-bottom: 8px;
-                font-weight: 600;
-                color: #333;
-                font-size: 14px;
-            }
-            
-            .form-input, .form-select, .form-textarea {
-                width: 100%;
-                padding: 12px;
-                border: 2px solid #e0e0e0;
-                border-radius: 8px;
-                font-size: 14px;
-                font-family: inherit;
-                transition: border-color 0.3s;
-            }
-            
-            .form-input:focus, .form-select:focus, .form-textarea:focus {
-                outline: none;
-                border-color: #667eea;
-            }
-            
-            .form-textarea {
-                min-height: 100px;
-                resize: vertical;
-            }
-            
-            .form-actions {
-                display: flex;
-                gap: 10px;
-                justify-content: flex-end;
-                margin-top: 30px;
-            }
-            
-            .btn {
-                padding: 12px 24px;
-                border: none;
-                border-radius: 8px;
-                font-size: 14px;
-                font-weight: 600;
-                cursor: pointer;
-                transition: all 0.3s;
-            }
-            
-            .btn-primary {
-                background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-                color: white;
-            }
-            
-            .btn-primary:hover {
-                transform: translateY(-2px);
-                box-shadow: 0 4px 12px rgba(102, 126, 234, 0.4);
-            }
-            
-            .btn-secondary {
-                background: #f0f0f0;
-                color: #333;
-            }
-            
-            .btn-secondary:hover {
-                background: #e0e0e0;
-            }
-            
-            /* 任务进度显示 */
-            .task-progress-container {
-                margin-top: 8px;
-                display: flex;
-                align-items: center;
-                gap: 10px;
-            }
-            
-            .task-progress-bar {
-                flex: 1;
-                height: 6px;
-                background: #e9ecef;
-                border-radius: 3px;
-                overflow: hidden;
-            }
-            
-            .task-progress-fill {
-                height: 100%;
-                background: linear-gradient(90deg, #4ecdc4 0%, #44a08d 100%);
-                transition: width 0.3s ease;
-            }
-            
-            .task-progress-text {
-                font-size: 12px;
-                color: #666;
-                font-weight: 600;
-                min-width: 40px;
-            }
-            
-            .task-assignee {
-                font-size: 12px;
-                color: #999;
-                margin-top: 4px;
-            }
-            
-            .task-meta {
-                display: flex;
-                gap: 10px;
-                margin-top: 8px;
-                flex-wrap: wrap;
-            }
-            
-            .task-meta-item {
-                font-size: 12px;
-                color: #666;
-                padding: 2px 8px;
-                background: #f0f0f0;
-                border-radius: 4px;
-            }
-            
-            /* 筛选器 */
-            .filters {
-                background: rgba(255, 255, 255, 0.95);
-                backdrop-filter: blur(10px);
-                border-radius: 16px;
-                padding: 20px;
-                margin-bottom: 20px;
-                display: flex;
-                gap: 15px;
-                flex-wrap: wrap;
-                align-items: center;
-            }
-            
-            .filter-group {
-                display: flex;
-                align-items: center;
-                gap: 8px;
-            }
-            
-            .filter-label {
-                font-size: 14px;
-                font-weight: 600;
-                color: #666;
-            }
-            
-            .filter-select {
-                padding: 8px 12px;
-                border: 2px solid #e0e0e0;
-                border-radius: 8px;
-                font-size: 14px;
-                background: white;
-                cursor: pointer;
-            }
-        </style>
-    </head>
-    <body>
-        <div class="container">
-            <!-- 头部 -->
-            <div class="header">
-                <div class="header-top">
-                    <h1 class="header-title">📋 工作待办清单</h1>
-                    <div class="header-date">🕐 {{ update_time }}</div>
-                </div>
-                
-                <!-- 统计卡片 -->
-                <div class="stats-grid">
-                    <div class="stat-card urgent">
-                        <div class="stat-number">{{ urgent_count }}</div>
-                        <div class="stat-label">🚨 紧急任务</div>
-                    </div>
-                    <div class="stat-card pending">
-                        <div class="stat-number">{{ total_pending }}</div>
-                        <div class="stat-label">📝 待完成</div>
-                    </div>
-                    <div class="stat-card completed">
-                        <div class="stat-number">{{ completed_count }}</div>
-                        <div class="stat-label">✅ 已完成</div>
-                    </div>
-                    <div class="stat-card recommend">
-                        <div class="stat-number">{{ recommend_count }}</div>
-                        <div class="stat-label">💡 推荐工作</div>
-                    </div>
-                </div>
-                
-                <!-- 进度条 -->
-                <div class="progress-section">
-                    <div class="progress-header">
-                        <div class="progress-title">整体完成进度</div>
-                        <div class="progress-percent">{{ completion_rate }}%</div>
-                    </div>
-                    <div class="progress-bar">
-                        <div class="progress-fill" style="width: {{ completion_rate }}%"></div>
-                    </div>
-                </div>
-                
-                <div style="display: flex; gap: 10px; flex-wrap: wrap;">
-                    <button class="btn-refresh" onclick="location.reload()">🔄 刷新数据</button>
-                    <button class="btn-refresh" onclick="showCreateTaskModal()" style="background: linear-gradient(135deg, #4ecdc4 0%, #44a08d 100%);">➕ 添加新任务</button>
-                </div>
-            </div>
-            
-            <!-- 筛选器 -->
-            {% if users %}
-            <div class="filters">
-                <div class="filter-group">
-                    <label class="filter-label">负责人：</label>
-                    <select class="filter-select" id="filter-assignee" onchange="applyFilters()">
-                        <option value="">全部</option>
-                        {% for user in users %}
-                        <option value="{{ user }}">{{ user }}</option>
-                        {% endfor %}
-                    </select>
-                </div>
-                <div class="filter-group">
-                    <label class="filter-label">状态：</label>
-                    <select class="filter-select" id="filter-status" onchange="applyFilters()">
-                        <option value="">全部</option>
-                        <option value="pending">待处理</option>
-                        <option value="in_progress">进行中</option>
-                        <option value="completed">已完成</option>
-                    </select>
-                </div>
-                <div class="filter-group">
-                    <label class="filter-label">优先级：</label>
-                    <select class="filter-select" id="filter-priority" onchange="applyFilters()">
-                        <option value="">全部</option>
-                        <option value="urgent">紧急</option>
-                        <option value="high">高</option>
-                        <option value="normal">普通</option>
-                    </select>
-                </div>
-            </div>
-            {% endif %}
-            
-            <!-- 任务区域 -->
-            <div class="tasks-container">
-                <!-- 待完成任务 -->
-                <div class="task-section">
-                    <div class="section-header">
-                        <span class="section-icon">📌</span>
-                        <span class="section-title">待完成任务</span>
-                        <span class="section-count">{{ total_pending }}</span>
-                    </div>
-                    
-                    {% if urgent_pending %}
-                    <div class="task-group">
-                        <div class="group-title" onclick="toggleGroup(this)">
-                            <span>🚨 紧急任务 ({{ urgent_pending|length }})</span>
-                            <span class="collapse-icon">▼</span>
-                        </div>
-                        <div class="task-list">
-                            {% for task in urgent_pending %}
-                            <div class="task-item urgent" onclick="toggleTask(this, '{{ task.id }}', event)">
-                                <input type="checkbox" class="task-checkbox" 
-                                       data-task="{{ task.id }}"
-                                       onclick="event.stopPropagation(); toggleTask(this.closest('.task-item'), '{{ task.id }}', event)">
-                                <div class="task-content">
-                                    <div class="task-text">{{ task.text|replace('\n', '<br>')|safe }}</div>
-                                    {% if task.assignee %}
-                                    <div class="task-assignee">👤 {{ task.assignee }}</div>
-                                    {% endif %}
-                                    {% if task.progress is defined %}
-                                    <div class="task-progress-container">
-                                        <div class="task-progress-bar">
-                                            <div class="task-progress-fill" style="width: {{ task.progress }}%"></div>
-                                        </div>
-                                        <span class="task-progress-text">{{ task.progress }}%</span>
-                                    </div>
-                                    {% endif %}
-                                    {% if task.source %}
-                                    <div class="task-source">📍 {{ task.source }}</div>
-                                    {% endif %}
-                                    {% if task.due_date %}
-                                    <div class="task-meta">
-                                        <span class="task-meta-item">📅 {{ task.due_date }}</span>
-                                    </div>
-                                    {% endif %}
-                                </div>
-                            </div>
-                            {% endfor %}
-                        </div>
-                    </div>
-                    {% endif %}
-                    
-                    {% if high_pending %}
-                    <div class="task-group">
-                        <div class="group-title collapsed" onclick="toggleGroup(this)">
-                            <span>⚠️ 高优先级 ({{ high_pending|length }})</span>
-                            <span class="collapse-icon">▼</span>
-                        </div>
-                        <div class="task-list collapsed">
-                            {% set high_display = high_pending[:10] %}
-                            {% set high_hidden = high_pending[10:] %}
-                            {% for task in high_display %}
-                            <div class="task-item high" onclick="toggleTask(this, '{{ task.id }}', event)">
-                                <input type="checkbox" class="task-checkbox" 
-                                       data-task="{{ task.id }}"
-                                       onclick="event.stopPropagation(); toggleTask(this.closest('.task-item'), '{{ task.id }}', event)">
-                                <div class="task-content">
-                                    <div class="task-text">{{ task.text|replace('\n', '<br>')|safe }}</div>
-                                    {% if task.assignee %}
-                                    <div class="task-assignee">👤 {{ task.assignee }}</div>
-                                    {% endif %}
-                                    {% if task.progress is defined %}
-                                    <div class="task-progress-container">
-                                        <div class="task-progress-bar">
-                                            <div class="task-progress-fill" style="width: {{ task.progress }}%"></div>
-                                        </div>
-                                        <span class="task-progress-text">{{ task.progress }}%</span>
-                                    </div>
-                                    {% endif %}
-                                    {% if task.source %}
-                                    <div class="task-source">📍 {{ task.source }}</div>
-                                    {% endif %}
-                                    {% if task.due_date %}
-                                    <div class="task-meta">
-                                        <span class="task-meta-item">📅 {{ task.due_date }}</span>
-                                    </div>
-                                    {% endif %}
-                                </div>
-                            </div>
-                            {% endfor %}
-                            {% if high_hidden|length > 0 %}
-                            <div class="expand-btn" onclick="showMore('high', event)">
-                                查看全部 {{ high_pending|length }} 个任务 ▼
-                            </div>
-                            <div class="task-list-hidden" id="high-more">
-                                {% for task in high_hidden %}
-                                <div class="task-item high" onclick="toggleTask(this, '{{ task.id }}', event)">
-                                    <input type="checkbox" class="task-checkbox" 
-                                           data-task="{{ task.id }}"
-                                           onclick="event.stopPropagation(); toggleTask(this.closest('.task-item'), '{{ task.id }}', event)">
-                                    <div class="task-content">
-                                        <div class="task-text">{{ task.text|replace('\n', '<br>')|safe }}</div>
-                                        {% if task.source %}
-                                        <div class="task-source">📍 {{ task.source }}</div>
-                                        {% endif %}
-                                    </div>
-                                </div>
-                                {% endfor %}
-                            </div>
-                            {% endif %}
-                        </div>
-                    </div>
-                    {% endif %}
-                    
-                    {% if normal_pending %}
-                    <div class="task-group">
-                        <div class="group-title collapsed" onclick="toggleGroup(this)">
-                            <span>📋 普通任务 ({{ normal_pending|length }})</span>
-                            <span class="collapse-icon">▼</span>
-                        </div>
-                        <div class="task-list collapsed">
-                            {% set normal_display = normal_pending[:5] %}
-                            {% set normal_hidden = normal_pending[5:] %}
-                            {% for task in normal_display %}
-                            <div class="task-item normal" onclick="toggleTask(this, '{{ task.id }}', event)">
-                                <input type="checkbox" class="task-checkbox" 
-                                       data-task="{{ task.id }}"
-                                       onclick="event.stopPropagation(); toggleTask(this.closest('.task-item'), '{{ task.id }}', event)">
-                                <div class="task-content">
-                                    <div class="task-text">{{ task.text|replace('\n', '<br>')|safe }}</div>
-                                    {% if task.assignee %}
-                                    <div class="task-assignee">👤 {{ task.assignee }}</div>
-                                    {% endif %}
-                                    {% if task.progress is defined %}
-                                    <div class="task-progress-container">
-                                        <div class="task-progress-bar">
-                                            <div class="task-progress-fill" style="width: {{ task.progress }}%"></div>
-                                        </div>
-                                        <span class="task-progress-text">{{ task.progress }}%</span>
-                                    </div>
-                                    {% endif %}
-                                    {% if task.source %}
-                                    <div class="task-source">📍 {{ task.source }}</div>
-                                    {% endif %}
-                                    {% if task.due_date %}
-                                    <div class="task-meta">
-                                        <span class="task-meta-item">📅 {{ task.due_date }}</span>
-                                    </div>
-                                    {% endif %}
-                                </div>
-                            </div>
-                            {% endfor %}
-                            {% if normal_hidden|length > 0 %}
-                            <div class="expand-btn" onclick="showMore('normal', event)">
-                                查看全部 {{ normal_pending|length }} 个任务 ▼
-                            </div>
-                            <div class="task-list-hidden" id="normal-more">
-                                {% for task in normal_hidden %}
-                                <div class="task-item normal" onclick="toggleTask(this, '{{ task.id }}', event)">
-                                    <input type="checkbox" class="task-checkbox" 
-                                           data-task="{{ task.id }}"
-                                           onclick="event.stopPropagation(); toggleTask(this.closest('.task-item'), '{{ task.id }}', event)">
-                                    <div class="task-content">
-                                        <div class="task-text">{{ task.text|replace('\n', '<br>')|safe }}</div>
-                                        {% if task.source %}
-                                        <div class="task-source">📍 {{ task.source }}</div>
-                                        {% endif %}
-                                    </div>
-                                </div>
-                                {% endfor %}
-                            </div>
-                            {% endif %}
-                        </div>
-                    </div>
-                    {% endif %}
-                    
-                    {% if not urgent_pending and not high_pending and not normal_pending %}
-                    <div class="empty-state">
-                        <div class="empty-icon">🎉</div>
-                        <div class="empty-text">太棒了！所有任务都已完成！</div>
-                    </div>
-                    {% endif %}
-                </div>
-                
-                <!-- 已完成任务 -->
-                <div class="task-section">
-                    <div class="section-header">
-                        <span class="section-icon">✅</span>
-                        <span class="section-title">已完成任务</span>
-                        <span class="section-count">{{ completed_count }}</span>
-                    </div>
-                    
-                    {% if completed_tasks %}
-                    {% for task in completed_tasks[:10] %}
-                    <div class="task-item completed" onclick="toggleTask(this, '{{ task.id }}', event)">
-                        <input type="checkbox" class="task-checkbox" checked
-                               data-task="{{ task.id }}"
-                               onclick="event.stopPropagation(); toggleTask(this.closest('.task-item'), '{{ task.id }}', event)">
-                        <div class="task-content">
-                            <div class="task-text">{{ task.text|replace('\n', '<br>')|safe }}</div>
-                        </div>
-                    </div>
-                    {% endfor %}
-                    {% if completed_tasks|length > 10 %}
-                    <div class="empty-state">
-                        <div class="empty-text">还有 {{ completed_tasks|length - 10 }} 个已完成任务...</div>
-                    </div>
-                    {% endif %}
-                    {% else %}
-                    <div class="empty-state">
-                        <div class="empty-icon">📝</div>
-                        <div class="empty-text">还没有完成的任务</div>
-                    </div>
-                    {% endif %}
-                </div>
-            </div>
-            
-            <!-- 推荐工作 -->
-            {% if recommendations %}
-            <div class="recommendations-section">
-                <div class="section-header">
-                    <span class="section-icon">💡</span>
-                    <span class="section-title">推荐工作</span>
-                    <span class="section-count">{{ recommend_count }}</span>
-                </div>
-                
-                {% for rec in recommendations %}
-                <div class="recommendation-item">
-                    <div class="recommendation-header">
-                        <span class="recommendation-badge">推荐 #{{ rec.num }}</span>
-                        <span class="recommendation-date">{{ rec.date }}</span>
-                    </div>
-                    <div class="recommendation-content">{{ rec.content }}</div>
-                    {% if rec.reason %}
-                    <div class="recommendation-reason">💭 {{ rec.reason }}</div>
-                    {% endif %}
-                </div>
-                {% endfor %}
-            </div>
-            {% endif %}
-        </div>
-        
-        <!-- 任务创建模态框 -->
-        <div id="createTaskModal" class="modal">
-            <div class="modal-content">
-                <div class="modal-header">
-                    <h2 class="modal-title">➕ 创建新任务</h2>
-                    <span class="close" onclick="closeCreateTaskModal()">&times;</span>
-                </div>
-                <form id="createTaskForm" onsubmit="submitCreateTask(event)">
-                    <div class="form-group">
-                        <label class="form-label">任务内容 *</label>
-                        <textarea class="form-textarea" id="task-text" name="text" required placeholder="请输入任务描述..."></textarea>
-                    </div>
-                    <div class="form-group">
-                        <label class="form-label">优先级</label>
-                        <select class="form-select" id="task-priority" name="priority">
-                            <option value="normal">普通</option>
-                            <option value="high">高</option>
-                            <option value="urgent">紧急</option>
-                        </select>
-                    </div>
-                    <div class="form-group">
-                        <label class="form-label">分类</label>
-                        <input type="text" class="form-input" id="task-category" name="category" placeholder="例如：待审核的改变清单">
-                    </div>
-                    <div class="form-group">
-                        <label class="form-label">负责人</label>
-                        <input type="text" class="form-input" id="task-assignee" name="assignee" placeholder="输入负责人姓名">
-                    </div>
-                    <div class="form-group">
-                        <label class="form-label">截止日期</label>
-                        <input type="date" class="form-input" id="task-due-date" name="due_date">
-                    </div>
-                    <div class="form-group">
-                        <label class="form-label">备注</label>
-                        <textarea class="form-textarea" id="task-notes" name="notes" placeholder="可选：添加备注信息..."></textarea>
-                    </div>
-                    <div class="form-actions">
-                        <button type="button" class="btn btn-secondary" onclick="closeCreateTaskModal()">取消</button>
-                        <button type="submit" class="btn btn-primary">创建任务</button>
-                    </div>
-                </form>
-            </div>
-        </div>
-        
-        <script>
-            function toggleTask(element, taskId, event) {
-                if (event) {
-                    event.stopPropagation();
-                }
-                const checkbox = element.querySelector('.task-checkbox');
-                const completed = !checkbox.checked;
-                checkbox.checked = completed;
-                
-                fetch('/api/toggle', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({task_id: taskId, completed: completed})
-                }).then(() => {
-                    setTimeout(() => location.reload(), 300);
-                }).catch(err => {
-                    console.error('Error toggling task:', err);
-                    checkbox.checked = !completed;
-                });
-            }
-            
-            function toggleGroup(element) {
-                const group = element.closest('.task-group');
-                const taskList = group.querySelector('.task-list');
-                const isCollapsed = element.classList.contains('collapsed');
-                
-                if (isCollapsed) {
-                    element.classList.remove('collapsed');
-                    taskList.classList.remove('collapsed');
-                    setTimeout(() => {
-                        taskList.style.maxHeight = taskList.scrollHeight + 'px';
-                    }, 10);
-                } else {
-                    taskList.style.maxHeight = taskList.scrollHeight + 'px';
-                    setTimeout(() => {
-                        taskList.style.maxHeight = '0px';
-                    }, 10);
-                    setTimeout(() => {
-                        element.classList.add('collapsed');
-                        taskList.classList.add('collapsed');
-                    }, 300);
-                }
-            }
-            
-            function showMore(type, event) {
-                if (event) {
-                    event.stopPropagation();
-                }
-                const hiddenList = document.getElementById(type + '-more');
-                const expandBtn = event.target;
-                
-                if (hiddenList && expandBtn) {
-                    hiddenList.classList.add('expanded');
-                    expandBtn.style.display = 'none';
-                }
-            }
-            
-            // 任务创建模态框
-            function showCreateTaskModal() {
-                document.getElementById('createTaskModal').style.display = 'block';
-            }
-            
-            function closeCreateTaskModal() {
-                document.getElementById('createTaskModal').style.display = 'none';
-                document.getElementById('createTaskForm').reset();
-            }
-            
-            // 点击模态框外部关闭
-            window.onclick = function(event) {
-                const modal = document.getElementById('createTaskModal');
-                if (event.target == modal) {
-                    closeCreateTaskModal();
-                }
-            }
-            
-            // 提交创建任务
-            function submitCreateTask(event) {
-                event.preventDefault();
-                
-                const formData = {
-                    text: document.getElementById('task-text').value,
-                    priority: document.getElementById('task-priority').value,
-                    category: document.getElementById('task-category').value,
-                    assignee: document.getElementById('task-assignee').value,
-                    due_date: document.getElementById('task-due-date').value,
-                    notes: document.getElementById('task-notes').value,
-                    creator: 'User'  // 可以从localStorage或cookie获取
-                };
-                
-                fetch('/api/task/create', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify(formData)
-                })
-                .then(response => response.json())
-                .then(data => {
-                    if (data.success) {
-                        closeCreateTaskModal();
-                        setTimeout(() => location.reload(), 300);
-                    } else {
-                        alert('创建任务失败: ' + (data.error || '未知错误'));
-                    }
-                })
-                .catch(err => {
-                    console.error('Error:', err);
-                    alert('创建任务时发生错误');
-                });
-            }
-            
-            // 更新任务进度
-            function updateTaskProgress(taskId, progress) {
-                fetch('/api/task/' + taskId + '/progress', {
-                    method: 'POST',
-                    headers: {'Content-Type': 'application/json'},
-                    body: JSON.stringify({
-                        progress: progress,
-                        user: 'User',
-                        note: 'Progress updated'
-                    })
-                })
-                .then(response => response.json())
-                .then(data => {
-                    if (data.success) {
-                        setTimeout(() => location.reload(), 300);
-                    } else {
-                        alert('更新进度失败: ' + (data.error || '未知错误'));
-                    }
-                })
-                .catch(err => {
-                    console.error('Error:', err);
-                    alert('更新进度时发生错误');
-                });
-            }
-            
-            // 筛选功能
-            function applyFilters() {
-                const assignee = document.getElementById('filter-assignee')?.value || '';
-                const status = document.getElementById('filter-status')?.value || '';
-                const priority = document.getElementById('filter-priority')?.value || '';
-                
-                // 简单的客户端筛选（如果需要服务器端筛选，可以调用API）
-                const taskItems = document.querySelectorAll('.task-item');
-                taskItems.forEach(item => {
-                    let show = true;
-                    
-                    if (assignee) {
-                        const assigneeText = item.querySelector('.task-assignee')?.textContent || '';
-                        if (!assigneeText.includes(assignee)) {
-                            show = false;
-                        }
-                    }
-                    
-                    if (status) {
-                        const isCompleted = item.classList.contains('completed');
-                        if (status === 'completed' && !isCompleted) show = false;
-                        if (status === 'pending' && isCompleted) show = false;
-                        if (status === 'in_progress' && (isCompleted || !item.querySelector('.task-progress-container'))) show = false;
-                    }
-                    
-                    if (priority) {
-                        const priorityClass = item.classList.contains(priority) || 
-                                            (priority === 'urgent' && item.classList.contains('urgent')) ||
-                                            (priority === 'high' && item.classList.contains('high')) ||
-                                            (priority === 'normal' && item.classList.contains('normal'));
-                        if (!priorityClass) show = false;
-                    }
-                    
-                    item.style.display = show ? 'flex' : 'none';
-                });
-            }
-            
-            // 初始化：展开紧急任务组
-            document.addEventListener('DOMContentLoaded', function() {
-                const allGroups = document.querySelectorAll('.task-group');
-                allGroups.forEach(function(group) {
-                    const title = group.querySelector('.group-title');
-                    const list = group.querySelector('.task-list');
-                    if (title && list) {
-                        // 如果标题包含"紧急"，默认展开
-                        if (title.textContent.includes('紧急')) {
-                            title.classList.remove('collapsed');
-                            list.classList.remove('collapsed');
-                            list.style.maxHeight = list.scrollHeight + 'px';
-                        }
-                    }
-                });
-            });
-        </script>
-    </body>
-    </html>
-    """
+    users = get_users() if use_database() else []
     
-    return render_template_string(html,
+    return render_template('index.html',
         update_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-        urgent_pending=urgent_pending,
-        high_pending=high_pending,
-        normal_pending=normal_pending,
-        completed_tasks=completed_tasks,
-        urgent_count=len(urgent_pending),
-        total_pending=total_pending,
-        completed_count=len(completed_tasks),
+        urgent_pending=groups['urgent'],
+        high_pending=groups['high'],
+        normal_pending=groups['normal'],
+        completed_tasks=groups['completed'],
+        high_hidden=hidden['high'],
+        normal_hidden=hidden['normal'],
+        next_cursors=next_cursors,
         recommendations=recommendations,
         recommend_count=len(recommendations),
-        completion_rate=round(completion_rate, 1),
-        users=users
+        users=users,
+        change_version=change_version,
+        changes_stream=current_app.config['CHANGES_STREAM'],
+        **counts
     )
 
-@app.route('/api/toggle', methods=['POST'])
+@bp.route('/api/toggle', methods=['POST'])
 def toggle_task():
     """切换任务状态（兼容旧版本）"""
     data = request.json
@@ -1832,33 +449,32 @@ def toggle_task():
     if not task_id:
         return jsonify({'success': False, 'error': 'Missing task_id'}), 400
     
-    if USE_DATABASE:
+    if use_database():
         try:
             progress = 100 if completed else 0
-            result = update_task_progress(task_id, progress, user='User', note='Toggled status')
-            return jsonify(result)
+            result = update_task_progress(task_id, progress, user='User', note=TOGGLE_NOTE)
+            return jsonify(with_task_and_stats(result, task_id))
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)}), 500
     else:
         # 旧版本：使用JSON文件
-        status = load_status()
-        
         # 如果传入的是旧格式（任务文本），尝试转换为ID
         if len(task_id) > 32:
-            tasks = read_markdown_tasks(TODO_FILE) if TODO_FILE else []
+            tasks = read_markdown_tasks_cached(current_app.config['TODO_FILE'])
             for task in tasks:
                 if task['text'] == task_id:
                     task_id = task['id']
                     break
         
-        status[task_id] = completed
-        save_status(status)
-        return jsonify({'success': True})
+        app_state()['status_store'].set(task_id, completed)
+        tasks = load_legacy_tasks()
+        task = next((t for t in tasks if t['id'] == task_id), None)
+        return jsonify({'success': True, 'task': task, 'stats': count_tasks(tasks)})
 
-@app.route('/api/task/create', methods=['POST'])
+@bp.route('/api/task/create', methods=['POST'])
 def create_task_api():
     """创建新任务"""
-    if not USE_DATABASE:
+    if not use_database():
         return jsonify({'success': False, 'error': 'Database not available'}), 503
     
     data = request.json
@@ -1885,14 +501,14 @@ def create_task_api():
             due_date=due_date if due_date else None,
             notes=notes
         )
-        return jsonify(result)
+        return jsonify(with_task_and_stats(result, result.get('task_id')))
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/task/<task_id>/progress', methods=['POST'])
+@bp.route('/api/task/<task_id>/progress', methods=['POST'])
 def update_progress_api(task_id):
     """更新任务进度"""
-    if not USE_DATABASE:
+    if not use_database():
         return jsonify({'success': False, 'error': 'Database not available'}), 503
     
     data = request.json
@@ -1903,14 +519,33 @@ def update_progress_api(task_id):
     try:
         progress = max(0, min(100, int(progress)))  # 限制在0-100之间
         result = update_task_progress(task_id, progress, user=user, note=note)
-        return jsonify(result)
+        return jsonify(with_task_and_stats(result, task_id))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/tasks/batch', methods=['POST'])
+def batch_update_api():
+    """批量更新任务进度/字段（单个事务，返回逐项结果）"""
+    if not use_database():
+        return jsonify({'success': False, 'error': 'Database not available'}), 503
+    
+    data = request.json or {}
+    changes = data.get('changes')
+    if not isinstance(changes, list) or not all(isinstance(c, dict) for c in changes):
+        return jsonify({'success': False, 'error': 'changes must be a list of objects'}), 400
+    if len(changes) > MAX_BATCH_SIZE:
+        return jsonify({'success': False, 'error': f'Too many changes (max {MAX_BATCH_SIZE})'}), 400
+    
+    try:
+        results = apply_task_changes(changes, user=data.get('user', 'User'))
+        return jsonify({'success': all(r['success'] for r in results), 'results': results})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/task/<task_id>/update', methods=['POST'])
+@bp.route('/api/task/<task_id>/update', methods=['POST'])
 def update_task_api(task_id):
     """更新任务信息"""
-    if not USE_DATABASE:
+    if not use_database():
         return jsonify({'success': False, 'error': 'Database not available'}), 503
     
     data = request.json
@@ -1920,23 +555,23 @@ def update_task_api(task_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/task/<task_id>/updates', methods=['GET'])
+@bp.route('/api/task/<task_id>/updates', methods=['GET'])
 def get_task_updates_api(task_id):
     """获取任务更新历史"""
-    if not USE_DATABASE:
+    if not use_database():
         return jsonify({'success': False, 'error': 'Database not available'}), 503
     
     try:
         limit = request.args.get('limit', 10, type=int)
-        updates = get_task_updates(task_id, limit=limit)
+        updates = [update.to_dict() for update in get_task_updates(task_id, limit=limit)]
         return jsonify({'success': True, 'updates': updates})
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/task/<task_id>', methods=['DELETE'])
+@bp.route('/api/task/<task_id>', methods=['DELETE'])
 def delete_task_api(task_id):
     """删除任务"""
-    if not USE_DATABASE:
+    if not use_database():
         return jsonify({'success': False, 'error': 'Database not available'}), 503
     
     try:
@@ -1945,10 +580,10 @@ def delete_task_api(task_id):
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-@app.route('/api/users', methods=['GET'])
+@bp.route('/api/users', methods=['GET'])
 def get_users_api():
     """获取用户列表"""
-    if not USE_DATABASE:
+    if not use_database():
         return jsonify({'success': False, 'error': 'Database not available'}), 503
     
     try:
@@ -1957,29 +592,187 @@ def get_users_api():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
-def open_browser():
-    """延迟打开浏览器（仅本地开发时使用）"""
-    if os.environ.get('VERCEL'):
-        return  # Vercel 环境中不执行
-    import time
-    import webbrowser
-    time.sleep(1.5)
-    webbrowser.open('http://127.0.0.1:5000')
+def int_arg(args, name, default=None):
+    """查询参数转为整数，缺少或格式错误时返回 default"""
+    try:
+        return int(args[name])
+    except (KeyError, TypeError, ValueError):
+        return default
+
+def task_page_args(args=None):
+    """分页接口的查询参数：(筛选条件, 排序, 顺序, 每页条数, 游标)
+
+    args 为查询参数映射，默认使用当前请求的 request.args（async_api 传入 ASGI 请求的参数）。
+    """
+    if args is None:
+        args = request.args
+    filters = {
+        'status': args.get('status'),
+        'assignee': args.get('assignee'),
+        'priority': args.get('priority'),
+        'progress_min': int_arg(args, 'progress_min'),
+        'progress_max': int_arg(args, 'progress_max'),
+        # completed=1 只返回已完成任务，completed=0 只返回未完成任务
+        'completed': int_arg(args, 'completed'),
+    }
+    sort = args.get('sort', 'priority')
+    order = args.get('order', 'desc')
+    limit = max(1, min(200, int_arg(args, 'limit', 50)))
+    cursor = args.get('cursor')
+    return filters, sort, order, limit, cursor
+
+@bp.route('/api/tasks', methods=['GET'])
+def get_tasks_api():
+    """分页获取任务（服务端筛选、排序和游标分页）"""
+    if not use_database():
+        return jsonify({'success': False, 'error': 'Database not available'}), 503
+    
+    filters, sort, order, limit, cursor = task_page_args()
+    try:
+        page = get_tasks_page(filters, sort=sort, order=order, limit=limit, cursor=cursor)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    tasks = tasks_to_dicts(page['tasks'])
+    return jsonify({'success': True, 'tasks': tasks, 'next_cursor': page['next_cursor']})
+
+@bp.route('/api/tasks/search', methods=['GET'])
+def search_tasks_api():
+    """全文搜索任务（按相关度排序，snippet 为高亮后的 HTML 摘要）"""
+    if not use_database():
+        return jsonify({'success': False, 'error': 'Database not available'}), 503
+    
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'success': False, 'error': 'Missing query'}), 400
+    limit = max(1, min(100, request.args.get('limit', 20, type=int)))
+    
+    try:
+        tasks = search_tasks(query, limit=limit)
+        return jsonify({'success': True, 'tasks': tasks})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/stats', methods=['GET'])
+def get_stats_api():
+    """获取任务统计（总数、完成率、各优先级待办数、按负责人汇总）"""
+    if not use_database():
+        return jsonify({'success': False, 'error': 'Database not available'}), 503
+    
+    try:
+        return jsonify({'success': True, 'stats': get_task_stats()})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/sync', methods=['POST'])
+def sync_api():
+    """立即从 GitHub 同步；allow_mass_removal=1 时确认删除保护跳过的大量删除"""
+    if not current_app.config['GITHUB_SYNC']:
+        return jsonify({'success': False, 'error': 'GitHub sync is not enabled'}), 400
+    if not use_database():
+        return jsonify({'success': False, 'error': 'Database not available'}), 503
+    
+    changed = sync_tasks_from_github(force=True, allow_mass_removal=request.args.get('allow_mass_removal') == '1')
+    return jsonify({'success': True, 'changed': changed})
 
-# Vercel需要导出app对象
-@app.route('/debug')
+# 变更推送（SSE）：数据库轮询间隔、心跳间隔，以及单个连接的最长时长
+# （到时断开，浏览器会带上 Last-Event-ID 自动重连，避免长期占用工作线程）
+CHANGES_POLL_INTERVAL = float(os.environ.get('TODO_CHANGES_POLL_INTERVAL', '1'))
+CHANGES_HEARTBEAT_SECONDS = 15
+CHANGES_STREAM_SECONDS = int(os.environ.get('TODO_CHANGES_STREAM_SECONDS', '300'))
+
+def changes_payload(since):
+    """since 之后的变更；有变更时附上最新的头部计数"""
+    changes = get_changes(since)
+    changed = bool(changes['tasks'] or changes['deleted'] or changes['reset'])
+    return {
+        'success': True,
+        'version': changes['version'],
+        'tasks': tasks_to_dicts(changes['tasks']),
+        'deleted': changes['deleted'],
+        'more': changes['more'],
+        'reset': changes['reset'],
+        'stats': database_counts() if changed else None
+    }
+
+@bp.route('/api/changes', methods=['GET'])
+def get_changes_api():
+    """获取 since 版本之后变更的任务（不带 since 时只返回当前版本号）"""
+    if not use_database():
+        return jsonify({'success': False, 'error': 'Database not available'}), 503
+    
+    since = request.args.get('since', type=int)
+    try:
+        if since is None:
+            return jsonify({'success': True, 'version': get_change_version(), 'tasks': [], 'deleted': [],
+                            'more': False, 'reset': False, 'stats': None})
+        return jsonify(changes_payload(max(0, since)))
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@bp.route('/api/changes/stream', methods=['GET'])
+def stream_changes_api():
+    """以 Server-Sent Events 推送任务变更（事件名 changes，id 为版本号）"""
+    if not use_database():
+        return jsonify({'success': False, 'error': 'Database not available'}), 503
+    if not current_app.config['CHANGES_STREAM']:
+        return jsonify({'success': False, 'error': 'Change stream is disabled, poll /api/changes'}), 404
+    
+    # 断线重连时浏览器会带上最后收到的事件 id
+    since = request.headers.get('Last-Event-ID', type=int)
+    if since is None:
+        since = request.args.get('since', type=int)
+    if since is None:
+        since = get_change_version()
+    
+    def generate(since):
+        yield 'retry: 3000\n\n'
+        deadline = time.monotonic() + CHANGES_STREAM_SECONDS
+        last_sent = time.monotonic()
+        while time.monotonic() < deadline:
+            try:
+                payload = changes_payload(since)
+            except Exception as e:
+                logger.warning("Change stream query failed", extra={"data": {"error": str(e)}})
+                return
+            if payload['stats'] is not None:
+                since = payload['version']
+                yield f"id: {since}\nevent: changes\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+                last_sent = time.monotonic()
+                if payload['reset']:
+                    return
+                if payload['more']:
+                    continue
+            elif time.monotonic() - last_sent >= CHANGES_HEARTBEAT_SECONDS:
+                yield ': keepalive\n\n'
+                last_sent = time.monotonic()
+            time.sleep(CHANGES_POLL_INTERVAL)
+    
+    # 连接数达到上限时拒绝（EventSource 收到非 200 响应后不再重连，页面改为轮询）
+    streams = app_state()['change_streams']
+    if not streams.acquire(blocking=False):
+        return jsonify({'success': False, 'error': 'Too many change streams, poll /api/changes'}), 503
+    response = Response(generate(max(0, since)), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    response.call_on_close(streams.release)
+    return response
+
+@bp.route('/debug')
 def debug_info():
     """调试信息页面"""
+    config = current_app.config
     debug_info = {
-        'USE_DATABASE': USE_DATABASE,
+        'USE_DATABASE': use_database(),
         'VERCEL': bool(os.environ.get('VERCEL')),
-        'TODO_FILE': str(TODO_FILE) if TODO_FILE else None,
-        'STATUS_FILE': str(STATUS_FILE) if STATUS_FILE else None,
+        'GITHUB_SYNC': config['GITHUB_SYNC'],
+        'TODO_FILE': str(config['TODO_FILE']) if config['TODO_FILE'] else None,
+        'STATUS_FILE': str(config['STATUS_FILE']) if config['STATUS_FILE'] else None,
     }
     
     # 尝试获取数据库任务
     task_count = 0
-    if USE_DATABASE:
+    if use_database():
         try:
             tasks = get_all_tasks()
             task_count = len(tasks) if tasks else 0
@@ -1989,10 +782,9 @@ def debug_info():
     
     # 尝试从 GitHub 获取文件（仅测试）
     github_test = {}
-    if os.environ.get('VERCEL'):
+    if config['GITHUB_SYNC']:
         try:
-            test_paths = ["圆心工作/工作待办清单.md", "工作待办清单.md"]
-            for path in test_paths:
+            for path in config['GITHUB_TASK_PATHS']:
                 content = fetch_from_github(path)
                 if content:
                     github_test[path] = {
@@ -2007,6 +799,8 @@ def debug_info():
             github_test['error'] = str(e)
     
     debug_info['github_test'] = github_test
+    debug_info['parse_cache'] = parse_cache.stats()
+    debug_info['status_store'] = app_state()['status_store'].stats()
     
     # 格式化输出
     html = f"""
@@ -2032,6 +826,7 @@ def debug_info():
             <h2>环境变量</h2>
             <p><span class="key">USE_DATABASE:</span> <span class="value">{debug_info['USE_DATABASE']}</span></p>
             <p><span class="key">VERCEL:</span> <span class="value">{debug_info['VERCEL']}</span></p>
+            <p><span class="key">GITHUB_SYNC:</span> <span class="value">{debug_info['GITHUB_SYNC']}</span></p>
             <p><span class="key">TODO_FILE:</span> <span class="value">{debug_info['TODO_FILE']}</span></p>
             <p><span class="key">STATUS_FILE:</span> <span class="value">{debug_info['STATUS_FILE']}</span></p>
         </div>
@@ -2058,15 +853,19 @@ def debug_info():
     """
     return html
 
-# 本地开发时运行服务器
-if __name__ == '__main__':
-    # 检查是否在Vercel环境
-    if not os.environ.get('VERCEL'):
-        # 本地开发模式
-        import threading
-        threading.Thread(target=open_browser, daemon=True).start()
-        app.run(debug=False, port=5000, use_reloader=False)
-    else:
-        # Vercel环境，不需要启动服务器
-        pass
+def open_browser(url):
+    """延迟打开浏览器（等服务器开始监听）"""
+    import webbrowser
+    time.sleep(1.5)
+    webbrowser.open(url)
 
+def run_app(app):
+    """用内置服务器运行应用（桌面版），OPEN_BROWSER 为 True 时自动打开浏览器"""
+    host, port = app.config['HOST'], app.config['PORT']
+    if app.config['OPEN_BROWSER']:
+        threading.Thread(target=open_browser, args=(f'http://{host}:{port}',), daemon=True).start()
+    app.run(host=host, port=port, debug=False, use_reloader=False)
+
+# 本地开发时运行服务器（Vercel 通过 api/index.py 导入应用，不会执行这里）
+if __name__ == '__main__':
+    run_app(create_app(DesktopConfig))
@@ -0,0 +1,102 @@
+# app_logging.py - 结构化、非阻塞的应用日志
+#
+# 请求线程只把日志记录放进内存队列，由后台线程写入各个输出端，
+# 不会在请求路径上做同步磁盘 I/O。通过环境变量配置：
+#   TODO_LOG_LEVEL        日志级别（默认 WARNING，调试时设为 DEBUG）
+#   TODO_LOG_SINKS        输出端，逗号分隔：stderr、stdout、file:<路径>（默认 stderr）
+#   TODO_LOG_SAMPLE_RATE  DEBUG/INFO 日志的采样比例 0-1（默认 1，WARNING 及以上始终记录）
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime
+
+LOGGER_NAME = 'todo_app'
+
+_listener = None
+
+class JsonFormatter(logging.Formatter):
+    """每条日志输出为一行 JSON，附加数据放在 data 字段"""
+    
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).strftime('%Y-%m-%d %H:%M:%S.%f')[:-3],
+            'level': record.levelname,
+            'logger': record.name,
+            'location': f'{record.module}:{record.lineno}',
+            'message': record.getMessage(),
+        }
+        data = getattr(record, 'data', None)
+        if data is not None:
+            entry['data'] = data
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class SamplingFilter(logging.Filter):
+    """按比例采样 DEBUG/INFO 日志，WARNING 及以上全部保留"""
+    
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+    
+    def filter(self, record):
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+def _build_sink(spec):
+    """根据配置创建输出端 Handler"""
+    spec = spec.strip()
+    if spec == 'stderr':
+        return logging.StreamHandler(sys.stderr)
+    if spec == 'stdout':
+        return logging.StreamHandler(sys.stdout)
+    if spec.startswith('file:'):
+        path = spec[len('file:'):]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        return logging.FileHandler(path, encoding='utf-8', delay=True)
+    raise ValueError(f'Unknown log sink: {spec}')
+
+def setup_logging():
+    """按环境变量配置日志管道（重复调用不会重复配置），返回应用 logger"""
+    global _listener
+    logger = logging.getLogger(LOGGER_NAME)
+    if _listener is not None:
+        return logger
+    
+    level = os.environ.get('TODO_LOG_LEVEL', 'WARNING').upper()
+    sinks = os.environ.get('TODO_LOG_SINKS', 'stderr')
+    rate = float(os.environ.get('TODO_LOG_SAMPLE_RATE', '1'))
+    
+    formatter = JsonFormatter()
+    handlers = []
+    for spec in sinks.split(','):
+        if not spec.strip():
+            continue
+        try:
+            handler = _build_sink(spec)
+        except (ValueError, OSError) as e:
+            print(f"Warning: log sink '{spec}' unavailable: {e}", file=sys.stderr)
+            continue
+        handler.setFormatter(formatter)
+        handlers.append(handler)
+    
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    if rate < 1:
+        queue_handler.addFilter(SamplingFilter(rate))
+    
+    logger.setLevel(level)
+    logger.addHandler(queue_handler)
+    logger.propagate = False
+    
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    # 进程退出前把队列中剩余的日志写完
+    atexit.register(_listener.stop)
+    return logger
+
+def get_logger():
+    """获取应用 logger（首次调用时完成配置）"""
+    return setup_logging()
@@ -0,0 +1,312 @@
+# async_api.py - 异步任务 API（ASGI 应用，可选）
+#
+# create_asgi_app() 返回一个 Starlette ASGI 应用：/api/async/... 由原生 async 视图处理，
+# 其余路径（页面、同步接口、SSE）交给同一个 Flask 应用，由 a2wsgi 在线程池中运行。
+# 在 ASGI 服务器上运行（python serve.py --server uvicorn）：
+#   - 异步接口在等待数据库和 GitHub 时不占用线程，每个 worker 进程的事件循环同时处理所有异步请求
+#   - 页面和同步接口仍各占用线程池中的一个线程（TODO_WSGI_THREADS，SSE 连接也在其中）
+# 接口与同步版本（/api/stats、/api/tasks、/api/task/<id>/progress）返回相同的 JSON：
+#   - 数据库使用 aiosqlite：一个读连接（WAL 模式下读不阻塞写），一个写连接
+#     （asyncio.Lock 让本进程的写事务依次执行，跨进程仍由 SQLite 的写锁排队）
+#   - GitHub 使用 httpx.AsyncClient（AsyncGitHubFetcher，与同步版本共用 ETag 缓存）；
+#     开启 GITHUB_SYNC 时读接口到达同步间隔后在后台发起同步（协程），不等待 GitHub 返回
+#   - 连接和客户端属于服务器的事件循环，首次使用时创建，跨请求复用
+# 需要安装 starlette、a2wsgi、aiosqlite、httpx 以及 ASGI 服务器 uvicorn
+# （pip install starlette a2wsgi aiosqlite httpx uvicorn）。对比测试见 benchmark_async.py。
+import asyncio
+import os
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime
+from functools import partial
+
+import database
+from app import (
+    SNAPSHOT_CONFLICT_ERROR, SYNC_INTERVAL_SECONDS, create_app, ensure_database, stats_counts, task_page_args,
+    upload_snapshot
+)
+from database import (
+    CONNECTION_PRAGMAS, INSERT_TASK_UPDATE_SQL, TASK_COLUMNS, TASK_STATS_SQL, UPDATE_PROGRESS_SQL, Task,
+    build_tasks_page_query, finish_tasks_page, status_for_progress, summarize_task_stats, sync_markdown_tasks,
+    tasks_to_dicts
+)
+from github_fetcher import AsyncGitHubFetcher
+from markdown_parser import parse_markdown_tasks
+
+try:
+    from starlette.applications import Starlette
+    from starlette.background import BackgroundTask
+    from starlette.responses import JSONResponse
+    from starlette.routing import Mount, Route
+except ImportError:  # starlette 为可选依赖
+    Starlette = None
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:  # a2wsgi 为可选依赖
+    WSGIMiddleware = None
+
+try:
+    import aiosqlite
+except ImportError:  # aiosqlite 为可选依赖
+    aiosqlite = None
+
+try:
+    import httpx
+except ImportError:  # httpx 为可选依赖
+    httpx = None
+
+# 运行 Flask 应用（页面、同步接口、SSE）的线程数
+WSGI_THREADS = int(os.environ.get('TODO_WSGI_THREADS', '8'))
+
+class AsyncRuntime:
+    """一个 ASGI 应用的运行状态：对应的 Flask 应用，以及属于事件循环的数据库连接和 GitHub 客户端"""
+
+    def __init__(self, flask_app):
+        self.flask_app = flask_app
+        self.config = flask_app.config
+        self._ready = False
+        self._reader = None
+        self._writer = None
+        self._db_file = None
+        self._connect_lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
+        self._fetcher = None
+        self.sync_task = None
+
+    async def ensure_database(self):
+        """第一个请求时初始化数据库（迁移在线程中执行，不阻塞事件循环），返回是否使用数据库"""
+        if not self._ready:
+            def init():
+                with self.flask_app.app_context():
+                    ensure_database()
+            await asyncio.to_thread(init)
+            self._ready = True
+        return self.config['USE_DATABASE']
+
+    async def _connect(self):
+        conn = await aiosqlite.connect(database.DB_FILE, timeout=database.BUSY_TIMEOUT_MS / 1000,
+                                       isolation_level=None)
+        for pragma in CONNECTION_PRAGMAS:
+            await conn.execute(pragma)
+        return conn
+
+    async def connections(self):
+        """返回 (读连接, 写连接)，数据库文件变化时重新连接"""
+        async with self._connect_lock:
+            if self._reader is None or self._db_file != database.DB_FILE:
+                await self._close_connections()
+                self._reader = await self._connect()
+                self._writer = await self._connect()
+                self._db_file = database.DB_FILE
+        return self._reader, self._writer
+
+    async def _close_connections(self):
+        for conn in (self._reader, self._writer):
+            if conn is not None:
+                await conn.close()
+        self._reader = self._writer = None
+
+    @asynccontextmanager
+    async def transaction(self):
+        """写事务（BEGIN IMMEDIATE，出现异常时回滚）"""
+        _, writer = await self.connections()
+        async with self._write_lock:
+            await writer.execute('BEGIN IMMEDIATE')
+            try:
+                yield writer
+            except BaseException:
+                await writer.execute('ROLLBACK')
+                raise
+            await writer.execute('COMMIT')
+
+    def fetcher(self):
+        """本应用仓库的 AsyncGitHubFetcher（客户端属于本事件循环）"""
+        if self._fetcher is None:
+            self._fetcher = AsyncGitHubFetcher(self.config['GITHUB_REPO_OWNER'], self.config['GITHUB_REPO_NAME'],
+                                               ref=self.config['GITHUB_BRANCH'])
+        return self._fetcher
+
+    async def close(self):
+        """关闭数据库连接和 GitHub 客户端（服务器关闭时调用）"""
+        await self._close_connections()
+        if self._fetcher is not None:
+            await self._fetcher.aclose()
+
+async def query_tasks(runtime, query, params=()):
+    reader, _ = await runtime.connections()
+    async with reader.execute(query, params) as cursor:
+        rows = await cursor.fetchall()
+    return [tuple.__new__(Task, row) for row in rows]
+
+async def get_task(runtime, task_id):
+    tasks = await query_tasks(runtime, f'SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?', (task_id,))
+    return tasks[0] if tasks else None
+
+async def get_task_stats(runtime):
+    reader, _ = await runtime.connections()
+    async with reader.execute(TASK_STATS_SQL) as cursor:
+        return summarize_task_stats(await cursor.fetchall())
+
+async def get_tasks_page(runtime, filters=None, sort='priority', order='desc', limit=50, cursor=None):
+    query, params, columns = build_tasks_page_query(filters, sort, order, limit, cursor)
+    return finish_tasks_page(await query_tasks(runtime, query, params), limit, columns)
+
+async def update_task_progress(runtime, task_id, progress, user='System', note=''):
+    """更新任务进度（与 database.update_task_progress 相同）"""
+    async with runtime.transaction() as conn:
+        async with conn.execute('SELECT id FROM tasks WHERE id = ?', (task_id,)) as cursor:
+            if await cursor.fetchone() is None:
+                return {'success': False, 'error': 'Task not found'}
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        new_status = status_for_progress(progress)
+        await conn.execute(UPDATE_PROGRESS_SQL, (progress, new_status, now, task_id))
+        await conn.execute(INSERT_TASK_UPDATE_SQL, (task_id, user, progress, new_status, note, now))
+    return {'success': True}
+
+async def sync_from_github(fetcher, paths, source_prefix, allow_mass_removal=False):
+    """从 GitHub 读取任务清单并增量同步到数据库，有任务变化时返回 True"""
+    try:
+        path, content = await fetcher.fetch_first(paths)
+        if not content:
+            print("Could not fetch tasks from GitHub")
+            return False
+        # 解析和写入是 CPU + 同步 SQLite 操作，放到线程池中执行，不占用事件循环
+        result = await asyncio.to_thread(partial(sync_markdown_tasks, f'{source_prefix}:{path}', content,
+                                                 parse_markdown_tasks, allow_mass_removal=allow_mass_removal))
+    except Exception as e:
+        print(f"Error syncing from GitHub: {e}")
+        return False
+    if result['unchanged']:
+        return False
+    print(f"Synced from GitHub: {result['added']} added, {result['removed']} removed, {result['changed']} changed")
+    return result['added'] + result['removed'] + result['changed'] > 0
+
+def schedule_github_sync(runtime, force=False, allow_mass_removal=False):
+    """在后台发起 GitHub 同步（不等待结果），返回同步任务；未开启同步或未到间隔时返回 None
+
+    同步间隔与 Flask 应用共用（app.extensions['todo'] 中的 last_sync_at），已有同步在进行时返回该任务。
+    """
+    config = runtime.config
+    if not config['GITHUB_SYNC'] or not config['USE_DATABASE']:
+        return None
+    # 确认删除的同步不复用进行中的普通同步（两次同步在数据库写锁上依次执行）
+    if runtime.sync_task is not None and not runtime.sync_task.done() and not allow_mass_removal:
+        return runtime.sync_task
+    state = runtime.flask_app.extensions['todo']
+    now = time.monotonic()
+    if not force and now - state['last_sync_at'] < SYNC_INTERVAL_SECONDS:
+        return None
+    state['last_sync_at'] = now
+    source_prefix = f"github:{config['GITHUB_REPO_OWNER']}/{config['GITHUB_REPO_NAME']}@{config['GITHUB_BRANCH']}"
+    runtime.sync_task = asyncio.get_running_loop().create_task(
+        sync_from_github(runtime.fetcher(), list(config['GITHUB_TASK_PATHS']), source_prefix, allow_mass_removal))
+    return runtime.sync_task
+
+def error_response(message, status_code):
+    return JSONResponse({'success': False, 'error': message}, status_code=status_code)
+
+async def get_stats_api(request):
+    """获取任务统计（异步）"""
+    runtime = request.app.state.runtime
+    if not await runtime.ensure_database():
+        return error_response('Database not available', 503)
+
+    schedule_github_sync(runtime)
+    try:
+        return JSONResponse({'success': True, 'stats': await get_task_stats(runtime)})
+    except Exception as e:
+        return error_response(str(e), 500)
+
+async def get_tasks_api(request):
+    """分页获取任务（异步，参数与 /api/tasks 相同）"""
+    runtime = request.app.state.runtime
+    if not await runtime.ensure_database():
+        return error_response('Database not available', 503)
+
+    schedule_github_sync(runtime)
+    filters, sort, order, limit, cursor = task_page_args(request.query_params)
+    try:
+        page = await get_tasks_page(runtime, filters, sort=sort, order=order, limit=limit, cursor=cursor)
+    except ValueError as e:
+        return error_response(str(e), 400)
+    except Exception as e:
+        return error_response(str(e), 500)
+    tasks = tasks_to_dicts(page['tasks'])
+    return JSONResponse({'success': True, 'tasks': tasks, 'next_cursor': page['next_cursor']})
+
+async def update_progress_api(request):
+    """更新任务进度（异步），成功时附上更新后的任务和头部计数"""
+    runtime = request.app.state.runtime
+    if not await runtime.ensure_database():
+        return error_response('Database not available', 503)
+    # 与同步接口相同：快照冲突未解决时拒绝写入，写入后在响应发送完成后保存快照
+    store = database.get_snapshot_store()
+    if store is not None and await asyncio.to_thread(database.snapshot_conflict):
+        return error_response(SNAPSHOT_CONFLICT_ERROR, 409)
+
+    try:
+        data = await request.json()
+    except ValueError:
+        return error_response('Invalid JSON', 400)
+    task_id = request.path_params['task_id']
+    try:
+        progress = max(0, min(100, int(data.get('progress', 0))))
+        result = await update_task_progress(runtime, task_id, progress, user=data.get('user', 'User'),
+                                            note=data.get('note', ''))
+        if result['success']:
+            task, stats = await asyncio.gather(get_task(runtime, task_id), get_task_stats(runtime))
+            result = dict(result, task=task.to_dict() if task else None, stats=stats_counts(stats))
+    except Exception as e:
+        return error_response(str(e), 500)
+    background = None
+    if store is not None:
+        background = BackgroundTask(upload_snapshot, runtime.config['SNAPSHOT_INTERVAL'])
+    return JSONResponse(result, background=background)
+
+async def sync_api(request):
+    """立即从 GitHub 同步（wait=0 时只在后台发起，返回 202；allow_mass_removal=1 与 /api/sync 相同）"""
+    runtime = request.app.state.runtime
+    if not runtime.config['GITHUB_SYNC']:
+        return error_response('GitHub sync is not enabled', 400)
+    if not await runtime.ensure_database():
+        return error_response('Database not available', 503)
+
+    task = schedule_github_sync(runtime, force=True,
+                                allow_mass_removal=request.query_params.get('allow_mass_removal') == '1')
+    if request.query_params.get('wait', '1') == '0':
+        return JSONResponse({'success': True, 'scheduled': True}, status_code=202)
+    changed = await asyncio.shield(task)
+    return JSONResponse({'success': True, 'changed': changed})
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await app.state.runtime.close()
+
+def missing_dependencies():
+    """未安装的可选依赖"""
+    return [name for name, module in (('starlette', Starlette), ('a2wsgi', WSGIMiddleware),
+                                      ('aiosqlite', aiosqlite), ('httpx', httpx)) if module is None]
+
+def create_asgi_app(config=None):
+    """创建 ASGI 应用：/api/async 为异步接口，其余请求交给 create_app(config) 创建的 Flask 应用
+
+    缺少可选依赖时抛出 ImportError。
+    """
+    missing = missing_dependencies()
+    if missing:
+        raise ImportError(f"async API requires {', '.join(missing)} (pip install starlette a2wsgi aiosqlite httpx)")
+
+    flask_app = create_app(config)
+    app = Starlette(routes=[
+        Mount('/api/async', routes=[
+            Route('/stats', get_stats_api),
+            Route('/tasks', get_tasks_api),
+            Route('/task/{task_id}/progress', update_progress_api, methods=['POST']),
+            Route('/sync', sync_api, methods=['POST']),
+        ]),
+        Mount('/', app=WSGIMiddleware(flask_app, workers=WSGI_THREADS)),
+    ], lifespan=lifespan)
+    app.state.runtime = AsyncRuntime(flask_app)
+    return app
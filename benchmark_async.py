@@ -0,0 +1,55 @@
+# benchmark_async.py - 同步接口与异步接口（/api/async，见 async_api.py）的并发对比
+#
+# 用 serve.py --server uvicorn 启动 ASGI 应用（需要安装 starlette、a2wsgi、aiosqlite、httpx、uvicorn），
+# 对每组等价的同步/异步接口使用相同的并发客户端压测，输出每秒请求数和延迟：
+#   python benchmark_async.py --clients 16 --seconds 5
+# 两组接口运行在同一个服务器进程中：同步接口由 a2wsgi 线程池中的 Flask 处理（--threads 个线程），
+# 异步接口在事件循环中处理；GitHub 同步不开启，两边做同样的数据库工作。
+import argparse
+import multiprocessing
+import subprocess
+import tempfile
+
+from benchmark_load import fetch_task_ids, run_scenario, start_server, wait_until_ready, GRACEFUL_WAIT
+
+# (名称, 同步接口, 异步接口)
+PAIRS = [
+    ('stats', ('GET', '/api/stats'), ('GET', '/api/async/stats')),
+    ('tasks', ('GET', '/api/tasks?limit=50'), ('GET', '/api/async/tasks?limit=50')),
+    ('progress (write)', ('POST', '/api/task/{task_id}/progress'), ('POST', '/api/async/task/{task_id}/progress')),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the sync and async task API under concurrent clients')
+    parser.add_argument('--server', default='uvicorn', help='serve.py --server (an ASGI server: uvicorn)')
+    parser.add_argument('--workers', type=int, help='serve.py --workers')
+    parser.add_argument('--threads', type=int, help='serve.py --threads')
+    parser.add_argument('--tasks', type=int, default=500, help='number of generated tasks')
+    parser.add_argument('--clients', type=int, default=8, help='concurrent client processes')
+    parser.add_argument('--seconds', type=float, default=5, help='duration of each scenario')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_url, process = start_server(args, tmp)
+        try:
+            wait_until_ready(base_url, process)
+            task_ids = fetch_task_ids(base_url)
+            print(f"Target: {base_url} (server {args.server}), {args.clients} clients, "
+                  f"{args.seconds:g} s per scenario")
+            print(f"{'scenario':<24} {'api':<6} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+            with multiprocessing.Pool(args.clients) as pool:
+                for name, sync_route, async_route in PAIRS:
+                    for label, (method, path) in (('sync', sync_route), ('async', async_route)):
+                        _, rps, p50, p99, errors = run_scenario(
+                            pool, base_url, (name, method, path), task_ids, args.clients, args.seconds)
+                        print(f"{name:<24} {label:<6} {rps:>9.1f} {p50:>9.2f} {p99:>9.2f} {errors:>7}")
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=GRACEFUL_WAIT)
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+# benchmark_load.py - 并发压测（每秒请求数和延迟）
+#
+# 用 serve.py 启动服务器（临时数据库，预先生成任务），多个客户端进程并发请求，
+# 依次压测首页、统计/列表 API 和进度更新（写入），输出每秒请求数和 p50/p99 延迟：
+#   python benchmark_load.py --server gunicorn --workers 4 --clients 16 --seconds 10
+#   python benchmark_load.py --server werkzeug       # 对比开发服务器
+# 也可以压测已经运行的服务器（不生成数据，写入场景会修改其中的任务）：
+#   python benchmark_load.py --url http://127.0.0.1:5000
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import urlparse
+
+ROOT = Path(__file__).parent
+# 服务器收到 SIGTERM 后等待退出的时间（秒）
+GRACEFUL_WAIT = 10
+
+# (名称, 方法, 路径)；{task_id} 由客户端轮流替换为已有任务
+SCENARIOS = [
+    ('index', 'GET', '/'),
+    ('api stats', 'GET', '/api/stats'),
+    ('api tasks', 'GET', '/api/tasks?limit=50'),
+    ('api progress (write)', 'POST', '/api/task/{task_id}/progress'),
+]
+
+SEED_SCRIPT = '''
+import sys
+from database import init_database, create_tasks_bulk
+init_database()
+count = int(sys.argv[1])
+priorities = ['urgent', 'high', 'normal']
+create_tasks_bulk([{'text': f'压测任务 {i}', 'priority': priorities[i % 3], 'assignee': f'user{i % 5}',
+                    'progress': (i * 7) % 101} for i in range(count)])
+'''
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def wait_until_ready(base_url, process, timeout=30):
+    """等待服务器开始响应"""
+    parsed = urlparse(base_url)
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError('server process exited before listening')
+        try:
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=5)
+            conn.request('GET', '/api/stats')
+            conn.getresponse().read()
+            conn.close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('server did not start in time')
+
+def fetch_task_ids(base_url, limit=200):
+    parsed = urlparse(base_url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+    conn.request('GET', f'/api/tasks?limit={limit}')
+    data = json.loads(conn.getresponse().read())
+    conn.close()
+    return [task['id'] for task in data.get('tasks', [])]
+
+def client_worker(base_url, method, path, task_ids, seconds, offset):
+    """单个客户端：保持连接，循环请求到时间结束，返回 (延迟列表, 错误数)"""
+    parsed = urlparse(base_url)
+    conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+    latencies, errors = [], 0
+    i = offset
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        url, body, headers = path, None, {}
+        if '{task_id}' in path:
+            url = path.format(task_id=task_ids[i % len(task_ids)])
+            body = json.dumps({'progress': i % 101, 'user': 'bench', 'note': 'load test'})
+            headers = {'Content-Type': 'application/json'}
+        i += 1
+        start = time.perf_counter()
+        try:
+            conn.request(method, url, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            if response.status != 200:
+                errors += 1
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            conn.close()
+            conn = http.client.HTTPConnection(parsed.hostname, parsed.port, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    return latencies, errors
+
+def run_scenario(pool, base_url, scenario, task_ids, clients, seconds):
+    name, method, path = scenario
+    jobs = [(base_url, method, path, task_ids, seconds, n * 1000) for n in range(clients)]
+    results = pool.starmap(client_worker, jobs)
+    latencies = sorted(latency for result, _ in results for latency in result)
+    errors = sum(errors for _, errors in results)
+    if not latencies:
+        return name, 0.0, 0.0, 0.0, errors
+    p50 = latencies[len(latencies) // 2] * 1000
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000
+    return name, len(latencies) / seconds, p50, p99, errors
+
+def start_server(args, tmp, extra_env=None):
+    """生成测试数据并启动 serve.py，返回 (地址, 进程)"""
+    env = dict(os.environ)
+    env.update({
+        'TODO_DB_FILE': str(Path(tmp) / 'tasks.db'),
+        'TODO_STATUS_FLUSH_DELAY': '0',
+    })
+    env.update(extra_env or {})
+    subprocess.run([sys.executable, '-c', SEED_SCRIPT, str(args.tasks)], cwd=ROOT, env=env,
+                   check=True, stdout=subprocess.DEVNULL)
+    port = free_port()
+    command = [sys.executable, 'serve.py', '--server', args.server, '--port', str(port)]
+    if args.workers:
+        command += ['--workers', str(args.workers)]
+    if args.threads:
+        command += ['--threads', str(args.threads)]
+    process = subprocess.Popen(command, cwd=ROOT, env=env,
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return f'http://127.0.0.1:{port}', process
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the index page and task API')
+    parser.add_argument('--url', help='benchmark a running server instead of starting serve.py')
+    parser.add_argument('--server', default='auto', help='serve.py --server (auto/gunicorn/waitress/werkzeug/uvicorn)')
+    parser.add_argument('--workers', type=int, help='serve.py --workers')
+    parser.add_argument('--threads', type=int, help='serve.py --threads')
+    parser.add_argument('--tasks', type=int, default=500, help='number of generated tasks')
+    parser.add_argument('--clients', type=int, default=8, help='concurrent client processes')
+    parser.add_argument('--seconds', type=float, default=5, help='duration of each scenario')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        process = None
+        if args.url:
+            base_url = args.url.rstrip('/')
+        else:
+            base_url, process = start_server(args, tmp)
+        try:
+            wait_until_ready(base_url, process)
+            task_ids = fetch_task_ids(base_url)
+            print(f"Target: {base_url} ({'server ' + args.server if process else 'external'}), "
+                  f"{args.clients} clients, {args.seconds:g} s per scenario")
+            print(f"{'scenario':<22} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7}")
+            with multiprocessing.Pool(args.clients) as pool:
+                for scenario in SCENARIOS:
+                    if '{task_id}' in scenario[2] and not task_ids:
+                        print(f"{scenario[0]:<22} skipped (no tasks)")
+                        continue
+                    name, rps, p50, p99, errors = run_scenario(
+                        pool, base_url, scenario, task_ids, args.clients, args.seconds)
+                    print(f"{name:<22} {rps:>9.1f} {p50:>9.2f} {p99:>9.2f} {errors:>7}")
+        finally:
+            if process is not None:
+                process.terminate()
+                try:
+                    process.wait(timeout=GRACEFUL_WAIT)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+                    process.wait()
+
+if __name__ == '__main__':
+    main()
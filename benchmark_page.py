@@ -0,0 +1,77 @@
+# benchmark_page.py - 首页渲染耗时和传输字节数基准
+#
+# 用 Flask 测试客户端请求首页（旧版 Markdown 模式，生成临时任务清单），
+# 统计平均渲染耗时，以及首次访问 / 再次访问时实际传输的字节数：
+#   python benchmark_page.py --tasks 500 --requests 200
+import argparse
+import re
+import tempfile
+import time
+from pathlib import Path
+
+from app import create_app
+
+PRIORITY_MARKS = ['🔴', '⚠️', '']
+
+def build_todo_file(directory, count):
+    """生成包含 count 个任务的 Markdown 清单"""
+    lines = ['# 工作待办清单', '', '## 日常工作']
+    for i in range(count):
+        mark = 'x' if i % 4 == 0 else ' '
+        lines.append(f'- [{mark}] 任务 {i} 整理资料并同步进度 {PRIORITY_MARKS[i % 3]}')
+    path = Path(directory) / '工作待办清单.md'
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return path
+
+def linked_assets(html):
+    """页面引用的本地 CSS/JS"""
+    return re.findall(r'(?:href|src)="(/static/[^"]+)"', html)
+
+def transfer_size(client, url, headers):
+    """返回 (响应体字节数, 响应头)"""
+    response = client.get(url, headers=headers)
+    return len(response.get_data()), response.headers
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark index page render time and bytes on wire')
+    parser.add_argument('--tasks', type=int, default=500, help='number of generated tasks')
+    parser.add_argument('--requests', type=int, default=200, help='number of timed requests')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        app = create_app({
+            'USE_DATABASE': False,
+            'TODO_FILE': build_todo_file(tmp, args.tasks),
+            'RECOMMEND_FILE': None,
+            'STATUS_FILE': Path(tmp) / '任务状态.json',
+        })
+        client = app.test_client()
+
+        # 预热（解析缓存、模板编译）
+        html = client.get('/').get_data(as_text=True)
+
+        start = time.perf_counter()
+        for _ in range(args.requests):
+            client.get('/')
+        elapsed = time.perf_counter() - start
+        print(f"Tasks: {args.tasks}")
+        print(f"Render: {elapsed / args.requests * 1000:.2f} ms/request ({args.requests} requests)")
+
+        for encoding in ('identity', 'gzip', 'br'):
+            headers = {'Accept-Encoding': encoding}
+            page_bytes, page_headers = transfer_size(client, '/', headers)
+            asset_bytes = 0
+            cached_assets = 0
+            for url in linked_assets(html):
+                size, asset_headers = transfer_size(client, url, headers)
+                asset_bytes += size
+                if 'immutable' in asset_headers.get('Cache-Control', ''):
+                    cached_assets += 1
+            used = page_headers.get('Content-Encoding', 'identity')
+            # 静态资源被长期缓存后，再次访问只需传输 HTML
+            repeat_bytes = page_bytes + (asset_bytes if cached_assets < len(linked_assets(html)) else 0)
+            print(f"Accept-Encoding {encoding:<8} -> {used:<8} "
+                  f"first visit {page_bytes + asset_bytes:>8} bytes, repeat visit {repeat_bytes:>8} bytes")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,112 @@
+# benchmark_parser.py - Markdown 任务清单解析耗时
+#
+# 生成一个大任务清单（默认 5 万个任务，带分类标题、优先级和来源），对比：
+#   new        markdown_parser.parse_markdown_tasks（单次逐行扫描，含分类）
+#   first 20   iter_markdown_tasks 只取前 20 个任务（生成器按需解析）
+#   old regex  原 app.py 的多行正则（不含分类）
+#   old + category  原迁移脚本：正则 + 每个任务回溯之前的全部内容找分类（平方级，
+#              默认只在前 1 万个任务上运行，--old-category-tasks 调整）
+#   python benchmark_parser.py --tasks 50000
+import argparse
+import hashlib
+import itertools
+import re
+import time
+
+from markdown_parser import iter_markdown_tasks, parse_markdown_tasks
+
+OLD_TASK_PATTERN = r'- \[([ x])\] ((?:[^\n]|(?:\n(?!- \[)))+?)(?=\n- \[|$)'
+
+def old_parse_markdown_tasks(content, with_category=False):
+    """原 app.parse_markdown_tasks / migrate_to_database.read_markdown_tasks 的实现"""
+    tasks = []
+    for match in re.finditer(OLD_TASK_PATTERN, content, re.MULTILINE | re.DOTALL):
+        status = match.group(1)
+        task_lines = [line.rstrip() for line in match.group(2).split('\n')]
+        task_text = '\n'.join(task_lines).strip()
+
+        priority = 'normal'
+        if '【紧急】' in task_text or '【P0】' in task_text:
+            priority = 'urgent'
+        elif '【P1】' in task_text:
+            priority = 'high'
+
+        source = ''
+        if '来源：' in task_text:
+            source_match = re.search(r'来源：(.+?)(?=\n|$)', task_text)
+            if source_match:
+                source = source_match.group(1).strip()
+
+        task = {
+            'id': hashlib.md5(task_text.encode('utf-8')).hexdigest(),
+            'text': task_text,
+            'completed': status == 'x',
+            'priority': priority,
+            'source': source,
+        }
+        if with_category:
+            category = ''
+            for line in reversed(content[:match.start()].split('\n')):
+                if line.startswith('##'):
+                    category = line.replace('##', '').strip()
+                    break
+            task['category'] = category
+        tasks.append(task)
+    return tasks
+
+def build_content(count):
+    """生成包含 count 个任务的清单，每 50 个任务一个 ## 分类"""
+    marks = ['【紧急】', '【P1】', '', '【P2】']
+    lines = ['# 工作待办清单', '']
+    for i in range(count):
+        if i % 50 == 0:
+            lines += ['', f'## 分类 {i // 50}']
+        done = 'x' if i % 4 == 0 else ' '
+        source = f' 来源：会议纪要 {i % 7}' if i % 3 == 0 else ''
+        lines.append(f'- [{done}] 任务 {i} 整理资料并同步进度{marks[i % 4]}{source}')
+    return '\n'.join(lines) + '\n'
+
+def timed(fn, repeat):
+    """返回 (结果, 多次运行中的最短秒数)"""
+    best = None
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Markdown task list parsing')
+    parser.add_argument('--tasks', type=int, default=50000, help='number of generated tasks')
+    parser.add_argument('--old-category-tasks', type=int, default=10000,
+                        help='tasks for the quadratic old category lookup (0 to skip)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per parser (best is reported)')
+    args = parser.parse_args()
+
+    content = build_content(args.tasks)
+    print(f"Tasks: {args.tasks} ({len(content.encode('utf-8')) / 1e6:.1f} MB)")
+    print(f"{'parser':<16} {'tasks':>7} {'seconds':>9}")
+
+    new_tasks, seconds = timed(lambda: parse_markdown_tasks(content), args.repeat)
+    print(f"{'new':<16} {len(new_tasks):>7} {seconds:>9.3f}")
+
+    first, seconds = timed(lambda: list(itertools.islice(iter_markdown_tasks(content), 20)), args.repeat)
+    print(f"{'first 20':<16} {len(first):>7} {seconds:>9.4f}")
+
+    old_tasks, seconds = timed(lambda: old_parse_markdown_tasks(content), args.repeat)
+    print(f"{'old regex':<16} {len(old_tasks):>7} {seconds:>9.3f}")
+    if [t['id'] for t in old_tasks] != [t['id'] for t in new_tasks]:
+        print("Warning: old and new parsers returned different tasks")
+
+    if args.old_category_tasks:
+        small = build_content(min(args.old_category_tasks, args.tasks))
+        small_tasks, seconds = timed(lambda: old_parse_markdown_tasks(small, with_category=True), 1)
+        new_small, new_seconds = timed(lambda: parse_markdown_tasks(small), args.repeat)
+        if [t['category'] for t in small_tasks] != [t['category'] for t in new_small]:
+            print("Warning: old and new parsers returned different categories")
+        print(f"{'old + category':<16} {len(small_tasks):>7} {seconds:>9.3f}  (new: {new_seconds:.3f})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+# benchmark_rows.py - 任务行解码的耗时和内存（Task/TaskUpdate 记录 vs 原来的字典）
+#
+# 在临时数据库中生成任务和更新历史，分别用原来的方式（SELECT * + 按列名逐个取值构建字典）
+# 和现在的行工厂（元组包装为 Task / TaskUpdate）读取全部行，输出每 1 万行的
+# 解码耗时、常驻内存（tracemalloc）、转换为字典的耗时（Task 分别用逐行 to_dict()
+# 和列表接口使用的 tasks_to_dicts()）以及 json.dumps 的耗时：
+#   python benchmark_rows.py --tasks 10000 --repeat 10
+import argparse
+import gc
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import database
+from database import TASK_COLUMNS, TASK_UPDATE_FIELDS, tasks_to_dicts
+
+def row_to_task_dict(row):
+    """原 database._row_to_task：sqlite3.Row 按列名取值构建 14 个键的字典"""
+    return {
+        'id': row['id'],
+        'text': row['text'],
+        'priority': row['priority'],
+        'category': row['category'],
+        'assignee': row['assignee'],
+        'creator': row['creator'],
+        'progress': row['progress'],
+        'status': row['status'],
+        'source': row['source'],
+        'due_date': row['due_date'],
+        'notes': row['notes'],
+        'created_at': row['created_at'],
+        'updated_at': row['updated_at'],
+        'completed': row['progress'] >= 100 or row['status'] == 'completed'
+    }
+
+def row_to_update_dict(row):
+    """原 get_task_updates 中的字典构建"""
+    return {
+        'id': row['id'],
+        'user': row['user'],
+        'progress': row['progress'],
+        'status': row['status'],
+        'note': row['note'],
+        'updated_at': row['updated_at']
+    }
+
+def load_task_dicts(conn):
+    return [row_to_task_dict(row) for row in conn.execute('SELECT * FROM tasks').fetchall()]
+
+def load_tasks(conn):
+    return database._query_tasks(conn, f'SELECT {TASK_COLUMNS} FROM tasks')
+
+def load_update_dicts(conn):
+    return [row_to_update_dict(row) for row in conn.execute('SELECT * FROM task_updates').fetchall()]
+
+def load_updates(conn):
+    cursor = conn.cursor()
+    cursor.row_factory = database._task_update_factory
+    return cursor.execute(f"SELECT {', '.join(TASK_UPDATE_FIELDS)} FROM task_updates").fetchall()
+
+# (名称, 读取函数, 转换为 JSON 可序列化对象的函数)
+VARIANTS = [
+    ('tasks', 'dict', load_task_dicts, lambda rows: rows),
+    ('tasks', 'Task', load_tasks, lambda rows: [row.to_dict() for row in rows]),
+    ('tasks', 'Task batch', load_tasks, tasks_to_dicts),
+    ('updates', 'dict', load_update_dicts, lambda rows: rows),
+    ('updates', 'TaskUpdate', load_updates, lambda rows: [row.to_dict() for row in rows]),
+]
+
+def measure(conn, load, to_json, repeat):
+    """返回 (行数, 解码毫秒, 常驻字节, 转换毫秒, JSON 毫秒)，耗时取多次中的最小值"""
+    load_times, convert_times, json_times = [], [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = load(conn)
+        load_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        data = to_json(rows)
+        convert_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        json.dumps(data, ensure_ascii=False)
+        json_times.append(time.perf_counter() - start)
+        del data
+        del rows
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    rows = load(conn)
+    retained = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return len(rows), min(load_times) * 1000, retained, min(convert_times) * 1000, min(json_times) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark task row decoding time and memory (records vs dicts)')
+    parser.add_argument('--tasks', type=int, default=10000, help='number of generated tasks (each with one update)')
+    parser.add_argument('--repeat', type=int, default=10, help='timed runs per variant')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = Path(tmp) / 'tasks.db'
+        database.init_database()
+        database.create_tasks_bulk([
+            {'text': f'任务 {i} 整理资料并同步进度', 'category': '日常工作', 'assignee': f'user{i % 5}',
+             'notes': '需要跟进', 'progress': (i * 7) % 101}
+            for i in range(args.tasks)
+        ], progress_note='created')
+
+        print(f"Tasks: {args.tasks}, figures per 10k rows")
+        print(f"{'rows':<8} {'type':<11} {'decode ms':>10} {'memory MB':>10} {'convert ms':>11} {'json ms':>9}")
+        with database.db_connection() as conn:
+            for name, label, load, to_json in VARIANTS:
+                count, load_ms, retained, convert_ms, json_ms = measure(conn, load, to_json, args.repeat)
+                scale = 10000 / max(count, 1)
+                print(f"{name:<8} {label:<11} {load_ms * scale:>10.1f} {retained * scale / 1e6:>10.2f} "
+                      f"{convert_ms * scale:>11.1f} {json_ms * scale:>9.1f}")
+        database.close_db_connection()
+
+if __name__ == '__main__':
+    main()
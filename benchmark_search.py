@@ -0,0 +1,84 @@
+# benchmark_search.py - 全文搜索（/api/tasks/search）查询延迟
+#
+# 在临时数据库中生成任务（默认 10 万个，中文文本 + 备注），对一组查询分别测量
+# FTS5 trigram 索引路径和 LIKE 全表扫描路径（不足 3 个字的词、没有索引时使用）的延迟：
+#   python benchmark_search.py --tasks 100000 --repeat 50
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+import database
+
+SUBJECTS = ['季度报告', '客户回访', '合同审核', '招聘面试', '预算编制', '系统上线', '培训课程', '供应商评估']
+ACTIONS = ['整理资料', '同步进度', '准备材料', '跟进反馈', '确认排期', '汇总数据']
+CATEGORIES = ['日常工作', '项目管理', '人事行政', '财务']
+
+# (说明, 查询)
+QUERIES = [
+    ('one term', '季度报告'),
+    ('two terms', '客户回访 跟进反馈'),
+    ('rare term', '4242'),
+    ('no match', '不存在的任务'),
+    ('short term (LIKE)', '合同'),
+]
+
+def generate_tasks(count, seed=0):
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(count):
+        subject, action = rng.choice(SUBJECTS), rng.choice(ACTIONS)
+        tasks.append({
+            'text': f'{subject}{action} 编号 {i}',
+            'category': rng.choice(CATEGORIES),
+            'priority': rng.choice(['urgent', 'high', 'normal']),
+            'notes': f'{rng.choice(SUBJECTS)}相关，需要{rng.choice(ACTIONS)}',
+        })
+    return tasks
+
+def time_query(query, repeat):
+    """返回 (结果数, p50 毫秒, p99 毫秒)"""
+    samples = []
+    results = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = database.search_tasks(query)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return len(results), samples[len(samples) // 2] * 1000, samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark task search latency (FTS5 vs LIKE scan)')
+    parser.add_argument('--tasks', type=int, default=100000, help='number of generated tasks')
+    parser.add_argument('--repeat', type=int, default=50, help='timed runs per query')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database.DB_FILE = Path(tmp) / 'tasks.db'
+        database.init_database()
+        start = time.perf_counter()
+        database.create_tasks_bulk(generate_tasks(args.tasks))
+        print(f"Tasks: {args.tasks} (generated in {time.perf_counter() - start:.1f} s)")
+        with database.db_connection() as conn:
+            has_index = database._has_search_index(conn)
+        if not has_index:
+            print("Warning: this SQLite build has no FTS5 trigram tokenizer, only the LIKE path is measured")
+
+        print(f"{'query':<20} {'path':<6} {'results':>7} {'p50 ms':>9} {'p99 ms':>9}")
+        has_search_index = database._has_search_index
+        for name, query in QUERIES:
+            for path in ('fts', 'like'):
+                if path == 'fts' and not has_index:
+                    continue
+                # 关闭索引检测即走 LIKE 回退路径
+                database._has_search_index = has_search_index if path == 'fts' else (lambda conn: False)
+                try:
+                    count, p50, p99 = time_query(query, args.repeat)
+                finally:
+                    database._has_search_index = has_search_index
+                print(f"{name:<20} {path:<6} {count:>7} {p50:>9.2f} {p99:>9.2f}")
+        database.close_db_connection()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+# benchmark_startup.py - 冷启动基准（导入耗时 + 首个响应耗时）
+#
+# 模拟 Vercel 冷启动：在新进程中导入 api/index.py，
+#   1. python -X importtime 统计导入耗时，列出最慢的模块
+#   2. 用本地 WSGI 服务器启动应用（全新的临时数据库），测量从启动进程到首个响应的时间
+# 可设置阈值作为回归检查，超出时退出码为 1（tests/test_startup.py 以较宽的阈值运行）：
+#   python benchmark_startup.py --max-import-ms 400 --max-first-response-ms 1500
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).parent
+
+# 子进程：导入入口模块并启动本地服务器，把端口号写到标准输出（PORT <端口>）
+SERVER_SCRIPT = '''
+import sys
+sys.path.insert(0, 'api')
+from index import app
+from werkzeug.serving import make_server
+server = make_server('127.0.0.1', 0, app)
+print('PORT', server.server_port, flush=True)
+server.serve_forever()
+'''
+
+def startup_env(tmp):
+    """与 Vercel 一致的环境变量，数据库和缓存放在临时目录中，GitHub 请求立即失败"""
+    env = dict(os.environ)
+    env.update({
+        'VERCEL': '1',
+        'TODO_DB_FILE': str(Path(tmp) / 'tasks.db'),
+        'TODO_GITHUB_CACHE_DIR': str(Path(tmp) / 'github-cache'),
+        'TODO_GITHUB_API_URL': 'http://127.0.0.1:9',
+        'PYTHONDONTWRITEBYTECODE': '1',
+    })
+    return env
+
+def measure_imports(env, top):
+    """返回 (入口模块累计导入耗时 ms, 最慢的模块列表)"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', "import sys; sys.path.insert(0, 'api'); import index"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True)
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append((int(cumulative_us), int(self_us), name.rstrip()))
+    total = next(cumulative for cumulative, _, name in modules if name.strip() == 'index')
+    modules.sort(reverse=True)
+    return total / 1000, modules[:top]
+
+def measure_first_response(env, path):
+    """启动服务器进程，返回 (首个响应耗时 ms, 状态码)"""
+    start = time.perf_counter()
+    process = subprocess.Popen([sys.executable, '-c', SERVER_SCRIPT], cwd=ROOT, env=env,
+                               stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    try:
+        # 应用导入时可能输出其他信息，读到端口行为止
+        line = ''
+        while not line.startswith('PORT '):
+            line = process.stdout.readline()
+            if not line:
+                raise RuntimeError('server process exited before listening')
+        port = int(line.split()[1])
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}{path}', timeout=30) as response:
+            response.read()
+            status = response.status
+        return (time.perf_counter() - start) * 1000, status
+    finally:
+        process.terminate()
+        process.wait()
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark serverless cold start')
+    parser.add_argument('--path', default='/api/stats', help='URL path of the first request')
+    parser.add_argument('--runs', type=int, default=3, help='number of cold starts (best is reported)')
+    parser.add_argument('--top', type=int, default=10, help='number of slowest imports to list')
+    parser.add_argument('--max-import-ms', type=float, help='fail if importing the entry point is slower')
+    parser.add_argument('--max-first-response-ms', type=float, help='fail if the first response is slower')
+    args = parser.parse_args()
+
+    import_times, response_times = [], []
+    slowest = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = startup_env(tmp)
+            total, slowest = measure_imports(env, args.top)
+            import_times.append(total)
+        # 每次都用全新的数据库，包含首次建表的开销
+        with tempfile.TemporaryDirectory() as tmp:
+            elapsed, status = measure_first_response(startup_env(tmp), args.path)
+            response_times.append(elapsed)
+
+    print(f"Import api/index.py: {min(import_times):.1f} ms (best of {args.runs})")
+    for cumulative, self_us, name in slowest:
+        print(f"  {cumulative / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {name.strip()}")
+    print(f"First response {args.path}: {min(response_times):.1f} ms (status {status}, best of {args.runs})")
+
+    failed = False
+    if args.max_import_ms is not None and min(import_times) > args.max_import_ms:
+        print(f"FAIL: import time exceeds {args.max_import_ms} ms")
+        failed = True
+    if args.max_first_response_ms is not None and min(response_times) > args.max_first_response_ms:
+        print(f"FAIL: first response exceeds {args.max_first_response_ms} ms")
+        failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,22 @@
 # database.py - 数据库模型和初始化
+import atexit
 import sqlite3
 import hashlib
-from datetime import datetime
+import re
+import json
+import time
+import zlib
+import base64
+import html
+from collections import namedtuple
+import queue
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta
 from pathlib import Path
 
+from status_store import file_lock
+
 # 数据库文件路径
 # 支持Vercel环境变量配置
 import os
@@ -19,19 +32,201 @@ else:
     BASE_DIR = Path(__file__).parent.parent.parent
     DB_FILE = BASE_DIR / "工具和脚本" / "工具脚本" / "tasks.db"
 
+# 可通过环境变量指定数据库文件（例如基准测试使用独立的临时数据库）
+if os.environ.get('TODO_DB_FILE'):
+    DB_FILE = Path(os.environ['TODO_DB_FILE'])
+
+# 连接参数：写锁等待时间（毫秒）及页缓存/内存映射大小
+BUSY_TIMEOUT_MS = int(os.environ.get('TODO_DB_BUSY_TIMEOUT_MS', '5000'))
+CACHE_SIZE_KB = 16 * 1024
+MMAP_SIZE = 64 * 1024 * 1024
+
+# 每个连接建立后执行的 PRAGMA（同步连接和 async_api 的 aiosqlite 连接共用）
+CONNECTION_PRAGMAS = [
+    f'PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}',
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = NORMAL',  # WAL 模式下 NORMAL 即可保证一致性
+    f'PRAGMA cache_size = -{CACHE_SIZE_KB}',
+    f'PRAGMA mmap_size = {MMAP_SIZE}',
+    'PRAGMA temp_store = MEMORY',
+]
+
+# 进程内共享的连接池：空闲连接放回队列供任意线程复用（开发服务器每个请求一个新线程，
+# 按线程缓存连接等于每个请求都重新 connect），最多保留 POOL_SIZE 个空闲连接
+POOL_SIZE = int(os.environ.get('TODO_DB_POOL_SIZE', '8'))
+_pool = queue.LifoQueue(maxsize=POOL_SIZE)
+# 池中连接所属的 (进程, 数据库文件)，fork 后或 DB_FILE 变化时丢弃旧连接
+_pool_key = None
+_pool_lock = threading.Lock()
+# 当前线程借出的连接和嵌套深度（同一线程嵌套使用时共享一个事务）
+_checkout = threading.local()
+
 def get_db_connection():
-    """获取数据库连接"""
-    conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+    """获取数据库连接（新建并配置好 PRAGMA 的独立连接，调用方负责关闭）"""
+    # isolation_level='IMMEDIATE'：写事务一开始就拿写锁，避免读锁升级时的 SQLITE_BUSY
+    conn = sqlite3.connect(DB_FILE, timeout=BUSY_TIMEOUT_MS / 1000,
+                           isolation_level='IMMEDIATE', check_same_thread=False)
     conn.row_factory = sqlite3.Row  # 返回字典格式的行
+    for pragma in CONNECTION_PRAGMAS:
+        conn.execute(pragma)
     return conn
 
-def init_database():
-    """初始化数据库表"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # 创建任务表
+def _drain_pool():
+    """关闭池中所有空闲连接"""
+    while True:
+        try:
+            conn = _pool.get_nowait()
+        except queue.Empty:
+            return
+        conn.close()
+
+def _acquire_connection():
+    """从池中取出空闲连接，没有时新建"""
+    global _pool_key
+    key = (os.getpid(), str(DB_FILE))
+    with _pool_lock:
+        if _pool_key != key:
+            if _pool_key is not None and _pool_key[0] == key[0]:
+                _drain_pool()
+            else:
+                # fork 出的子进程不能使用父进程的连接，直接丢弃
+                while not _pool.empty():
+                    _pool.get_nowait()
+            _pool_key = key
+    try:
+        return _pool.get_nowait(), key
+    except queue.Empty:
+        return get_db_connection(), key
+
+def _release_connection(conn, key):
+    """归还连接，池已满或数据库已切换时关闭"""
+    with _pool_lock:
+        if key == _pool_key:
+            try:
+                _pool.put_nowait(conn)
+                return
+            except queue.Full:
+                pass
+    conn.close()
+
+@contextmanager
+def db_connection():
+    """从连接池借出连接（上下文管理器）
+
+    最外层退出时提交事务（出现异常时回滚）并归还连接；嵌套使用时共享同一个连接和事务。
+    进程 fork 后（如多 worker 部署）会自动重建连接。
+    """
+    conn = getattr(_checkout, 'conn', None)
+    if conn is None:
+        conn, key = _acquire_connection()
+        _checkout.conn, _checkout.key, _checkout.depth = conn, key, 0
+    _checkout.depth += 1
+    try:
+        yield conn
+        if _checkout.depth == 1:
+            conn.commit()
+    except Exception:
+        if _checkout.depth == 1:
+            conn.rollback()
+        raise
+    finally:
+        _checkout.depth -= 1
+        if _checkout.depth == 0:
+            _checkout.conn = None
+            _release_connection(conn, _checkout.key)
+
+def close_db_connection():
+    """关闭池中的空闲连接（切换数据库文件或替换数据库文件前调用）"""
+    with _pool_lock:
+        if _pool_key is not None and _pool_key[0] == os.getpid():
+            _drain_pool()
+
+# ---------------------------------------------------------------------------
+# 数据库结构迁移
+#
+# 每个迁移为 (版本号, 说明, 步骤列表)，步骤是 SQL 字符串或接收 cursor 的函数。
+# 步骤必须幂等（IF NOT EXISTS 等），每个步骤单独一个短事务执行，
+# 建索引时不会长时间占用写锁；最后一个步骤与 PRAGMA user_version 一起提交。
+# 新增结构变更时只需在 MIGRATIONS 末尾追加，切勿修改已发布的迁移。
+# ---------------------------------------------------------------------------
+
+# 与实际查询形状匹配的组合索引：等值筛选列在前，排序列在后（末尾带 id 作为决胜键）
+QUERY_INDEXES = {
+    'idx_tasks_priority_created': 'tasks(priority, created_at, id)',
+    'idx_tasks_status_priority_created': 'tasks(status, priority, created_at, id)',
+    'idx_tasks_assignee_priority_created': 'tasks(assignee, priority, created_at, id)',
+    'idx_tasks_created': 'tasks(created_at, id)',
+    'idx_tasks_updated': 'tasks(updated_at, id)',
+    'idx_task_updates_task_updated': 'task_updates(task_id, updated_at)',
+}
+
+# 未完成任务的筛选条件（与部分索引 idx_tasks_open_priority_created 的 WHERE 完全一致，规划器才会选用）
+OPEN_TASK_CONDITION = "status != 'completed'"
+
+# 已被上面组合索引前缀覆盖的旧单列索引
+OBSOLETE_INDEXES = [
+    'idx_tasks_status',
+    'idx_tasks_assignee',
+    'idx_tasks_priority',
+    'idx_task_updates_task_id',
+]
+
+def _create_task_search_index(cursor):
+    """创建 FTS5 全文索引（trigram 分词，适合中文）及同步触发器
+
+    tasks 表没有 INTEGER PRIMARY KEY，rowid 在 VACUUM 后可能变化，
+    执行 VACUUM 后需要运行 rebuild_search_index()。
+    """
+    try:
+        cursor.execute('''
+            CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(
+                text, notes, category,
+                content='tasks', content_rowid='rowid', tokenize='trigram'
+            )
+        ''')
+    except sqlite3.OperationalError as e:
+        # SQLite 未编译 FTS5 或版本低于 3.34（无 trigram），搜索退化为 LIKE
+        print(f"Full-text search unavailable, falling back to LIKE: {e}")
+        return
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+            INSERT INTO tasks_fts(rowid, text, notes, category)
+            VALUES (new.rowid, new.text, new.notes, new.category);
+        END
+    ''')
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, text, notes, category)
+            VALUES ('delete', old.rowid, old.text, old.notes, old.category);
+        END
+    ''')
     cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF text, notes, category ON tasks BEGIN
+            INSERT INTO tasks_fts(tasks_fts, rowid, text, notes, category)
+            VALUES ('delete', old.rowid, old.text, old.notes, old.category);
+            INSERT INTO tasks_fts(rowid, text, notes, category)
+            VALUES (new.rowid, new.text, new.notes, new.category);
+        END
+    ''')
+    cursor.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+def _recount_task_stats(cursor):
+    """根据现有任务重新计算 task_stats
+
+    清空和重新计数必须在同一个事务中：触发器此时已生效，分成两个事务时，
+    其他进程在两者之间写入的任务会被触发器计数一次、又被重新计数一次（或主键冲突）。
+    """
+    cursor.execute('DELETE FROM task_stats')
+    cursor.execute('''
+        INSERT INTO task_stats (priority, status, assignee, count)
+        SELECT COALESCE(priority, ''), COALESCE(status, ''), COALESCE(assignee, ''), COUNT(*)
+        FROM tasks GROUP BY 1, 2, 3
+    ''')
+
+MIGRATIONS = [
+    (1, 'base schema', [
+        # 任务表
+        '''
         CREATE TABLE IF NOT EXISTS tasks (
             id TEXT PRIMARY KEY,
             text TEXT NOT NULL,
@@ -47,10 +242,9 @@ def init_database():
             created_at TEXT NOT NULL,
             updated_at TEXT NOT NULL
         )
-    ''')
-    
-    # 创建任务更新历史表
-    cursor.execute('''
+        ''',
+        # 任务更新历史表
+        '''
         CREATE TABLE IF NOT EXISTS task_updates (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             task_id TEXT NOT NULL,
@@ -61,10 +255,9 @@ def init_database():
             updated_at TEXT NOT NULL,
             FOREIGN KEY (task_id) REFERENCES tasks(id)
         )
-    ''')
-    
-    # 创建用户表（可选，用于扩展）
-    cursor.execute('''
+        ''',
+        # 用户表（可选，用于扩展）
+        '''
         CREATE TABLE IF NOT EXISTS users (
             id TEXT PRIMARY KEY,
             name TEXT NOT NULL,
@@ -72,17 +265,441 @@ def init_database():
             role TEXT DEFAULT 'member',
             created_at TEXT NOT NULL
         )
-    ''')
-    
-    # 创建索引
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_assignee ON tasks(assignee)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority)')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_task_updates_task_id ON task_updates(task_id)')
+        ''',
+    ]),
+    (2, 'composite query indexes',
+        [f'CREATE INDEX IF NOT EXISTS {name} ON {definition}' for name, definition in QUERY_INDEXES.items()]
+        + [f'DROP INDEX IF EXISTS {name}' for name in OBSOLETE_INDEXES]
+        # 更新统计信息，帮助查询规划器选中新索引
+        + ['PRAGMA optimize']),
+    (3, 'full-text search', [_create_task_search_index]),
+    (4, 'task statistics', [
+        # 按 (优先级, 状态, 负责人) 维护的任务计数，由触发器在每次写入时增量更新
+        '''
+        CREATE TABLE IF NOT EXISTS task_stats (
+            priority TEXT NOT NULL,
+            status TEXT NOT NULL,
+            assignee TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (priority, status, assignee)
+        ) WITHOUT ROWID
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS tasks_stats_ai AFTER INSERT ON tasks BEGIN
+            INSERT INTO task_stats (priority, status, assignee, count)
+            VALUES (COALESCE(new.priority, ''), COALESCE(new.status, ''), COALESCE(new.assignee, ''), 1)
+            ON CONFLICT (priority, status, assignee) DO UPDATE SET count = count + 1;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS tasks_stats_ad AFTER DELETE ON tasks BEGIN
+            UPDATE task_stats SET count = count - 1
+            WHERE priority = COALESCE(old.priority, '') AND status = COALESCE(old.status, '')
+              AND assignee = COALESCE(old.assignee, '');
+            DELETE FROM task_stats WHERE count <= 0;
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS tasks_stats_au AFTER UPDATE OF priority, status, assignee ON tasks
+        WHEN old.priority IS NOT new.priority OR old.status IS NOT new.status OR old.assignee IS NOT new.assignee
+        BEGIN
+            UPDATE task_stats SET count = count - 1
+            WHERE priority = COALESCE(old.priority, '') AND status = COALESCE(old.status, '')
+              AND assignee = COALESCE(old.assignee, '');
+            INSERT INTO task_stats (priority, status, assignee, count)
+            VALUES (COALESCE(new.priority, ''), COALESCE(new.status, ''), COALESCE(new.assignee, ''), 1)
+            ON CONFLICT (priority, status, assignee) DO UPDATE SET count = count + 1;
+            DELETE FROM task_stats WHERE count <= 0;
+        END
+        ''',
+        _recount_task_stats,
+    ]),
+    (5, 'task history archive', [
+        # 归档的历史记录：每个任务每次归档一行，payload 为 zlib 压缩的 JSON 行列表
+        '''
+        CREATE TABLE IF NOT EXISTS task_updates_archive (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id TEXT NOT NULL,
+            first_at TEXT NOT NULL,
+            last_at TEXT NOT NULL,
+            row_count INTEGER NOT NULL,
+            payload BLOB NOT NULL,
+            archived_at TEXT NOT NULL
+        )
+        ''',
+        'CREATE INDEX IF NOT EXISTS idx_task_updates_archive_task ON task_updates_archive(task_id, first_at)',
+    ]),
+    (6, 'markdown sync state', [
+        # 每个同步来源最后一次同步的内容哈希（游标）
+        '''
+        CREATE TABLE IF NOT EXISTS sync_cursors (
+            source TEXT PRIMARY KEY,
+            content_sha TEXT NOT NULL,
+            synced_at TEXT NOT NULL
+        )
+        ''',
+        # 每个同步来源导入过的任务块及其哈希，用于计算增量
+        '''
+        CREATE TABLE IF NOT EXISTS sync_tasks (
+            source TEXT NOT NULL,
+            task_id TEXT NOT NULL,
+            block_hash TEXT NOT NULL,
+            completed INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (source, task_id)
+        ) WITHOUT ROWID
+        ''',
+    ]),
+    (7, 'task change feed', [
+        # 每个任务只保留最近一次变更；AUTOINCREMENT 保证版本号单调递增、不会复用，
+        # 客户端用 version > since 即可取到增量（删除的任务保留为 deleted = 1 的墓碑）
+        '''
+        CREATE TABLE IF NOT EXISTS task_changes (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            task_id TEXT NOT NULL UNIQUE,
+            deleted INTEGER NOT NULL DEFAULT 0,
+            changed_at TEXT NOT NULL
+        )
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS tasks_changes_ai AFTER INSERT ON tasks BEGIN
+            DELETE FROM task_changes WHERE task_id = new.id;
+            INSERT INTO task_changes (task_id, deleted, changed_at)
+            VALUES (new.id, 0, strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'));
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS tasks_changes_au AFTER UPDATE ON tasks BEGIN
+            DELETE FROM task_changes WHERE task_id IN (old.id, new.id);
+            INSERT INTO task_changes (task_id, deleted, changed_at)
+            SELECT old.id, 1, strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime') WHERE old.id IS NOT new.id;
+            INSERT INTO task_changes (task_id, deleted, changed_at)
+            VALUES (new.id, 0, strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'));
+        END
+        ''',
+        '''
+        CREATE TRIGGER IF NOT EXISTS tasks_changes_ad AFTER DELETE ON tasks BEGIN
+            DELETE FROM task_changes WHERE task_id = old.id;
+            INSERT INTO task_changes (task_id, deleted, changed_at)
+            VALUES (old.id, 1, strftime('%Y-%m-%d %H:%M:%S', 'now', 'localtime'));
+        END
+        ''',
+        # 现有任务按更新时间记一次初始版本
+        '''
+        INSERT INTO task_changes (task_id, deleted, changed_at)
+        SELECT id, 0, updated_at FROM tasks
+        WHERE id NOT IN (SELECT task_id FROM task_changes)
+        ORDER BY updated_at, id
+        ''',
+    ]),
+    (8, 'open task index', [
+        # 只包含未完成任务的部分索引：completed=0 筛选（见 _build_task_filters）按优先级排序时
+        # 只扫描未完成的任务，不会逐行跳过已完成的任务
+        f"CREATE INDEX IF NOT EXISTS idx_tasks_open_priority_created ON tasks(priority, created_at, id) "
+        f"WHERE {OPEN_TASK_CONDITION}",
+        'PRAGMA optimize',
+    ]),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+# 已确认结构为最新版本的数据库文件（进程内缓存，避免重复检查）
+_schema_ready_for = None
+
+# 快照存储（见 storage.py）：设置 TODO_SNAPSHOT_URL 后，数据库文件不存在时从快照恢复，
+# save_snapshot() 在数据变化后写入新快照。用于 /tmp 不持久的 serverless 部署。
+# 快照以条件写入保存：<数据库文件>.snapshot.json 记录本地数据库基于的快照版本
+# （同一数据库文件的多个 worker 共用），存储中的版本已被其他实例更新时不覆盖。
+SNAPSHOT_URL = os.environ.get('TODO_SNAPSHOT_URL', '')
+# 请求结束后保存快照的最短间隔（秒），间隔内的多次写入合并为一次上传
+SNAPSHOT_INTERVAL = float(os.environ.get('TODO_SNAPSHOT_INTERVAL', '5'))
+_snapshot_store = None
+_snapshot_lock = threading.Lock()
+# 存储中的快照对应的变更版本（进程内缓存，没有变化时不读取状态文件），None 表示需要保存
+_snapshot_version = None
+# 本进程上次保存快照的时间和等待中的定时器（见 schedule_snapshot）
+_snapshot_saved_at = float('-inf')
+_snapshot_timer = None
+_snapshot_timer_lock = threading.Lock()
+
+def get_schema_version():
+    """获取数据库当前结构版本（PRAGMA user_version）"""
+    with db_connection() as conn:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def _run_migration_step(conn, step):
+    """在当前事务中执行单个迁移步骤"""
+    if callable(step):
+        step(conn.cursor())
+    else:
+        conn.execute(step)
+
+def migrate_database():
+    """执行所有尚未应用的迁移，返回已应用的版本号列表"""
+    applied = []
+    for version, description, steps in MIGRATIONS:
+        if get_schema_version() >= version:
+            continue
+        for i, step in enumerate(steps):
+            with db_connection() as conn:
+                conn.execute('BEGIN IMMEDIATE')
+                # 拿到写锁后再确认一次，其他进程可能已经完成了这个迁移
+                if conn.execute('PRAGMA user_version').fetchone()[0] >= version:
+                    break
+                _run_migration_step(conn, step)
+                if i == len(steps) - 1:
+                    conn.execute(f'PRAGMA user_version = {version}')
+                    applied.append(version)
+                    print(f"Applied migration {version}: {description}")
+    return applied
+
+def init_database():
+    """初始化数据库（按需执行迁移；结构已是最新版本时只读取一次 user_version）"""
+    global _schema_ready_for, _snapshot_version
+    if _schema_ready_for == DB_FILE:
+        return
     
-    conn.commit()
-    conn.close()
-    print(f"Database initialized at: {DB_FILE}")
+    # 多个 worker 进程同时启动时，只由先拿到锁的进程恢复快照和执行迁移，
+    # 其余进程拿到锁后看到的已是最新结构
+    with file_lock(DB_FILE):
+        existed = Path(DB_FILE).exists()
+        restored = restore_snapshot()
+        migrated = False
+        if get_schema_version() < SCHEMA_VERSION:
+            migrate_database()
+            migrated = True
+            print(f"Database initialized at: {DB_FILE}")
+    _schema_ready_for = DB_FILE
+    if get_snapshot_store():
+        _init_snapshot_state(existed, restored, migrated)
+
+def get_snapshot_store():
+    """快照存储，未配置 TODO_SNAPSHOT_URL 时返回 None"""
+    global _snapshot_store
+    if _snapshot_store is None and SNAPSHOT_URL:
+        from storage import SnapshotStore, open_sink
+        _snapshot_store = SnapshotStore(open_sink(SNAPSHOT_URL))
+    return _snapshot_store
+
+def restore_snapshot():
+    """数据库文件不存在时从快照恢复，返回恢复指标（未恢复时返回 None）"""
+    store = get_snapshot_store()
+    if store is None or Path(DB_FILE).exists():
+        return None
+    close_db_connection()
+    try:
+        metrics = store.restore(DB_FILE)
+    except Exception as e:
+        # 快照损坏或存储不可用时从空数据库开始（之后会重新同步）
+        print(f"Warning: database snapshot restore failed: {e}")
+        return None
+    if metrics:
+        print(f"Restored database snapshot ({metrics['bytes']} bytes) in {metrics['ms']:.1f} ms")
+    return metrics
+
+def _snapshot_state_path():
+    return Path(f'{DB_FILE}.snapshot.json')
+
+def _read_snapshot_state():
+    """本地数据库对应的快照状态 {'version', 'change_version', 'conflict'}，没有记录时返回 None"""
+    try:
+        with open(_snapshot_state_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_snapshot_state(state):
+    path = _snapshot_state_path()
+    tmp_path = path.with_name(path.name + '.tmp')
+    tmp_path.write_text(json.dumps(state), encoding='utf-8')
+    os.replace(tmp_path, path)
+
+def _init_snapshot_state(existed, restored, migrated):
+    """记录本地数据库基于的快照版本（条件写入的基准）"""
+    global _snapshot_version
+    try:
+        with file_lock(_snapshot_state_path()):
+            state = _read_snapshot_state() if existed else None
+            if state is None:
+                # 新建或刚恢复的数据库；本地已有数据库但还没有记录时，以存储中的当前快照为基准
+                state = {'version': restored['version'] if restored else get_snapshot_store().version(),
+                         'change_version': None, 'conflict': False}
+                # 刚从快照恢复且没有迁移时，与存储中的快照一致
+                if restored and not migrated:
+                    state['change_version'] = get_change_version()
+                _write_snapshot_state(state)
+    except Exception as e:
+        # 存储不可用时不影响使用数据库，第一次保存快照时再读取存储中的版本
+        print(f"Warning: database snapshot state unavailable: {e}")
+        return
+    _snapshot_version = state['change_version']
+
+def save_snapshot(force=False):
+    """变更版本前进后以条件写入保存快照，返回保存指标
+
+    未配置存储、没有变化或发生冲突时返回 None。其他实例已写入更新的快照时不覆盖，
+    改为用存储中的快照替换本地数据库（本地自上次快照以来的修改被丢弃，打印警告）；
+    替换失败时记录冲突，冲突解决前写请求返回错误（见 app.reject_writes_on_conflict）。
+    """
+    global _snapshot_version, _snapshot_saved_at
+    store = get_snapshot_store()
+    if store is None:
+        return None
+    from storage import SnapshotConflict
+    with _snapshot_lock, file_lock(_snapshot_state_path()):
+        state = _read_snapshot_state() or {'version': store.version(), 'change_version': None, 'conflict': False}
+        if state['conflict']:
+            _resolve_snapshot_conflict(store, state)
+            return None
+        version = get_change_version()
+        if not force and version == state['change_version']:
+            _snapshot_version = version
+            return None
+        try:
+            with db_connection() as conn:
+                metrics = store.save(conn, state['version'])
+        except SnapshotConflict as e:
+            print(f"Warning: database snapshot not saved ({e}); "
+                  f"discarding local changes after version {state['change_version']} and restoring the newer snapshot")
+            _resolve_snapshot_conflict(store, dict(state, conflict=True))
+            return None
+        _write_snapshot_state({'version': metrics['version'], 'change_version': version, 'conflict': False})
+        _snapshot_version = version
+        _snapshot_saved_at = time.monotonic()
+    return metrics
+
+def _resolve_snapshot_conflict(store, state):
+    """用存储中更新的快照替换本地数据库，返回是否成功（调用方持有快照锁）"""
+    global _snapshot_version
+    try:
+        with db_connection() as conn:
+            metrics = store.restore_into(conn)
+        if metrics is None:
+            # 存储中的快照已被删除，下次保存时重新创建
+            metrics = {'version': None}
+        else:
+            # 其他实例可能运行较旧的版本，补齐结构
+            migrate_database()
+    except Exception as e:
+        _write_snapshot_state(state)
+        print(f"Warning: newer database snapshot could not be restored, rejecting writes until it is: {e}")
+        return False
+    _snapshot_version = get_change_version()
+    _write_snapshot_state({'version': metrics['version'], 'change_version': _snapshot_version, 'conflict': False})
+    return True
+
+def snapshot_conflict():
+    """本地数据库是否落后于存储中的快照且尚未恢复（此时不应接受写入）
+
+    发现冲突时先尝试恢复，恢复成功返回 False。
+    """
+    store = get_snapshot_store()
+    if store is None:
+        return False
+    state = _read_snapshot_state()
+    if not state or not state['conflict']:
+        return False
+    with _snapshot_lock, file_lock(_snapshot_state_path()):
+        state = _read_snapshot_state()
+        return bool(state and state['conflict']) and not _resolve_snapshot_conflict(store, state)
+
+def schedule_snapshot(interval=None):
+    """请求结束后保存快照（防抖）
+
+    距本进程上次保存已超过 interval 秒（默认 SNAPSHOT_INTERVAL）时立即保存并返回指标；
+    否则启动一个定时器，到时保存一次，返回 None。没有变化时不做任何事。
+    interval 为 0 时总是同步保存（serverless 实例随时可能被冻结，定时器和 atexit 都不可靠）。
+    """
+    global _snapshot_timer
+    if interval is None:
+        interval = SNAPSHOT_INTERVAL
+    if get_snapshot_store() is None or get_change_version() == _snapshot_version:
+        return None
+    with _snapshot_timer_lock:
+        wait = _snapshot_saved_at + interval - time.monotonic()
+        if wait > 0:
+            if _snapshot_timer is None:
+                _snapshot_timer = threading.Timer(wait, _save_scheduled_snapshot)
+                _snapshot_timer.daemon = True
+                _snapshot_timer.start()
+            return None
+    return save_snapshot()
+
+def _save_scheduled_snapshot():
+    global _snapshot_timer
+    with _snapshot_timer_lock:
+        _snapshot_timer = None
+    try:
+        save_snapshot()
+    except Exception as e:
+        print(f"Warning: database snapshot failed: {e}")
+
+def flush_snapshot():
+    """立即保存等待中的快照（进程退出时调用）"""
+    global _snapshot_timer
+    with _snapshot_timer_lock:
+        timer, _snapshot_timer = _snapshot_timer, None
+    if timer is None:
+        return
+    timer.cancel()
+    try:
+        save_snapshot()
+    except Exception as e:
+        print(f"Warning: database snapshot failed: {e}")
+
+atexit.register(flush_snapshot)
+
+# 热点查询：(说明, SQL, 参数)，用于查询计划回归检查
+_TASK_ORDER = 'ORDER BY priority DESC, created_at DESC, id DESC'
+HOT_QUERIES = [
+    ('all tasks', f'SELECT * FROM tasks {_TASK_ORDER}', []),
+    ('by status', f'SELECT * FROM tasks WHERE status = ? {_TASK_ORDER}', ['pending']),
+    ('by assignee', f'SELECT * FROM tasks WHERE assignee = ? {_TASK_ORDER}', ['x']),
+    ('by priority', f'SELECT * FROM tasks WHERE priority = ? {_TASK_ORDER}', ['urgent']),
+    ('status + assignee', f'SELECT * FROM tasks WHERE status = ? AND assignee = ? {_TASK_ORDER}', ['pending', 'x']),
+    ('progress range', f'SELECT * FROM tasks WHERE progress >= ? AND progress <= ? {_TASK_ORDER}', [10, 90]),
+    ('keyset page', f'SELECT * FROM tasks WHERE status = ? AND (priority, created_at, id) < (?, ?, ?) {_TASK_ORDER} LIMIT ?', ['pending', 'normal', '2099-01-01', 'z', 51]),
+    # 首页各分组的第一页和"查看全部"（completed=0/1，见 app.group_filters）
+    ('index group', f"SELECT * FROM tasks WHERE priority = ? AND {OPEN_TASK_CONDITION} {_TASK_ORDER} LIMIT ?", ['high', 11]),
+    ('index completed', f"SELECT * FROM tasks WHERE status = 'completed' {_TASK_ORDER} LIMIT ?", [11]),
+    ('open tasks', f"SELECT * FROM tasks WHERE {OPEN_TASK_CONDITION} {_TASK_ORDER} LIMIT ?", [51]),
+    ('sort by updated', 'SELECT * FROM tasks ORDER BY updated_at DESC, id DESC LIMIT ?', [51]),
+    ('task updates', 'SELECT * FROM task_updates WHERE task_id = ? ORDER BY updated_at DESC LIMIT ?', ['x', 10]),
+    ('task changes', 'SELECT * FROM task_changes c LEFT JOIN tasks t ON t.id = c.task_id WHERE c.version > ? ORDER BY c.version LIMIT ?', [0, 501]),
+]
+
+# 允许按索引顺序逐行筛选的查询及原因。进度范围筛选很少使用，且按进度建索引也无法提供
+# 优先级排序（只能换成临时排序），按优先级索引顺序扫描并在 LIMIT 处提前结束反而更合适
+FILTERED_SCAN_ALLOWED = {
+    'progress range': 'progress filter is rare and an index on progress cannot serve the priority order',
+}
+
+def _is_partial_index(conn, name):
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)).fetchone()
+    return bool(row and row[0] and ' WHERE ' in row[0].upper())
+
+def check_query_plans():
+    """检查热点查询的执行计划
+
+    返回问题列表，为空表示所有热点查询都走索引且没有临时排序。带 WHERE 的查询按索引顺序
+    SCAN（逐行筛选）也算全表扫描，除非用的是部分索引（只包含符合条件的行）
+    或查询在 FILTERED_SCAN_ALLOWED 中。
+    """
+    problems = []
+    with db_connection() as conn:
+        for label, query, params in HOT_QUERIES:
+            filtered = ' WHERE ' in query
+            plan = [row['detail'] for row in conn.execute('EXPLAIN QUERY PLAN ' + query, params)]
+            for detail in plan:
+                if 'TEMP B-TREE' in detail:
+                    problems.append(f'{label}: {detail}')
+                elif detail.startswith('SCAN'):
+                    index = re.search(r'USING (?:COVERING )?INDEX (\w+)', detail)
+                    # 'SCAN tasks' 不带 USING INDEX 即全表扫描
+                    if index is None:
+                        problems.append(f'{label}: {detail}')
+                    elif filtered and label not in FILTERED_SCAN_ALLOWED and not _is_partial_index(conn, index.group(1)):
+                        problems.append(f'{label}: {detail}')
+    return problems
 
 def generate_task_id(text):
     """生成任务ID（基于文本内容的MD5哈希）"""
@@ -90,134 +707,473 @@ def generate_task_id(text):
 
 def create_task(text, priority='normal', category='', assignee='', creator='', source='', due_date=None, notes=''):
     """创建新任务"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     task_id = generate_task_id(text)
     now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     
-    # 检查任务是否已存在
-    cursor.execute('SELECT id FROM tasks WHERE id = ?', (task_id,))
-    if cursor.fetchone():
-        conn.close()
-        return {'success': False, 'error': 'Task already exists'}
-    
-    cursor.execute('''
-        INSERT INTO tasks (id, text, priority, category, assignee, creator, source, due_date, notes, created_at, updated_at, progress, status)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 'pending')
-    ''', (task_id, text, priority, category, assignee, creator, source, due_date, notes, now, now))
-    
-    # 记录创建历史
-    cursor.execute('''
-        INSERT INTO task_updates (task_id, user, progress, status, note, updated_at)
-        VALUES (?, ?, 0, 'pending', ?, ?)
-    ''', (task_id, creator or 'System', 'Task created', now))
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # 检查任务是否已存在
+        cursor.execute('SELECT id FROM tasks WHERE id = ?', (task_id,))
+        if cursor.fetchone():
+            return {'success': False, 'error': 'Task already exists'}
+        
+        cursor.execute('''
+            INSERT INTO tasks (id, text, priority, category, assignee, creator, source, due_date, notes, created_at, updated_at, progress, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, 0, 'pending')
+        ''', (task_id, text, priority, category, assignee, creator, source, due_date, notes, now, now))
+        
+        # 记录创建历史
+        cursor.execute('''
+            INSERT INTO task_updates (task_id, user, progress, status, note, updated_at)
+            VALUES (?, ?, 0, 'pending', ?, ?)
+        ''', (task_id, creator or 'System', 'Task created', now))
     
-    conn.commit()
-    conn.close()
     return {'success': True, 'task_id': task_id}
 
-def get_all_tasks(filters=None):
-    """获取所有任务（支持筛选）"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+# SQLite 单条语句的参数个数上限较低（旧版本为 999），IN 查询按块执行
+SQL_CHUNK_SIZE = 500
+
+def status_for_progress(progress):
+    """根据进度计算任务状态"""
+    return 'completed' if progress >= 100 else 'in_progress' if progress > 0 else 'pending'
+
+def _existing_task_ids(conn, task_ids):
+    """返回 task_ids 中已存在于数据库的任务ID集合"""
+    task_ids = list(task_ids)
+    existing = set()
+    for i in range(0, len(task_ids), SQL_CHUNK_SIZE):
+        chunk = task_ids[i:i + SQL_CHUNK_SIZE]
+        placeholders = ', '.join('?' * len(chunk))
+        rows = conn.execute(f'SELECT id FROM tasks WHERE id IN ({placeholders})', chunk)
+        existing.update(row[0] for row in rows)
+    return existing
+
+def create_tasks_bulk(tasks, creator='System', progress_note=''):
+    """批量创建任务（单个事务）
+
+    tasks 为字典列表，键与 create_task 的参数相同，另可带 progress（0-100）。
+    已存在（或列表内重复）的任务会被跳过；带进度的任务额外记录一条进度历史，
+    备注为 progress_note。返回 {'success': True, 'created': [任务ID], 'skipped': 数量}。
+    """
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    # 按任务ID去重，保留第一次出现的任务
+    pending = {}
+    for task in tasks:
+        task_id = generate_task_id(task['text'])
+        if task_id not in pending:
+            pending[task_id] = task
     
-    query = 'SELECT * FROM tasks WHERE 1=1'
+    with db_connection() as conn:
+        if not conn.in_transaction:
+            conn.execute('BEGIN IMMEDIATE')
+        existing = _existing_task_ids(conn, pending)
+        
+        task_rows = []
+        update_rows = []
+        for task_id, task in pending.items():
+            if task_id in existing:
+                continue
+            progress = max(0, min(100, int(task.get('progress') or 0)))
+            status = status_for_progress(progress)
+            task_creator = task.get('creator') or creator
+            task_rows.append((
+                task_id, task['text'], task.get('priority', 'normal'), task.get('category', ''),
+                task.get('assignee', ''), task_creator, task.get('source', ''),
+                task.get('due_date'), task.get('notes', ''), now, now, progress, status
+            ))
+            # 记录创建历史；带进度的任务再补一条进度历史，与逐条导入时一致
+            update_rows.append((task_id, task_creator or 'System', 0, 'pending', 'Task created', now))
+            if progress > 0:
+                update_rows.append((task_id, task_creator or 'System', progress, status, progress_note, now))
+        
+        conn.executemany('''
+            INSERT INTO tasks (id, text, priority, category, assignee, creator, source, due_date, notes, created_at, updated_at, progress, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO NOTHING
+        ''', task_rows)
+        conn.executemany('''
+            INSERT INTO task_updates (task_id, user, progress, status, note, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', update_rows)
+    
+    created = [row[0] for row in task_rows]
+    return {'success': True, 'created': created, 'skipped': len(tasks) - len(created)}
+
+# 分页排序方式：名称 -> 排序列（最后一列必须唯一，用作游标的决胜键）
+TASK_SORTS = {
+    'priority': ('priority', 'created_at', 'id'),
+    'created': ('created_at', 'id'),
+    'updated': ('updated_at', 'id'),
+}
+
+def _build_task_filters(filters):
+    """根据筛选条件构建 WHERE 子句和参数"""
+    clauses = []
     params = []
     
     if filters:
         if filters.get('status'):
-            query += ' AND status = ?'
+            clauses.append('status = ?')
             params.append(filters['status'])
         if filters.get('assignee'):
-            query += ' AND assignee = ?'
+            clauses.append('assignee = ?')
             params.append(filters['assignee'])
         if filters.get('priority'):
-            query += ' AND priority = ?'
+            clauses.append('priority = ?')
             params.append(filters['priority'])
         if filters.get('progress_min') is not None:
-            query += ' AND progress >= ?'
+            clauses.append('progress >= ?')
             params.append(filters['progress_min'])
         if filters.get('progress_max') is not None:
-            query += ' AND progress <= ?'
+            clauses.append('progress <= ?')
             params.append(filters['progress_max'])
+        # status 总是由 progress 计算（见 status_for_progress），按 status 判断即与 Task.completed 一致，
+        # 且已完成任务可以命中 (status, priority, created_at, id) 索引
+        if filters.get('completed') is not None:
+            clauses.append("status = 'completed'" if filters['completed'] else OPEN_TASK_CONDITION)
+    
+    return clauses, params
+
+# 任务表列顺序（查询时显式列出，行工厂按位置构建记录）
+TASK_FIELDS = ('id', 'text', 'priority', 'category', 'assignee', 'creator', 'progress',
+               'status', 'source', 'due_date', 'notes', 'created_at', 'updated_at')
+TASK_COLUMNS = ', '.join(TASK_FIELDS)
+
+TASK_UPDATE_FIELDS = ('id', 'user', 'progress', 'status', 'note', 'updated_at')
+
+class Task(namedtuple('TaskRecord', TASK_FIELDS)):
+    """任务记录（基于元组，不为每行分配字典）
+
+    支持属性访问（模板中的 task.text）和字典式只读访问（task['text']、task.get()），
+    序列化为 JSON 时使用 to_dict()，多行时使用 tasks_to_dicts()。
+    """
+    __slots__ = ()
     
-    query += ' ORDER BY priority DESC, created_at DESC'
+    @property
+    def completed(self):
+        return self.progress >= 100 or self.status == 'completed'
     
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    conn.close()
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
     
-    tasks = []
-    for row in rows:
-        tasks.append({
-            'id': row['id'],
-            'text': row['text'],
-            'priority': row['priority'],
-            'category': row['category'],
-            'assignee': row['assignee'],
-            'creator': row['creator'],
-            'progress': row['progress'],
-            'status': row['status'],
-            'source': row['source'],
-            'due_date': row['due_date'],
-            'notes': row['notes'],
-            'created_at': row['created_at'],
-            'updated_at': row['updated_at'],
-            'completed': row['progress'] >= 100 or row['status'] == 'completed'
-        })
-    
-    return tasks
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+    
+    def to_dict(self):
+        """转换为字典（JSON 接口使用）"""
+        data = dict(zip(TASK_FIELDS, self))
+        data['completed'] = self.completed
+        return data
 
-def update_task_progress(task_id, progress, user='System', note=''):
-    """更新任务进度"""
-    conn = get_db_connection()
+def tasks_to_dicts(tasks):
+    """批量转换为字典（与 to_dict() 相同，列表接口使用）
+
+    按位置解包元组，一个推导式直接构建字典，省去每行的 zip、方法调用和属性查找。
+    解包顺序必须与 TASK_FIELDS 一致。
+    """
+    return [
+        {'id': id_, 'text': text, 'priority': priority, 'category': category, 'assignee': assignee,
+         'creator': creator, 'progress': progress, 'status': status, 'source': source, 'due_date': due_date,
+         'notes': notes, 'created_at': created_at, 'updated_at': updated_at,
+         'completed': progress >= 100 or status == 'completed'}
+        for (id_, text, priority, category, assignee, creator, progress, status, source, due_date, notes,
+             created_at, updated_at) in tasks
+    ]
+
+class TaskUpdate(namedtuple('TaskUpdateRecord', TASK_UPDATE_FIELDS)):
+    """任务更新历史记录（基于元组）"""
+    __slots__ = ()
+    
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        return tuple.__getitem__(self, key)
+    
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+    
+    def to_dict(self):
+        """转换为字典（JSON 接口使用）"""
+        return dict(zip(TASK_UPDATE_FIELDS, self))
+
+def _task_factory(cursor, row):
+    """行工厂：直接把查询结果元组包装为 Task"""
+    return tuple.__new__(Task, row)
+
+def _task_update_factory(cursor, row):
+    """行工厂：直接把查询结果元组包装为 TaskUpdate"""
+    return tuple.__new__(TaskUpdate, row)
+
+def _query_tasks(conn, query, params=()):
+    """执行返回 TASK_COLUMNS 的查询，结果为 Task 列表"""
     cursor = conn.cursor()
+    cursor.row_factory = _task_factory
+    return cursor.execute(query, params).fetchall()
+
+def get_all_tasks(filters=None):
+    """获取所有任务（支持筛选）"""
+    clauses, params = _build_task_filters(filters)
+    query = f'SELECT {TASK_COLUMNS} FROM tasks'
+    if clauses:
+        query += ' WHERE ' + ' AND '.join(clauses)
+    query += ' ORDER BY priority DESC, created_at DESC, id DESC'
     
-    # 检查任务是否存在
-    cursor.execute('SELECT id, status FROM tasks WHERE id = ?', (task_id,))
-    task = cursor.fetchone()
-    if not task:
-        conn.close()
-        return {'success': False, 'error': 'Task not found'}
+    with db_connection() as conn:
+        return _query_tasks(conn, query, params)
+
+def get_task(task_id):
+    """按 ID 获取单个任务，不存在时返回 None"""
+    with db_connection() as conn:
+        tasks = _query_tasks(conn, f'SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?', (task_id,))
+    return tasks[0] if tasks else None
+
+# 单次返回的变更条数上限，超出时 more 为 True，客户端接着拉取
+CHANGES_PAGE_SIZE = 500
+
+def get_change_version():
+    """当前变更版本号（没有任何变更时为 0）"""
+    with db_connection() as conn:
+        return conn.execute('SELECT COALESCE(MAX(version), 0) FROM task_changes').fetchone()[0]
+
+def get_changes(since=0, limit=CHANGES_PAGE_SIZE):
+    """获取版本号大于 since 的任务变更
     
-    # 更新任务进度和状态
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    new_status = 'completed' if progress >= 100 else 'in_progress' if progress > 0 else 'pending'
+    返回 version（本次结果的最后版本号，下次作为 since）、tasks（变更后的 Task）、
+    deleted（已删除的任务 ID）、more（是否还有未返回的变更），以及 reset：
+    since 比当前版本还大时（例如数据库被重建）为 True，客户端应重新加载全部数据。
+    开销只与变更条数有关，与任务总数无关。
+    """
+    columns = ', '.join(f't.{field}' for field in TASK_FIELDS)
+    with db_connection() as conn:
+        latest = conn.execute('SELECT COALESCE(MAX(version), 0) FROM task_changes').fetchone()[0]
+        if since > latest:
+            return {'version': latest, 'tasks': [], 'deleted': [], 'more': False, 'reset': True}
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(f'''
+            SELECT c.version, c.task_id, c.deleted, {columns}
+            FROM task_changes c LEFT JOIN tasks t ON t.id = c.task_id
+            WHERE c.version > ? ORDER BY c.version LIMIT ?
+        ''', (since, limit + 1)).fetchall()
     
-    cursor.execute('''
-        UPDATE tasks 
-        SET progress = ?, status = ?, updated_at = ?
-        WHERE id = ?
-    ''', (progress, new_status, now, task_id))
+    more = len(rows) > limit
+    rows = rows[:limit]
+    tasks, deleted = [], []
+    for row in rows:
+        if row[2] or row[3] is None:
+            deleted.append(row[1])
+        else:
+            tasks.append(tuple.__new__(Task, row[3:]))
+    return {
+        'version': rows[-1][0] if rows else since,
+        'tasks': tasks,
+        'deleted': deleted,
+        'more': more,
+        'reset': False
+    }
+
+def encode_cursor(values):
+    """将排序键编码为不透明的分页游标"""
+    raw = json.dumps(values, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """解析分页游标，格式错误时抛出 ValueError"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f'Invalid cursor: {e}')
+    if not isinstance(values, list) or not all(isinstance(v, (str, int, float)) for v in values):
+        raise ValueError('Invalid cursor')
+    return values
+
+def build_tasks_page_query(filters=None, sort='priority', order='desc', limit=50, cursor=None):
+    """构建分页查询，返回 (SQL, 参数, 排序列)；参数不合法时抛出 ValueError"""
+    if sort not in TASK_SORTS:
+        raise ValueError(f'Unknown sort: {sort}')
+    if order not in ('asc', 'desc'):
+        raise ValueError(f'Unknown order: {order}')
+    columns = TASK_SORTS[sort]
+    direction = order.upper()
     
-    # 记录更新历史
-    cursor.execute('''
-        INSERT INTO task_updates (task_id, user, progress, status, note, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (task_id, user, progress, new_status, note, now))
+    clauses, params = _build_task_filters(filters)
+    if cursor:
+        values = decode_cursor(cursor)
+        if len(values) != len(columns):
+            raise ValueError('Cursor does not match sort')
+        # 行值比较：(a, b, id) < (?, ?, ?)，可直接命中索引范围
+        op = '<' if order == 'desc' else '>'
+        placeholders = ', '.join('?' * len(columns))
+        clauses.append(f'({", ".join(columns)}) {op} ({placeholders})')
+        params.extend(values)
+    
+    query = f'SELECT {TASK_COLUMNS} FROM tasks'
+    if clauses:
+        query += ' WHERE ' + ' AND '.join(clauses)
+    query += ' ORDER BY ' + ', '.join(f'{col} {direction}' for col in columns)
+    # 多取一行用来判断是否还有下一页
+    query += ' LIMIT ?'
+    params.append(limit + 1)
+    return query, params, columns
+
+def finish_tasks_page(tasks, limit, columns):
+    """截取一页结果并生成下一页游标"""
+    next_cursor = None
+    if len(tasks) > limit:
+        tasks = tasks[:limit]
+        last = tasks[-1]
+        next_cursor = encode_cursor([last[col] for col in columns])
+    
+    return {'tasks': tasks, 'next_cursor': next_cursor}
+
+def get_tasks_page(filters=None, sort='priority', order='desc', limit=50, cursor=None):
+    """分页获取任务（键集分页）
+
+    按 sort 对应的列排序，cursor 为上一页返回的 next_cursor。
+    返回 {'tasks': [...], 'next_cursor': str 或 None}。
+    """
+    query, params, columns = build_tasks_page_query(filters, sort, order, limit, cursor)
+    with db_connection() as conn:
+        tasks = _query_tasks(conn, query, params)
+    return finish_tasks_page(tasks, limit, columns)
+
+# trigram 分词至少需要 3 个字符，更短的关键词只能走 LIKE
+FTS_MIN_TERM_LENGTH = 3
+
+# 摘要高亮标记：先用控制字符占位，HTML 转义后再替换成 <mark>，避免注入
+_MARK_START = '\x02'
+_MARK_END = '\x03'
+
+def _has_search_index(conn):
+    """数据库是否有 FTS5 全文索引"""
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks_fts'").fetchone()
+    return row is not None
+
+def _highlight(snippet):
+    """HTML 转义摘要并把占位标记替换为 <mark>"""
+    escaped = html.escape(snippet)
+    return escaped.replace(_MARK_START, '<mark>').replace(_MARK_END, '</mark>')
+
+def _like_snippet(text, terms, width=32):
+    """LIKE 回退路径的摘要：截取第一个命中词附近的文本并高亮"""
+    lowered = text.lower()
+    hits = [lowered.find(term.lower()) for term in terms]
+    first = min((pos for pos in hits if pos >= 0), default=0)
+    start = max(0, first - width // 2)
+    end = min(len(text), start + width * 2)
+    snippet = text[start:end]
+    for term in terms:
+        snippet = re.sub(re.escape(term), lambda m: _MARK_START + m.group(0) + _MARK_END, snippet, flags=re.IGNORECASE)
+    return ('…' if start > 0 else '') + snippet + ('…' if end < len(text) else '')
+
+def search_tasks(query, limit=20):
+    """全文搜索任务（按相关度排序，附带高亮摘要）
+
+    关键词以空白分隔，全部命中才返回。返回任务字典列表，
+    额外包含 'snippet'（已转义的 HTML，命中处用 <mark> 包裹）。
+    """
+    terms = query.split()
+    if not terms:
+        return []
+    
+    with db_connection() as conn:
+        if _has_search_index(conn) and all(len(term) >= FTS_MIN_TERM_LENGTH for term in terms):
+            # 每个词作为短语查询，双引号转义后不会被解析为 FTS 语法
+            match = ' AND '.join('"' + term.replace('"', '""') + '"' for term in terms)
+            columns = ', '.join('tasks.' + field for field in TASK_FIELDS)
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            rows = cursor.execute(f'''
+                SELECT {columns}, snippet(tasks_fts, -1, ?, ?, '…', 16) AS snippet
+                FROM tasks_fts JOIN tasks ON tasks.rowid = tasks_fts.rowid
+                WHERE tasks_fts MATCH ?
+                ORDER BY bm25(tasks_fts)
+                LIMIT ?
+            ''', (_MARK_START, _MARK_END, match, limit)).fetchall()
+            results = []
+            for row in rows:
+                task = tuple.__new__(Task, row[:-1]).to_dict()
+                task['snippet'] = _highlight(row[-1])
+                results.append(task)
+            return results
+        
+        clauses = []
+        params = []
+        for term in terms:
+            pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            clauses.append("(text LIKE ? ESCAPE '\\' OR notes LIKE ? ESCAPE '\\' OR category LIKE ? ESCAPE '\\')")
+            params.extend([pattern, pattern, pattern])
+        query_sql = f'SELECT {TASK_COLUMNS} FROM tasks WHERE ' + ' AND '.join(clauses) + ' ORDER BY updated_at DESC, id DESC LIMIT ?'
+        params.append(limit)
+        rows = _query_tasks(conn, query_sql, params)
+    
+    results = []
+    for row in rows:
+        task = row.to_dict()
+        task['snippet'] = _highlight(_like_snippet(row.text, terms))
+        results.append(task)
+    return results
+
+def rebuild_search_index():
+    """重建全文索引（VACUUM 或手工修改数据后使用）"""
+    with db_connection() as conn:
+        if _has_search_index(conn):
+            conn.execute("INSERT INTO tasks_fts(tasks_fts) VALUES ('rebuild')")
+
+# 更新任务进度并记录历史（update_task_progress 和 async_api 共用）
+UPDATE_PROGRESS_SQL = 'UPDATE tasks SET progress = ?, status = ?, updated_at = ? WHERE id = ?'
+INSERT_TASK_UPDATE_SQL = '''
+    INSERT INTO task_updates (task_id, user, progress, status, note, updated_at)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+def update_task_progress(task_id, progress, user='System', note=''):
+    """更新任务进度"""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        
+        # 检查任务是否存在
+        cursor.execute('SELECT id, status FROM tasks WHERE id = ?', (task_id,))
+        task = cursor.fetchone()
+        if not task:
+            return {'success': False, 'error': 'Task not found'}
+        
+        # 更新任务进度和状态
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        new_status = status_for_progress(progress)
+        cursor.execute(UPDATE_PROGRESS_SQL, (progress, new_status, now, task_id))
+        
+        # 记录更新历史
+        cursor.execute(INSERT_TASK_UPDATE_SQL, (task_id, user, progress, new_status, note, now))
     
-    conn.commit()
-    conn.close()
     return {'success': True}
 
+# 允许通过 update_task / apply_task_changes 修改的字段
+UPDATABLE_FIELDS = ('text', 'priority', 'category', 'assignee', 'due_date', 'notes')
+
 def update_task(task_id, **kwargs):
     """更新任务信息"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
     # 构建更新字段
-    allowed_fields = ['text', 'priority', 'category', 'assignee', 'due_date', 'notes']
     updates = []
     params = []
     
     for field, value in kwargs.items():
-        if field in allowed_fields and value is not None:
+        if field in UPDATABLE_FIELDS and value is not None:
             updates.append(f'{field} = ?')
             params.append(value)
     
     if not updates:
-        conn.close()
         return {'success': False, 'error': 'No valid fields to update'}
     
     updates.append('updated_at = ?')
@@ -225,68 +1181,399 @@ def update_task(task_id, **kwargs):
     params.append(task_id)
     
     query = f'UPDATE tasks SET {", ".join(updates)} WHERE id = ?'
-    cursor.execute(query, params)
+    with db_connection() as conn:
+        conn.execute(query, params)
     
-    conn.commit()
-    conn.close()
     return {'success': True}
 
+# 批量修改中字段值允许的类型（列表、对象等由逐项结果报告错误，不影响同一批的其他项）
+SCALAR_TYPES = (str, int, float)
+
+def _invalid_change_fields(change):
+    """返回值不是字符串或数字的字段名"""
+    return [field for field in (*UPDATABLE_FIELDS, 'progress', 'note', 'user')
+            if change.get(field) is not None and not isinstance(change[field], SCALAR_TYPES)]
+
+def apply_task_changes(changes, user='User'):
+    """批量修改任务（单个事务）
+
+    changes 为字典列表，每项包含 task_id，以及 progress（0-100）和/或
+    UPDATABLE_FIELDS 中的字段；可选 note、user 记录到更新历史。
+    返回与 changes 一一对应的结果列表 [{'task_id', 'success', 'error'?}]。
+    """
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    results = []
+    progress_rows = []
+    update_rows = []
+    
+    with db_connection() as conn:
+        if not conn.in_transaction:
+            conn.execute('BEGIN IMMEDIATE')
+        existing = _existing_task_ids(conn, {c.get('task_id') for c in changes
+                                             if c.get('task_id') and isinstance(c.get('task_id'), str)})
+        
+        for change in changes:
+            task_id = change.get('task_id')
+            if not task_id:
+                results.append({'task_id': task_id, 'success': False, 'error': 'Missing task_id'})
+                continue
+            if not isinstance(task_id, str):
+                results.append({'task_id': task_id, 'success': False, 'error': 'Invalid task_id'})
+                continue
+            if task_id not in existing:
+                results.append({'task_id': task_id, 'success': False, 'error': 'Task not found'})
+                continue
+            invalid = _invalid_change_fields(change)
+            if invalid:
+                results.append({'task_id': task_id, 'success': False,
+                                'error': f"Invalid value for {', '.join(invalid)}"})
+                continue
+            
+            fields = {k: v for k, v in change.items() if k in UPDATABLE_FIELDS and v is not None}
+            progress = change.get('progress')
+            if progress is not None:
+                try:
+                    progress = max(0, min(100, int(progress)))  # 限制在0-100之间
+                except (TypeError, ValueError, OverflowError):
+                    results.append({'task_id': task_id, 'success': False, 'error': 'Invalid progress'})
+                    continue
+            elif not fields:
+                results.append({'task_id': task_id, 'success': False, 'error': 'No valid fields to update'})
+                continue
+            
+            # 字段组合因项而异，逐条更新；进度更新形状一致，最后统一 executemany
+            if fields:
+                assignments = ', '.join(f'{field} = ?' for field in fields)
+                conn.execute(f'UPDATE tasks SET {assignments}, updated_at = ? WHERE id = ?',
+                             [*fields.values(), now, task_id])
+            if progress is not None:
+                status = status_for_progress(progress)
+                progress_rows.append((progress, status, now, task_id))
+                update_rows.append((task_id, change.get('user') or user, progress, status, change.get('note', ''), now))
+            results.append({'task_id': task_id, 'success': True})
+        
+        conn.executemany('''
+            UPDATE tasks 
+            SET progress = ?, status = ?, updated_at = ?
+            WHERE id = ?
+        ''', progress_rows)
+        conn.executemany('''
+            INSERT INTO task_updates (task_id, user, progress, status, note, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', update_rows)
+    
+    return results
+
 def get_task_updates(task_id, limit=10):
-    """获取任务更新历史"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
+    """获取任务更新历史（TaskUpdate 列表）"""
+    with db_connection() as conn:
+        cursor = conn.cursor()
+        cursor.row_factory = _task_update_factory
+        return cursor.execute(f'''
+            SELECT {', '.join(TASK_UPDATE_FIELDS)} FROM task_updates 
+            WHERE task_id = ? 
+            ORDER BY updated_at DESC 
+            LIMIT ?
+        ''', (task_id, limit)).fetchall()
+
+# ---------------------------------------------------------------------------
+# Markdown 增量同步
+# ---------------------------------------------------------------------------
+
+def _task_block_hash(task):
+    """任务块哈希：文本、优先级、分类、来源、完成状态任一变化都会改变"""
+    raw = json.dumps([task['text'], task.get('priority', 'normal'), task.get('category', ''),
+                      task.get('source', ''), bool(task.get('completed'))], ensure_ascii=False)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def get_sync_cursor(source):
+    """获取同步来源上次同步的内容哈希，从未同步时返回 None"""
+    with db_connection() as conn:
+        row = conn.execute('SELECT content_sha FROM sync_cursors WHERE source = ?', (source,)).fetchone()
+    return row['content_sha'] if row else None
+
+# 同步删除保护：清单解析不出任务，或一次要删除超过该比例的已同步任务时（至少
+# SYNC_REMOVE_GUARD_MIN 个），视为清单内容异常（误提交、格式被破坏），跳过删除。
+# 跳过删除时不记录同步游标，之后每次同步都重新检查；确认删除是有意的，
+# 用 allow_mass_removal=True 同步一次（POST /api/sync?allow_mass_removal=1）
+SYNC_MAX_REMOVE_RATIO = 0.5
+SYNC_REMOVE_GUARD_MIN = 5
+
+def sync_markdown_tasks(source, content, parse_tasks, user='GitHub Sync', allow_mass_removal=False):
+    """把 Markdown 任务清单增量同步到数据库（单个事务）
+
+    source 标识同步来源（如 GitHub 路径），parse_tasks(content) 返回任务字典列表
+    （text、priority、category、source、completed）。内容哈希与上次相同时直接返回；
+    否则与上次同步的任务块比较：新增的任务导入，从清单删除的任务删除，
+    元数据变化的任务更新，清单中完成状态变化的任务同步进度。
+    只处理本来源导入过的任务，用户在页面中创建的任务不受影响。
+    删除触发保护时（见 SYNC_MAX_REMOVE_RATIO）不删除任务，数量记在 removal_skipped 中；
+    allow_mass_removal=True 时不检查保护，照常删除。
+    返回 {'unchanged', 'added', 'removed', 'changed', 'completed', 'reopened', 'removal_skipped'}。
+    """
+    content_sha = hashlib.sha256(content.encode('utf-8')).hexdigest()
+    result = {'unchanged': False, 'added': 0, 'removed': 0, 'changed': 0, 'completed': 0, 'reopened': 0,
+              'removal_skipped': 0}
+    if get_sync_cursor(source) == content_sha:
+        result['unchanged'] = True
+        return result
     
-    cursor.execute('''
-        SELECT * FROM task_updates 
-        WHERE task_id = ? 
-        ORDER BY updated_at DESC 
-        LIMIT ?
-    ''', (task_id, limit))
+    # 按任务ID去重，保留第一次出现的任务块
+    blocks = {}
+    for task in parse_tasks(content):
+        task_id = generate_task_id(task['text'])
+        if task_id not in blocks:
+            blocks[task_id] = (task, _task_block_hash(task))
     
-    rows = cursor.fetchall()
-    conn.close()
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with db_connection() as conn:
+        if not conn.in_transaction:
+            conn.execute('BEGIN IMMEDIATE')
+        previous = {
+            row['task_id']: (row['block_hash'], bool(row['completed']))
+            for row in conn.execute('SELECT task_id, block_hash, completed FROM sync_tasks WHERE source = ?', (source,))
+        }
+        
+        # 新增：批量导入（数据库中已存在的同名任务会被跳过，以数据库状态为准）
+        added = [
+            dict(task, progress=100 if task.get('completed') else 0)
+            for task_id, (task, _) in blocks.items() if task_id not in previous
+        ]
+        if added:
+            result['added'] = len(create_tasks_bulk(added, creator=user, progress_note='completed')['created'])
+        
+        # 删除：从清单中移除的任务
+        removed = [(task_id,) for task_id in previous if task_id not in blocks]
+        if removed and not allow_mass_removal and (
+                not blocks or (len(removed) >= SYNC_REMOVE_GUARD_MIN
+                               and len(removed) > len(previous) * SYNC_MAX_REMOVE_RATIO)):
+            print(f"Warning: sync from {source} would remove {len(removed)} of {len(previous)} tasks "
+                  f"({len(blocks)} parsed), skipping removal until confirmed with allow_mass_removal")
+            result['removal_skipped'] = len(removed)
+            removed = []
+        conn.executemany('DELETE FROM task_updates WHERE task_id = ?', removed)
+        conn.executemany('DELETE FROM task_updates_archive WHERE task_id = ?', removed)
+        conn.executemany('DELETE FROM tasks WHERE id = ?', removed)
+        conn.executemany('DELETE FROM sync_tasks WHERE source = ? AND task_id = ?', [(source, r[0]) for r in removed])
+        result['removed'] = len(removed)
+        
+        # 变化：更新元数据；只有清单里的完成状态发生变化时才改进度，避免覆盖页面上的进度
+        field_rows = []
+        progress_rows = []
+        update_rows = []
+        for task_id, (task, block_hash) in blocks.items():
+            if task_id not in previous or previous[task_id][0] == block_hash:
+                continue
+            result['changed'] += 1
+            field_rows.append((task.get('priority', 'normal'), task.get('category', ''), task.get('source', ''), now, task_id))
+            completed = bool(task.get('completed'))
+            if completed != previous[task_id][1]:
+                progress = 100 if completed else 0
+                status = status_for_progress(progress)
+                progress_rows.append((progress, status, now, task_id))
+                update_rows.append((task_id, user, progress, status, 'completed' if completed else 'reopened', now))
+                result['completed' if completed else 'reopened'] += 1
+        conn.executemany('UPDATE tasks SET priority = ?, category = ?, source = ?, updated_at = ? WHERE id = ?', field_rows)
+        conn.executemany('UPDATE tasks SET progress = ?, status = ?, updated_at = ? WHERE id = ?', progress_rows)
+        conn.executemany('''
+            INSERT INTO task_updates (task_id, user, progress, status, note, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', update_rows)
+        
+        # 记录本次同步的任务块和游标（删除被跳过时不记录游标，同样的内容下次同步时重新检查）
+        conn.executemany('''
+            INSERT INTO sync_tasks (source, task_id, block_hash, completed) VALUES (?, ?, ?, ?)
+            ON CONFLICT (source, task_id) DO UPDATE SET block_hash = excluded.block_hash, completed = excluded.completed
+        ''', [(source, task_id, block_hash, int(bool(task.get('completed')))) for task_id, (task, block_hash) in blocks.items()])
+        if not result['removal_skipped']:
+            conn.execute('''
+                INSERT INTO sync_cursors (source, content_sha, synced_at) VALUES (?, ?, ?)
+                ON CONFLICT (source) DO UPDATE SET content_sha = excluded.content_sha, synced_at = excluded.synced_at
+            ''', (source, content_sha, now))
+    
+    return result
+
+# ---------------------------------------------------------------------------
+# 更新历史保留策略：合并连续的进度微调，并把旧记录压缩归档
+# ---------------------------------------------------------------------------
+
+# 同一用户在该时间窗口内的连续进度更新只保留最后一条
+COALESCE_WINDOW_SECONDS = 10 * 60
+# 界面自动生成的备注：拖动进度滑块（static/app.js）和切换完成状态（/api/toggle）
+PROGRESS_NOTE = 'Progress updated'
+TOGGLE_NOTE = 'Toggled status'
+# 只合并这些备注的记录，带人工备注的记录保持原样
+COALESCE_NOTES = ('', PROGRESS_NOTE, TOGGLE_NOTE)
+# 超过该天数的历史记录移入归档表（每个任务最新一条始终保留）
+ARCHIVE_AFTER_DAYS = 90
+
+def compact_task_updates(window_seconds=COALESCE_WINDOW_SECONDS):
+    """合并同一任务下同一用户在时间窗口内的连续进度更新，返回删除的行数"""
+    placeholders = ', '.join('?' * len(COALESCE_NOTES))
+    with db_connection() as conn:
+        cursor = conn.execute(f'''
+            DELETE FROM task_updates WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, user, COALESCE(note, '') AS note, updated_at,
+                           LEAD(user) OVER w AS next_user,
+                           COALESCE(LEAD(note) OVER w, '') AS next_note,
+                           LEAD(updated_at) OVER w AS next_at
+                    FROM task_updates
+                    WINDOW w AS (PARTITION BY task_id ORDER BY updated_at, id)
+                )
+                WHERE next_user = user
+                  AND note = next_note
+                  AND note IN ({placeholders})
+                  AND (julianday(next_at) - julianday(updated_at)) * 86400 <= ?
+            )
+        ''', (*COALESCE_NOTES, window_seconds))
+        return cursor.rowcount
+
+def archive_task_updates(older_than_days=ARCHIVE_AFTER_DAYS):
+    """把旧的历史记录压缩后移入 task_updates_archive
+
+    返回 (归档行数, 生成的归档批次数)。
+    """
+    now = datetime.now()
+    cutoff = (now - timedelta(days=older_than_days)).strftime('%Y-%m-%d %H:%M:%S')
+    archived_at = now.strftime('%Y-%m-%d %H:%M:%S')
+    
+    with db_connection() as conn:
+        if not conn.in_transaction:
+            conn.execute('BEGIN IMMEDIATE')
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        rows = cursor.execute(f'''
+            SELECT task_id, {', '.join(TASK_UPDATE_FIELDS)} FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY task_id ORDER BY updated_at DESC, id DESC) AS rn
+                FROM task_updates
+            )
+            WHERE updated_at < ? AND rn > 1
+            ORDER BY task_id, updated_at, id
+        ''', (cutoff,)).fetchall()
+        
+        batches = {}
+        for row in rows:
+            batches.setdefault(row[0], []).append(row[1:])
+        
+        archive_rows = []
+        for task_id, updates in batches.items():
+            payload = zlib.compress(json.dumps(updates, ensure_ascii=False).encode('utf-8'), 9)
+            archive_rows.append((task_id, updates[0][-1], updates[-1][-1], len(updates), payload, archived_at))
+        
+        conn.executemany('''
+            INSERT INTO task_updates_archive (task_id, first_at, last_at, row_count, payload, archived_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', archive_rows)
+        conn.executemany('DELETE FROM task_updates WHERE id = ?', [(row[1],) for row in rows])
+    
+    return len(rows), len(archive_rows)
+
+def get_archived_task_updates(task_id):
+    """读取任务已归档的历史记录（TaskUpdate 列表，按时间倒序）"""
+    with db_connection() as conn:
+        rows = conn.execute(
+            'SELECT payload FROM task_updates_archive WHERE task_id = ? ORDER BY first_at DESC, id DESC',
+            (task_id,)
+        ).fetchall()
     
     updates = []
     for row in rows:
-        updates.append({
-            'id': row['id'],
-            'user': row['user'],
-            'progress': row['progress'],
-            'status': row['status'],
-            'note': row['note'],
-            'updated_at': row['updated_at']
-        })
-    
+        batch = json.loads(zlib.decompress(row['payload']).decode('utf-8'))
+        updates.extend(TaskUpdate(*values) for values in reversed(batch))
     return updates
 
+def run_history_maintenance(window_seconds=COALESCE_WINDOW_SECONDS, archive_days=ARCHIVE_AFTER_DAYS):
+    """执行一次历史维护（合并 + 归档 + WAL 检查点），返回统计指标"""
+    started = time.perf_counter()
+    with db_connection() as conn:
+        rows_before = conn.execute('SELECT COUNT(*) FROM task_updates').fetchone()[0]
+    
+    coalesced = compact_task_updates(window_seconds)
+    archived, batches = archive_task_updates(archive_days)
+    
+    with db_connection() as conn:
+        rows_after = conn.execute('SELECT COUNT(*) FROM task_updates').fetchone()[0]
+        conn.execute('PRAGMA optimize')
+    # 检查点不能在事务中执行，把 WAL 中的页写回主库并截断 WAL 文件
+    with db_connection() as conn:
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    
+    return {
+        'rows_before': rows_before,
+        'rows_after': rows_after,
+        'coalesced': coalesced,
+        'archived': archived,
+        'archive_batches': batches,
+        'rows_reclaimed': rows_before - rows_after,
+        'seconds': round(time.perf_counter() - started, 3),
+    }
+
 def delete_task(task_id):
     """删除任务"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    # 先删除更新历史
-    cursor.execute('DELETE FROM task_updates WHERE task_id = ?', (task_id,))
-    # 再删除任务
-    cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
+    with db_connection() as conn:
+        # 先删除更新历史（包括已归档的）
+        conn.execute('DELETE FROM task_updates WHERE task_id = ?', (task_id,))
+        conn.execute('DELETE FROM task_updates_archive WHERE task_id = ?', (task_id,))
+        # 再删除任务
+        conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
     
-    conn.commit()
-    conn.close()
     return {'success': True}
 
+TASK_STATS_SQL = 'SELECT priority, status, assignee, count FROM task_stats'
+
+def summarize_task_stats(rows):
+    """把 task_stats 的 (priority, status, assignee, count) 行汇总为统计字典"""
+    stats = {
+        'total': 0,
+        'completed': 0,
+        'pending': 0,
+        'urgent_pending': 0,
+        'high_pending': 0,
+        'normal_pending': 0,
+        'assignees': {},
+    }
+    for priority, status, assignee_name, count in rows:
+        stats['total'] += count
+        assignee = stats['assignees'].setdefault(assignee_name, {'total': 0, 'completed': 0})
+        assignee['total'] += count
+        if status == 'completed':
+            stats['completed'] += count
+            assignee['completed'] += count
+            continue
+        stats['pending'] += count
+        if priority == 'urgent':
+            stats['urgent_pending'] += count
+        elif priority == 'high':
+            stats['high_pending'] += count
+        elif priority in ('normal', ''):
+            stats['normal_pending'] += count
+    
+    stats['completion_rate'] = round(stats['completed'] / stats['total'] * 100, 1) if stats['total'] else 0
+    return stats
+
+def get_task_stats():
+    """获取任务统计（读取增量维护的 task_stats，开销与任务总数无关）"""
+    with db_connection() as conn:
+        rows = conn.execute(TASK_STATS_SQL).fetchall()
+    return summarize_task_stats(rows)
+
 def get_users():
     """获取用户列表"""
-    conn = get_db_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('SELECT DISTINCT assignee FROM tasks WHERE assignee != "" UNION SELECT DISTINCT creator FROM tasks WHERE creator != ""')
-    rows = cursor.fetchall()
-    conn.close()
+    with db_connection() as conn:
+        rows = conn.execute('SELECT DISTINCT assignee FROM tasks WHERE assignee != "" UNION SELECT DISTINCT creator FROM tasks WHERE creator != ""').fetchall()
     
     users = [row[0] for row in rows if row[0]]
     return sorted(set(users))
 
 # 初始化数据库（如果不存在）
 if __name__ == '__main__':
+    import sys
     init_database()
     print("Database setup complete!")
-
+    if '--check-plans' in sys.argv:
+        problems = check_query_plans()
+        for problem in problems:
+            print(f"  ✗ {problem}")
+        print("Query plans OK" if not problems else f"{len(problems)} query plan problem(s)")
+        sys.exit(1 if problems else 0)
@@ -0,0 +1,211 @@
+# github_fetcher.py - 带缓存和条件请求的 GitHub 文件读取
+#
+# 通过 GitHub contents API 读取仓库文件：
+#   - 共享 requests.Session，保持长连接
+#   - 保存 ETag / Last-Modified，再次请求时带 If-None-Match / If-Modified-Since，
+#     未变化时服务器返回 304，直接使用缓存内容（304 不计入 API 速率限制）
+#   - 内容按 (仓库, 分支, 路径) 缓存到磁盘，请求失败时回退到缓存
+#   - 多个候选路径并发探测
+#   - AsyncGitHubFetcher 为基于 httpx 的异步版本（async_api 使用），与同步版本共用缓存
+import base64
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+logger = logging.getLogger('todo_app.github')
+
+# 可通过环境变量指向其他 API 地址（例如本地测试服务器）
+GITHUB_API_URL = os.environ.get('TODO_GITHUB_API_URL', 'https://api.github.com')
+CACHE_DIR = Path(os.environ.get('TODO_GITHUB_CACHE_DIR') or Path(tempfile.gettempdir()) / 'todo-github-cache')
+REQUEST_TIMEOUT = 10
+
+class GitHubFetcher:
+    """读取 GitHub 仓库中的文件（条件请求 + 磁盘缓存）"""
+    
+    def __init__(self, owner, repo, ref='main', api_url=None, cache_dir=None, timeout=REQUEST_TIMEOUT):
+        self.owner = owner
+        self.repo = repo
+        self.ref = ref
+        self.api_url = (api_url or GITHUB_API_URL).rstrip('/')
+        self.cache_dir = Path(cache_dir or CACHE_DIR)
+        self.timeout = timeout
+        self._session = None
+        self._lock = threading.Lock()
+        # 进程内缓存，避免每次都读磁盘
+        self._memory = {}
+    
+    def _default_headers(self):
+        headers = {'Accept': 'application/vnd.github+json'}
+        token = os.environ.get('GITHUB_TOKEN')
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        return headers
+    
+    def _get_session(self):
+        """延迟创建共享 Session（首次使用时才导入 requests）"""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update(self._default_headers())
+                self._session = session
+            return self._session
+    
+    def _cache_key(self, path):
+        raw = f'{self.owner}/{self.repo}@{self.ref}:{path}'
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+    
+    def _load_entry(self, key):
+        """读取缓存条目 {'etag', 'last_modified', 'content'}，不存在时返回 None"""
+        if key in self._memory:
+            return self._memory[key]
+        try:
+            with open(self.cache_dir / f'{key}.json', 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        self._memory[key] = entry
+        return entry
+    
+    def _save_entry(self, key, entry):
+        """写入缓存条目（临时文件 + 重命名，避免并发读到半个文件）"""
+        self._memory[key] = entry
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, self.cache_dir / f'{key}.json')
+        except OSError as e:
+            logger.warning("GitHub cache write failed", extra={"data": {"error": str(e)}})
+    
+    def _drop_entry(self, key):
+        self._memory.pop(key, None)
+        try:
+            (self.cache_dir / f'{key}.json').unlink()
+        except OSError:
+            pass
+    
+    def _prepare(self, path):
+        """返回 (路径, 缓存键, 缓存条目, URL, 条件请求头)"""
+        path = path.replace('\\', '/')
+        key = self._cache_key(path)
+        entry = self._load_entry(key)
+        
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        
+        url = f'{self.api_url}/repos/{self.owner}/{self.repo}/contents/{path}'
+        return path, key, entry, url, headers
+    
+    def _fetch_failed(self, path, entry, error):
+        logger.warning("GitHub fetch error", extra={"data": {"error": str(error), "github_path": path}})
+        return entry['content'] if entry else None
+    
+    def fetch(self, path):
+        """读取文件内容，文件不存在或请求失败且无缓存时返回 None"""
+        path, key, entry, url, headers = self._prepare(path)
+        try:
+            response = self._get_session().get(url, params={'ref': self.ref}, headers=headers, timeout=self.timeout)
+        except Exception as e:
+            return self._fetch_failed(path, entry, e)
+        return self._handle_response(path, key, entry, url, response)
+    
+    def _handle_response(self, path, key, entry, url, response):
+        """处理响应（requests 和 httpx 的响应对象接口相同）"""
+        logger.debug("GitHub API response", extra={"data": {"status_code": response.status_code, "url": url}})
+        
+        if response.status_code == 304 and entry:
+            return entry['content']
+        if response.status_code == 200:
+            data = response.json()
+            if not data.get('content'):
+                return None
+            # Base64 解码（GitHub API 返回的 content 是 base64 编码的）
+            content = base64.b64decode(data['content']).decode('utf-8')
+            self._save_entry(key, {
+                'etag': response.headers.get('ETag'),
+                'last_modified': response.headers.get('Last-Modified'),
+                'content': content,
+            })
+            return content
+        if response.status_code == 404:
+            self._drop_entry(key)
+            return None
+        
+        # 限流或服务端错误时使用旧内容
+        logger.warning("GitHub unexpected status", extra={"data": {"status_code": response.status_code, "github_path": path}})
+        return entry['content'] if entry else None
+    
+    def fetch_first(self, paths):
+        """并发探测多个候选路径，按列表顺序返回第一个存在的 (路径, 内容)
+
+        都不存在时返回 (None, None)。
+        """
+        if not paths:
+            return None, None
+        # 首次探测时才导入线程池，减少冷启动的导入开销
+        from concurrent.futures import ThreadPoolExecutor
+        executor = ThreadPoolExecutor(max_workers=len(paths))
+        try:
+            futures = [executor.submit(self.fetch, path) for path in paths]
+            for path, future in zip(paths, futures):
+                content = future.result()
+                if content:
+                    return path, content
+        finally:
+            # 已拿到结果时不必等待优先级更低的请求
+            executor.shutdown(wait=False, cancel_futures=True)
+        return None, None
+
+class AsyncGitHubFetcher(GitHubFetcher):
+    """GitHubFetcher 的异步版本（httpx.AsyncClient，需要安装 httpx）
+
+    fetch / fetch_first 为协程；客户端绑定创建它的事件循环，只能在同一个循环中使用。
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client = None
+    
+    def _get_client(self):
+        if self._client is None:
+            import httpx
+            self._client = httpx.AsyncClient(headers=self._default_headers(), timeout=self.timeout,
+                                             limits=httpx.Limits(max_connections=8))
+        return self._client
+    
+    async def fetch(self, path):
+        """读取文件内容，文件不存在或请求失败且无缓存时返回 None"""
+        path, key, entry, url, headers = self._prepare(path)
+        try:
+            response = await self._get_client().get(url, params={'ref': self.ref}, headers=headers)
+        except Exception as e:
+            return self._fetch_failed(path, entry, e)
+        return self._handle_response(path, key, entry, url, response)
+    
+    async def fetch_first(self, paths):
+        """并发探测多个候选路径，按列表顺序返回第一个存在的 (路径, 内容)"""
+        import asyncio
+        results = await asyncio.gather(*(self.fetch(path) for path in paths))
+        for path, content in zip(paths, results):
+            if content:
+                return path, content
+        return None, None
+    
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -11,8 +11,8 @@ import subprocess
 script_dir = os.path.dirname(os.path.abspath(__file__))
 os.chdir(script_dir)
 
-# Application file name
-app_file = "工作待办清单桌面应用_精美版.py"
+# Application module (the app is created in this process with DesktopConfig)
+app_file = "app.py"
 app_path = os.path.join(script_dir, app_file)
 
 print("=" * 50)
@@ -63,7 +63,9 @@ print()
 
 # Run application
 try:
-    subprocess.run([sys.executable, app_path], cwd=script_dir)
+    sys.path.insert(0, script_dir)
+    from app import DesktopConfig, create_app, run_app
+    run_app(create_app(DesktopConfig))
 except KeyboardInterrupt:
     print("\n\nApplication stopped by user")
 except Exception as e:
@@ -0,0 +1,41 @@
+# maintain_database.py - 任务历史维护（合并连续进度更新、归档旧记录）
+#
+# 建议定期执行，例如每天一次：
+#   Linux/macOS (cron):  0 3 * * *  python maintain_database.py
+#   Windows: 任务计划程序中新建每日任务，运行 python maintain_database.py
+import argparse
+from database import (
+    init_database, run_history_maintenance, save_snapshot,
+    COALESCE_WINDOW_SECONDS, ARCHIVE_AFTER_DAYS
+)
+
+def main():
+    """执行维护并输出统计"""
+    parser = argparse.ArgumentParser(description='Compact and archive task history')
+    parser.add_argument('--window', type=int, default=COALESCE_WINDOW_SECONDS,
+                        help='coalesce window for same-user progress updates, in seconds')
+    parser.add_argument('--archive-days', type=int, default=ARCHIVE_AFTER_DAYS,
+                        help='archive history rows older than this many days')
+    args = parser.parse_args()
+    
+    print("Initializing database...")
+    init_database()
+    
+    print("Running history maintenance...")
+    metrics = run_history_maintenance(window_seconds=args.window, archive_days=args.archive_days)
+    
+    print(f"\nMaintenance complete!")
+    print(f"  Rows before: {metrics['rows_before']}")
+    print(f"  Coalesced: {metrics['coalesced']}")
+    print(f"  Archived: {metrics['archived']} ({metrics['archive_batches']} batches)")
+    print(f"  Rows after: {metrics['rows_after']}")
+    print(f"  Rows reclaimed: {metrics['rows_reclaimed']}")
+    print(f"  Time: {metrics['seconds']}s")
+    
+    # 历史记录变化不会推进任务变更版本，这里强制保存一次快照（未配置存储时跳过）
+    snapshot = save_snapshot(force=True)
+    if snapshot:
+        print(f"  Snapshot: {snapshot['bytes']} bytes ({snapshot['raw_bytes']} uncompressed)")
+
+if __name__ == '__main__':
+    main()
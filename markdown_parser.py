@@ -0,0 +1,183 @@
+# markdown_parser.py - 工作待办清单 Markdown 解析（app、迁移脚本、GitHub 同步共用）
+#
+# 单次正向逐行扫描：边扫描边记录当前 ## 标题作为分类，
+# 不再为每个任务回溯之前的全部内容。
+import bisect
+import hashlib
+import os
+import re
+import threading
+
+# 任务标记：- [ ] 未完成，- [x] 已完成（每行只取第一个标记）
+TASK_MARKER = re.compile(r'- \[([ x])\] ')
+# 来源标记：来源：后到行尾的内容
+SOURCE_PATTERN = re.compile(r'来源：(.+)')
+
+def detect_priority(text):
+    """根据文本中的标记判断优先级"""
+    if '【紧急】' in text or '【P0】' in text:
+        return 'urgent'
+    if '【P1】' in text:
+        return 'high'
+    return 'normal'
+
+def detect_source(text):
+    """提取“来源：”后的内容"""
+    if '来源：' not in text:
+        return ''
+    match = SOURCE_PATTERN.search(text)
+    return match.group(1).strip() if match else ''
+
+def _heading_category(line):
+    return line.replace('##', '').strip()
+
+def iter_markdown_tasks(content):
+    """逐个生成 Markdown 内容中的任务
+
+    每个任务为字典：id、text、completed、original_status、priority、source、category。
+    任务文本为标记后到行尾的内容；标记后为空时，紧接的下一行（不是新任务时）作为任务文本。
+    """
+    lines = content.split('\n')
+    count = len(lines)
+    category = ''
+    i = 0
+    while i < count:
+        line = lines[i]
+        i += 1
+        match = TASK_MARKER.search(line)
+        if match is None:
+            if line.startswith('##'):
+                category = _heading_category(line)
+            continue
+        
+        # 标记前的部分是标题时（如 "## - [ ] ..."），该任务的分类取这部分
+        prefix = line[:match.start()]
+        task_category = _heading_category(prefix) if prefix.startswith('##') else category
+        if line.startswith('##'):
+            category = _heading_category(line)
+        
+        text = line[match.end():]
+        if not text:
+            if i >= count or lines[i].startswith('- ['):
+                continue
+            text = lines[i]
+            i += 1
+            if text.startswith('##'):
+                category = _heading_category(text)
+        text = text.strip()
+        
+        status = match.group(1)
+        yield {
+            # 生成任务ID（使用哈希值，更稳定）
+            'id': hashlib.md5(text.encode('utf-8')).hexdigest(),
+            'text': text,
+            'completed': status == 'x',
+            'original_status': status,
+            'priority': detect_priority(text),
+            'source': detect_source(text),
+            'category': task_category
+        }
+
+def parse_markdown_tasks(content):
+    """解析 Markdown 内容中的全部任务（列表）"""
+    return list(iter_markdown_tasks(content))
+
+def read_markdown_tasks(file_path):
+    """读取Markdown文件中的任务，文件不存在时返回空列表"""
+    if file_path is None or not file_path.exists():
+        return []
+    
+    with open(file_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    
+    return parse_markdown_tasks(content)
+
+# 推荐改变清单：#### [日期] 推荐改变 #编号，每节到下一个 "#### [" 为止
+RECOMMEND_HEADER = re.compile(r'#### \[(\d{4}-\d{2}-\d{2})\] 推荐改变 #(\d+)')
+SECTION_BOUNDARY = re.compile(r'#### \[')
+CHANGE_BODY = re.compile(r'##### 改变内容\n(.+?)(?=#####|$)', re.DOTALL)
+REASON_BODY = re.compile(r'##### 推荐理由\n(.+?)(?=#####|$)', re.DOTALL)
+
+def iter_recommendations(content):
+    """逐个生成推荐改变（date、num、content、reason）
+
+    先一次性找出所有分节边界，再用 pos/endpos 在原字符串上按节搜索正文，
+    不切片复制内容，总开销与文件大小成线性关系。没有“改变内容”的节会被跳过。
+    """
+    boundaries = [match.start() for match in SECTION_BOUNDARY.finditer(content)]
+    for header in RECOMMEND_HEADER.finditer(content):
+        start = header.end()
+        index = bisect.bisect_left(boundaries, start)
+        end = boundaries[index] if index < len(boundaries) else len(content)
+        
+        content_match = CHANGE_BODY.search(content, start, end)
+        if not content_match:
+            continue
+        reason_match = REASON_BODY.search(content, start, end)
+        yield {
+            'date': header.group(1),
+            'num': header.group(2),
+            'content': content_match.group(1).strip(),
+            'reason': reason_match.group(1).strip() if reason_match else ''
+        }
+
+def parse_recommendations(content):
+    """解析推荐改变清单内容（列表）"""
+    return list(iter_recommendations(content))
+
+class ParseCache:
+    """按 (路径, mtime_ns, 文件大小) 缓存文件解析结果
+
+    文件未变化时直接返回上次的解析结果，不再读取文件和执行正则；
+    文件修改、删除后自动失效。返回值是共享对象，调用方不要修改。
+    """
+    
+    def __init__(self):
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, file_path, parser, default=None):
+        """返回 parser(文件内容) 的结果；文件不存在时返回 default"""
+        if file_path is None:
+            return default
+        path = os.fspath(file_path)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.invalidate(path)
+            return default
+        
+        signature = (stat.st_mtime_ns, stat.st_size)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == signature:
+            self.hits += 1
+            return entry[1]
+        
+        self.misses += 1
+        with open(path, 'r', encoding='utf-8') as f:
+            result = parser(f.read())
+        with self._lock:
+            self._entries[path] = (signature, result)
+        return result
+    
+    def invalidate(self, file_path=None):
+        """使某个文件（或全部）的缓存失效"""
+        with self._lock:
+            if file_path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(os.fspath(file_path), None)
+    
+    def stats(self):
+        """命中/未命中计数"""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+# 进程内共享的解析缓存
+parse_cache = ParseCache()
+
+def read_markdown_tasks_cached(file_path):
+    """带缓存的 read_markdown_tasks（返回任务字典的副本，调用方可以修改）"""
+    tasks = parse_cache.get(file_path, parse_markdown_tasks, default=[])
+    return [dict(task) for task in tasks]
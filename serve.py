@@ -0,0 +1,146 @@
+# serve.py - 生产模式运行（多 worker，供多人同时使用）
+#
+#   python serve.py                                  自动选择服务器，worker 数按 CPU 核数
+#   python serve.py --host 0.0.0.0 --port 8000       允许局域网内的同事访问
+#   python serve.py --server waitress --threads 8
+#
+# 服务器（需另行安装，不在 requirements.txt 中）：
+#   gunicorn（Linux/macOS，pip install gunicorn）
+#       多进程 gthread worker，默认 2 × CPU 核数 + 1 个进程。
+#       kill -HUP <主进程 PID> 平滑重启：新 worker 加载新代码后旧 worker 处理完当前请求再退出
+#       （SSE 长连接最多等 GRACEFUL_TIMEOUT 秒，浏览器断开后会自动重连）
+#   waitress（Windows 也可用，pip install waitress）
+#       单进程多线程（worker 数 × 每个 worker 的线程数），不支持平滑重启
+#   werkzeug  都未安装时的回退，Flask 内置的多线程服务器，仅适合少量用户
+#   uvicorn   ASGI 服务器（需手动指定 --server uvicorn，pip install uvicorn starlette a2wsgi aiosqlite httpx），
+#       运行 async_api.create_asgi_app()：/api/async 异步接口在事件循环中处理，不占用线程；
+#       页面和同步接口在每个 worker 的 --threads 个线程中运行
+#
+# SQLite 在多个 worker 之间的写入：连接使用 WAL + BEGIN IMMEDIATE + busy_timeout，
+# 写事务在数据库锁上排队执行，读不阻塞写；快照恢复和结构迁移由第一个启动的 worker
+# 持有文件锁执行一次（见 database.init_database），旧版 JSON 状态文件同样加文件锁合并写入。
+# 主进程不导入应用，平滑重启时 worker 会重新导入 app.py。
+#
+# 变更推送（/api/changes/stream，SSE）的线程开销：每个打开页面的浏览器标签页占用一个工作线程，
+# 最长 CHANGES_STREAM_SECONDS（默认 300 秒）后断开重连。gthread worker 和 waitress 的线程数固定，
+# 标签页多了会占满线程，普通请求只能排队。因此每个进程最多保持一半线程数的 SSE 连接
+# （MAX_CHANGE_STREAMS），其余标签页收到 503 后改为轮询 /api/changes。标签页关闭后，
+# 服务器要在写心跳失败时才发现连接已断开，名额最迟约 30 秒（两次心跳）后释放。
+# 同时打开的标签页较多时调大 --threads，或设置 TODO_CHANGES_STREAM=0 全部使用轮询。
+import argparse
+import importlib.util
+import os
+import sys
+
+GRACEFUL_TIMEOUT = 30
+# gunicorn 默认 30 秒无心跳即重启 worker；gthread worker 的心跳不受长请求影响
+WORKER_TIMEOUT = 60
+# async_api.create_asgi_app() 需要的可选依赖
+ASGI_DEPENDENCIES = ('starlette', 'a2wsgi', 'aiosqlite', 'httpx')
+
+def default_workers():
+    """gunicorn 推荐的 worker 数：2 × CPU 核数 + 1"""
+    return (os.cpu_count() or 1) * 2 + 1
+
+def change_stream_limit(threads):
+    """每个进程最多保持的 SSE 连接数：一半的线程，至少保留一半处理普通请求
+
+    设置了 TODO_MAX_CHANGE_STREAMS 时使用环境变量的值。
+    """
+    if os.environ.get('TODO_MAX_CHANGE_STREAMS'):
+        return int(os.environ['TODO_MAX_CHANGE_STREAMS'])
+    return max(1, threads // 2)
+
+def pick_server():
+    """自动选择已安装的服务器"""
+    if os.name != 'nt':
+        try:
+            import gunicorn  # noqa: F401
+            return 'gunicorn'
+        except ImportError:
+            pass
+    try:
+        import waitress  # noqa: F401
+        return 'waitress'
+    except ImportError:
+        return 'werkzeug'
+
+def run_gunicorn(args):
+    from gunicorn.app.base import BaseApplication
+
+    class TodoApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{args.host}:{args.port}')
+            self.cfg.set('workers', args.workers)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('threads', args.threads)
+            self.cfg.set('graceful_timeout', GRACEFUL_TIMEOUT)
+            self.cfg.set('timeout', WORKER_TIMEOUT)
+            if args.access_log:
+                self.cfg.set('accesslog', '-')
+
+        def load(self):
+            # 在 worker 中导入，平滑重启时加载新代码
+            from app import create_app
+            return create_app({'MAX_CHANGE_STREAMS': change_stream_limit(args.threads)})
+
+    print(f"Serving with gunicorn on http://{args.host}:{args.port} "
+          f"({args.workers} workers × {args.threads} threads, master PID {os.getpid()}, kill -HUP to reload)")
+    TodoApplication().run()
+
+def run_waitress(args):
+    import waitress
+    from app import create_app
+
+    threads = args.workers * args.threads
+    print(f"Serving with waitress on http://{args.host}:{args.port} ({threads} threads)")
+    app = create_app({'MAX_CHANGE_STREAMS': change_stream_limit(threads)})
+    waitress.serve(app, host=args.host, port=args.port, threads=threads, ident='todo-app')
+
+def run_werkzeug(args):
+    from app import create_app
+
+    print("Warning: gunicorn/waitress not installed, falling back to the development server "
+          "(pip install gunicorn or pip install waitress)")
+    print(f"Serving with werkzeug on http://{args.host}:{args.port}")
+    create_app().run(host=args.host, port=args.port, debug=False, use_reloader=False, threaded=True)
+
+def run_uvicorn(args):
+    import uvicorn
+
+    # 只检查是否安装，主进程不导入应用
+    missing = [name for name in ASGI_DEPENDENCIES if importlib.util.find_spec(name) is None]
+    if missing:
+        raise ImportError(f"missing {', '.join(missing)}")
+    # worker 进程中 create_asgi_app() 从环境变量读取线程数和 SSE 连接上限
+    os.environ['TODO_WSGI_THREADS'] = str(args.threads)
+    os.environ['TODO_MAX_CHANGE_STREAMS'] = str(change_stream_limit(args.threads))
+    print(f"Serving with uvicorn on http://{args.host}:{args.port} "
+          f"({args.workers} workers, {args.threads} threads each for the WSGI routes)")
+    uvicorn.run('async_api:create_asgi_app', factory=True, host=args.host, port=args.port,
+                workers=args.workers, access_log=args.access_log, timeout_graceful_shutdown=GRACEFUL_TIMEOUT)
+
+SERVERS = {'gunicorn': run_gunicorn, 'waitress': run_waitress, 'werkzeug': run_werkzeug, 'uvicorn': run_uvicorn}
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the todo app with a production server')
+    parser.add_argument('--server', choices=['auto'] + list(SERVERS), default='auto')
+    parser.add_argument('--host', default='127.0.0.1', help='use 0.0.0.0 to accept LAN connections')
+    parser.add_argument('--port', type=int, default=int(os.environ.get('PORT', '5000')))
+    parser.add_argument('--workers', type=int, default=int(os.environ.get('TODO_WORKERS', '0')),
+                        help='worker processes (default: 2 × CPU cores + 1)')
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('TODO_THREADS', '4')),
+                        help='threads per worker (each open SSE change stream holds one, at most half are used for streams)')
+    parser.add_argument('--access-log', action='store_true', help='log every request (gunicorn, uvicorn)')
+    args = parser.parse_args()
+
+    args.workers = args.workers if args.workers > 0 else default_workers()
+    server = pick_server() if args.server == 'auto' else args.server
+    try:
+        SERVERS[server](args)
+    except ImportError as e:
+        print(f"ERROR: {server} is not installed ({e})")
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
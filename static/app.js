@@ -0,0 +1,475 @@
+// 接口返回更新后的任务和头部计数，直接修改页面，不再整页刷新
+
+// 更新头部统计、进度条和各分组计数
+function applyStats(stats) {
+    if (stats) {
+        document.querySelectorAll('[data-stat]').forEach(el => {
+            if (stats[el.dataset.stat] !== undefined) {
+                el.textContent = stats[el.dataset.stat];
+            }
+        });
+        document.querySelector('.progress-percent').textContent = stats.completion_rate + '%';
+        document.querySelector('.progress-fill').style.width = stats.completion_rate + '%';
+        document.getElementById('pending-empty').style.display = stats.total_pending ? 'none' : '';
+        document.getElementById('completed-empty').style.display = stats.completed_count ? 'none' : '';
+        updateCompletedMore();
+    } else {
+        // 旧版模式没有统计接口，页面渲染了全部未完成任务，按页面中的任务行计数
+        document.querySelectorAll('.task-group[data-group]').forEach(group => {
+            group.querySelector('.group-count').textContent = group.querySelectorAll('.task-item').length;
+        });
+    }
+}
+
+// “还有 N 个已完成任务”：已完成总数减去页面中已显示的条数
+function updateCompletedMore() {
+    const count = parseInt(document.querySelector('#completed-section [data-stat="completed_count"]').textContent, 10);
+    const shown = document.querySelectorAll('#completed-section > .task-item').length;
+    const more = count - shown;
+    document.getElementById('completed-more').style.display = more > 0 ? '' : 'none';
+    document.getElementById('completed-more-count').textContent = more;
+}
+
+// 分组列表中的任务行（不含筛选结果中的副本）
+function findTaskItem(taskId) {
+    const selector = '.task-checkbox[data-task="' + CSS.escape(taskId) + '"]';
+    const checkbox = document.querySelector('#pending-section ' + selector + ', #completed-section ' + selector);
+    return checkbox ? checkbox.closest('.task-item') : null;
+}
+
+function escapeHtml(text) {
+    const div = document.createElement('div');
+    div.textContent = text;
+    return div.innerHTML;
+}
+
+// 按任务状态设置任务行的样式和勾选状态
+function setTaskItemState(item, task) {
+    item.classList.remove('urgent', 'high', 'normal', 'completed');
+    item.classList.add(task.completed ? 'completed' : (task.priority || 'normal'));
+    item.querySelector('.task-checkbox').checked = !!task.completed;
+}
+
+// 任务行：已完成的移到“已完成任务”区顶部，未完成的移回所属优先级分组（筛选结果中的行原地更新）
+function placeTaskItem(item, task) {
+    const priority = task.priority || 'normal';
+    setTaskItemState(item, task);
+    if (item.closest('#filter-section')) {
+        return;
+    }
+
+    if (task.completed) {
+        document.querySelector('#completed-section > .section-header').after(item);
+    } else {
+        const list = document.querySelector('.task-group[data-group="' + priority + '"] .task-list');
+        if (list) {
+            list.prepend(item);
+        } else {
+            document.getElementById('pending-empty').before(item);
+        }
+    }
+}
+
+// 更新任务行中的进度条
+function updateTaskItemProgress(item, task) {
+    if (task.progress === undefined) {
+        return;
+    }
+    const fill = item.querySelector('.task-progress-fill');
+    const text = item.querySelector('.task-progress-text');
+    if (fill) fill.style.width = task.progress + '%';
+    if (text) text.textContent = task.progress + '%';
+}
+
+// 根据接口返回的任务生成任务行（结构与模板一致）
+function createTaskItem(task) {
+    const item = document.createElement('div');
+    item.className = 'task-item';
+    item.onclick = event => toggleTask(item, task.id, event);
+
+    let html = '<input type="checkbox" class="task-checkbox"><div class="task-content">' +
+        '<div class="task-text">' + escapeHtml(task.text).replace(/\n/g, '<br>') + '</div>';
+    if (task.assignee) {
+        html += '<div class="task-assignee">👤 ' + escapeHtml(task.assignee) + '</div>';
+    }
+    if (task.progress !== undefined) {
+        html += '<div class="task-progress-container"><div class="task-progress-bar">' +
+            '<div class="task-progress-fill" style="width: ' + task.progress + '%"></div></div>' +
+            '<span class="task-progress-text">' + task.progress + '%</span></div>';
+    }
+    if (task.source) {
+        html += '<div class="task-source">📍 ' + escapeHtml(task.source) + '</div>';
+    }
+    if (task.due_date) {
+        html += '<div class="task-meta"><span class="task-meta-item">📅 ' + escapeHtml(task.due_date) + '</span></div>';
+    }
+    item.innerHTML = html + '</div>';
+
+    const checkbox = item.querySelector('.task-checkbox');
+    checkbox.dataset.task = task.id;
+    checkbox.onclick = event => {
+        event.stopPropagation();
+        toggleTask(item, task.id, event);
+    };
+    return item;
+}
+
+// 其他人修改的任务：更新已有行或插入新行
+function applyTaskChange(task) {
+    let item = findTaskItem(task.id);
+    if (item) {
+        item.querySelector('.task-text').innerHTML = escapeHtml(task.text).replace(/\n/g, '<br>');
+        updateTaskItemProgress(item, task);
+    } else {
+        item = createTaskItem(task);
+    }
+    placeTaskItem(item, task);
+}
+
+// 多人协作：订阅变更（仅数据库模式，页面 body 带有 data-change-version）
+const CHANGES_POLL_MS = 15000;
+let changeVersion = null;
+
+function applyChanges(data) {
+    if (data.reset) {
+        // 服务端数据被重建，版本号对不上，只能整页重新加载
+        location.reload();
+        return;
+    }
+    (data.tasks || []).forEach(applyTaskChange);
+    (data.deleted || []).forEach(taskId => {
+        const item = findTaskItem(taskId);
+        if (item) item.remove();
+    });
+    applyStats(data.stats);
+    if (Object.keys(filterParams()).length) {
+        // 筛选结果由服务端计算，有变更时重新加载
+        applyFilters();
+    }
+    changeVersion = data.version;
+}
+
+function pollChanges() {
+    fetch('/api/changes?since=' + changeVersion)
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            applyChanges(data);
+            if (data.more) pollChanges();
+        }
+    })
+    .catch(err => console.error('Error polling changes:', err));
+}
+
+function subscribeChanges() {
+    const version = document.body.dataset.changeVersion;
+    if (version === undefined) {
+        return;
+    }
+    changeVersion = parseInt(version, 10);
+    if (window.EventSource && 'changesStream' in document.body.dataset) {
+        // 断线后浏览器自动重连，并通过 Last-Event-ID 从上次的版本继续
+        const source = new EventSource('/api/changes/stream?since=' + changeVersion);
+        source.addEventListener('changes', event => applyChanges(JSON.parse(event.data)));
+        source.addEventListener('error', () => {
+            // 服务器拒绝连接（连接数已满）时不会自动重连，改为轮询
+            if (source.readyState === EventSource.CLOSED) {
+                setInterval(pollChanges, CHANGES_POLL_MS);
+            }
+        });
+    } else {
+        setInterval(pollChanges, CHANGES_POLL_MS);
+    }
+}
+
+function toggleTask(element, taskId, event) {
+    if (event) {
+        event.stopPropagation();
+    }
+    const checkbox = element.querySelector('.task-checkbox');
+    const completed = !checkbox.checked;
+    checkbox.checked = completed;
+
+    fetch('/api/toggle', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({task_id: taskId, completed: completed})
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            throw new Error(data.error || 'Toggle failed');
+        }
+        placeTaskItem(element, data.task || {id: taskId, completed: completed});
+        updateTaskItemProgress(element, data.task || {});
+        if (data.task && element.closest('#filter-section')) {
+            // 在筛选结果中操作时同步更新分组列表中的同一任务
+            applyTaskChange(data.task);
+        }
+        applyStats(data.stats);
+    }).catch(err => {
+        console.error('Error toggling task:', err);
+        checkbox.checked = !completed;
+    });
+}
+
+function toggleGroup(element) {
+    const group = element.closest('.task-group');
+    const taskList = group.querySelector('.task-list');
+    const isCollapsed = element.classList.contains('collapsed');
+
+    if (isCollapsed) {
+        element.classList.remove('collapsed');
+        taskList.classList.remove('collapsed');
+        setTimeout(() => {
+            taskList.style.maxHeight = taskList.scrollHeight + 'px';
+        }, 10);
+    } else {
+        taskList.style.maxHeight = taskList.scrollHeight + 'px';
+        setTimeout(() => {
+            taskList.style.maxHeight = '0px';
+        }, 10);
+        setTimeout(() => {
+            element.classList.add('collapsed');
+            taskList.classList.add('collapsed');
+        }, 300);
+    }
+}
+
+// 分页加载：每次从 /api/tasks 取一页，游标记录在按钮的 data-next-cursor 上
+const TASKS_PAGE_SIZE = 50;
+
+function taskPageUrl(params, cursor) {
+    const query = new URLSearchParams(params);
+    query.set('limit', TASKS_PAGE_SIZE);
+    if (cursor) {
+        query.set('cursor', cursor);
+    }
+    return '/api/tasks?' + query.toString();
+}
+
+// 首页分组对应的筛选条件（与 app.group_filters 一致）
+function groupParams(group) {
+    return group === 'completed' ? {completed: 1} : {priority: group, completed: 0};
+}
+
+function loadGroupPage(group, button) {
+    if (button.dataset.loading) {
+        return;
+    }
+    button.dataset.loading = '1';
+    fetch(taskPageUrl(groupParams(group), button.dataset.nextCursor))
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            throw new Error(data.error || 'Load failed');
+        }
+        data.tasks.forEach(task => {
+            // 已通过变更推送或页面操作移入分组的任务不重复添加
+            if (findTaskItem(task.id)) {
+                return;
+            }
+            const item = createTaskItem(task);
+            setTaskItemState(item, task);
+            button.before(item);
+        });
+        if (data.next_cursor) {
+            button.dataset.nextCursor = data.next_cursor;
+            if (group !== 'completed') {
+                button.textContent = '加载更多 ▼';
+            }
+        } else {
+            delete button.dataset.nextCursor;
+            button.style.display = 'none';
+        }
+        if (group === 'completed') {
+            updateCompletedMore();
+        }
+        const list = button.closest('.task-list');
+        if (list && !list.classList.contains('collapsed')) {
+            list.style.maxHeight = list.scrollHeight + 'px';
+        }
+    })
+    .catch(err => console.error('Error loading tasks:', err))
+    .finally(() => delete button.dataset.loading);
+}
+
+function showMore(type, event) {
+    if (event) {
+        event.stopPropagation();
+    }
+    const expandBtn = event.currentTarget;
+    if (expandBtn.dataset.nextCursor) {
+        loadGroupPage(type, expandBtn);
+        return;
+    }
+
+    // 旧版模式：其余任务已渲染在折叠区中
+    const hiddenList = document.getElementById(type + '-more');
+    if (hiddenList && hiddenList !== expandBtn) {
+        hiddenList.classList.add('expanded');
+        expandBtn.style.display = 'none';
+    }
+}
+
+// 任务创建模态框
+function showCreateTaskModal() {
+    document.getElementById('createTaskModal').style.display = 'block';
+}
+
+function closeCreateTaskModal() {
+    document.getElementById('createTaskModal').style.display = 'none';
+    document.getElementById('createTaskForm').reset();
+}
+
+// 点击模态框外部关闭
+window.onclick = function(event) {
+    const modal = document.getElementById('createTaskModal');
+    if (event.target == modal) {
+        closeCreateTaskModal();
+    }
+}
+
+// 提交创建任务
+function submitCreateTask(event) {
+    event.preventDefault();
+
+    const formData = {
+        text: document.getElementById('task-text').value,
+        priority: document.getElementById('task-priority').value,
+        category: document.getElementById('task-category').value,
+        assignee: document.getElementById('task-assignee').value,
+        due_date: document.getElementById('task-due-date').value,
+        notes: document.getElementById('task-notes').value,
+        creator: 'User'  // 可以从localStorage或cookie获取
+    };
+
+    fetch('/api/task/create', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(formData)
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            closeCreateTaskModal();
+            if (data.task) {
+                placeTaskItem(createTaskItem(data.task), data.task);
+                applyStats(data.stats);
+            }
+        } else {
+            alert('创建任务失败: ' + (data.error || '未知错误'));
+        }
+    })
+    .catch(err => {
+        console.error('Error:', err);
+        alert('创建任务时发生错误');
+    });
+}
+
+// 更新任务进度
+function updateTaskProgress(taskId, progress) {
+    fetch('/api/task/' + taskId + '/progress', {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify({
+            progress: progress,
+            user: 'User',
+            // 与 database.PROGRESS_NOTE 一致，连续拖动产生的记录会被历史维护合并
+            note: 'Progress updated'
+        })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            const item = findTaskItem(taskId);
+            if (item && data.task) {
+                updateTaskItemProgress(item, data.task);
+                placeTaskItem(item, data.task);
+            }
+            applyStats(data.stats);
+        } else {
+            alert('更新进度失败: ' + (data.error || '未知错误'));
+        }
+    })
+    .catch(err => {
+        console.error('Error:', err);
+        alert('更新进度时发生错误');
+    });
+}
+
+// 筛选：由服务端（/api/tasks）筛选并分页，结果显示在“筛选结果”区，替代分组列表
+let filterCursor = null;
+let filterRequest = 0;
+
+function filterParams() {
+    const params = {};
+    ['assignee', 'status', 'priority'].forEach(name => {
+        const value = document.getElementById('filter-' + name)?.value;
+        if (value) {
+            params[name] = value;
+        }
+    });
+    return params;
+}
+
+function applyFilters() {
+    loadFilteredTasks(false);
+}
+
+function loadFilteredTasks(more) {
+    const params = filterParams();
+    const active = Object.keys(params).length > 0;
+    const results = document.getElementById('filter-results');
+    document.getElementById('pending-section').style.display = active ? 'none' : '';
+    document.getElementById('completed-section').style.display = active ? 'none' : '';
+    document.getElementById('filter-section').style.display = active ? '' : 'none';
+    const request = ++filterRequest;
+    if (!active) {
+        results.innerHTML = '';
+        return;
+    }
+
+    fetch(taskPageUrl(params, more ? filterCursor : null))
+    .then(response => response.json())
+    .then(data => {
+        // 筛选条件已经改变，丢弃过期的结果
+        if (request !== filterRequest) {
+            return;
+        }
+        if (!data.success) {
+            throw new Error(data.error || 'Filter failed');
+        }
+        if (!more) {
+            results.innerHTML = '';
+        }
+        data.tasks.forEach(task => {
+            const item = createTaskItem(task);
+            setTaskItemState(item, task);
+            results.append(item);
+        });
+        filterCursor = data.next_cursor;
+        document.getElementById('filter-more').style.display = filterCursor ? '' : 'none';
+        document.getElementById('filter-empty').style.display = results.children.length ? 'none' : '';
+    })
+    .catch(err => console.error('Error filtering tasks:', err));
+}
+
+// 初始化：展开紧急任务组
+document.addEventListener('DOMContentLoaded', function() {
+    const allGroups = document.querySelectorAll('.task-group');
+    allGroups.forEach(function(group) {
+        const title = group.querySelector('.group-title');
+        const list = group.querySelector('.task-list');
+        if (title && list) {
+            // 如果标题包含"紧急"，默认展开
+            if (title.textContent.includes('紧急')) {
+                title.classList.remove('collapsed');
+                list.classList.remove('collapsed');
+                list.style.maxHeight = list.scrollHeight + 'px';
+            }
+        }
+    });
+
+    subscribeChanges();
+});
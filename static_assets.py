@@ -0,0 +1,125 @@
+# static_assets.py - 静态资源指纹与响应压缩
+#
+#   - asset_url('app.css') 生成带内容指纹的地址（/static/app.css?v=<hash>），
+#     文件内容变化后地址随之变化，因此可以让浏览器长期缓存（immutable）
+#   - 文本类响应（HTML/CSS/JS/JSON）按 Accept-Encoding 压缩：
+#     优先 brotli（已安装 brotli 包时），否则 gzip
+#   - 静态文件的压缩结果按内容指纹缓存在内存中，只压缩一次
+import gzip
+import hashlib
+import os
+import threading
+
+from flask import request, url_for
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖
+    brotli = None
+
+# 带指纹的静态资源缓存一年
+ASSET_MAX_AGE = 365 * 24 * 3600
+# 小于该字节数的响应不压缩（压缩收益小于开销）
+COMPRESS_MIN_SIZE = 500
+COMPRESSIBLE_TYPES = {
+    'text/html', 'text/css', 'text/plain', 'text/javascript',
+    'application/javascript', 'application/json', 'image/svg+xml',
+}
+# 动态响应用较快的压缩级别，静态资源只压缩一次，用最高级别
+DYNAMIC_LEVELS = {'br': 5, 'gzip': 6}
+STATIC_LEVELS = {'br': 11, 'gzip': 9}
+
+_lock = threading.Lock()
+# 文件名 -> (mtime_ns, size, 指纹)
+_fingerprints = {}
+# (文件名, 指纹, 编码) -> 压缩后的内容
+_compressed_assets = {}
+
+def _fingerprint(static_folder, filename):
+    """文件内容指纹（文件未变化时使用缓存）"""
+    path = os.path.join(static_folder, filename)
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    with _lock:
+        cached = _fingerprints.get(filename)
+        if cached and cached[:2] == (st.st_mtime_ns, st.st_size):
+            return cached[2]
+    with open(path, 'rb') as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:12]
+    with _lock:
+        _fingerprints[filename] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+def _compress(data, encoding, levels):
+    if encoding == 'br':
+        return brotli.compress(data, quality=levels['br'])
+    return gzip.compress(data, compresslevel=levels['gzip'], mtime=0)
+
+def _supported_encodings():
+    return ['br', 'gzip'] if brotli else ['gzip']
+
+def init_static_assets(app):
+    """注册 asset_url 模板函数以及缓存、压缩响应处理"""
+
+    def asset_url(filename):
+        digest = _fingerprint(app.static_folder, filename)
+        if digest is None:
+            return url_for('static', filename=filename)
+        return url_for('static', filename=filename, v=digest)
+
+    @app.context_processor
+    def inject_asset_url():
+        return {'asset_url': asset_url}
+
+    @app.after_request
+    def cache_and_compress(response):
+        is_static = request.endpoint == 'static'
+        filename = (request.view_args or {}).get('filename') if is_static else None
+        digest = None
+        if is_static and filename and request.args.get('v'):
+            digest = _fingerprint(app.static_folder, filename)
+            if digest == request.args.get('v'):
+                response.cache_control.no_cache = None
+                response.cache_control.public = True
+                response.cache_control.max_age = ASSET_MAX_AGE
+                response.cache_control.immutable = True
+            else:
+                digest = None
+
+        if (response.status_code != 200 or response.mimetype not in COMPRESSIBLE_TYPES
+                or 'Content-Encoding' in response.headers
+                or (response.is_streamed and not response.direct_passthrough)):
+            return response
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(_supported_encodings())
+        if not encoding:
+            return response
+
+        # send_file 返回的是文件迭代器，需要先读出内容
+        response.direct_passthrough = False
+        data = response.get_data()
+        if len(data) < COMPRESS_MIN_SIZE:
+            return response
+
+        if digest:
+            key = (filename, digest, encoding)
+            with _lock:
+                body = _compressed_assets.get(key)
+            if body is None:
+                body = _compress(data, encoding, STATIC_LEVELS)
+                with _lock:
+                    _compressed_assets[key] = body
+        else:
+            body = _compress(data, encoding, DYNAMIC_LEVELS)
+
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+        # 压缩后内容不同，改为弱 ETag（If-None-Match 按弱比较，仍可返回 304）
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    return asset_url
@@ -0,0 +1,176 @@
+# status_store.py - 旧版 JSON 任务状态存储（任务状态.json）
+#
+# 未启用数据库时，任务完成状态保存在一个 JSON 文件中：
+#   - 修改先记录在内存里，短时间内的多次切换合并为一次写入（防抖）
+#   - 写入时持有文件锁，先读取磁盘上的最新内容再合并本进程的修改，
+#     多个进程同时切换不会互相覆盖
+#   - 临时文件 + os.replace 原子替换，读方不会看到写了一半的文件
+import atexit
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger('todo_app.status')
+
+# 防抖延迟（秒），0 表示每次修改立即写入
+FLUSH_DELAY = float(os.environ.get('TODO_STATUS_FLUSH_DELAY', '0.5'))
+
+# 待写入的删除标记
+_DELETED = object()
+
+@contextmanager
+def file_lock(path):
+    """独占文件锁（POSIX 用 fcntl，Windows 用 msvcrt），锁文件为 <path>.lock"""
+    lock_path = Path(f'{path}.lock')
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, 'a+b') as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+def _read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning("Status file unreadable", extra={"data": {"path": str(path), "error": str(e)}})
+        return {}
+
+def _write_json_atomic(path, data):
+    """写入 JSON（临时文件 + 重命名）"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+class StatusStore:
+    """任务状态存储（task_id -> completed）"""
+
+    def __init__(self, path, flush_delay=FLUSH_DELAY):
+        self.path = Path(path) if path else None
+        self.flush_delay = flush_delay
+        self._lock = threading.RLock()
+        self._status = None
+        self._signature = None
+        # 尚未写入磁盘的修改：key -> 值或 _DELETED
+        self._pending = {}
+        self._timer = None
+        self.flushes = 0
+        atexit.register(self.flush)
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def _refresh(self):
+        """文件被其他进程修改过时重新读取，并叠加本进程未写入的修改"""
+        signature = self._file_signature() if self.path else None
+        if self._status is not None and signature == self._signature:
+            return
+        status = _read_json(self.path) if signature else {}
+        for key, value in self._pending.items():
+            if value is _DELETED:
+                status.pop(key, None)
+            else:
+                status[key] = value
+        self._status = status
+        self._signature = signature
+
+    def load(self):
+        """返回当前状态（副本）"""
+        with self._lock:
+            self._refresh()
+            return dict(self._status)
+
+    def update(self, changes=None, removals=()):
+        """批量修改状态：changes 为要设置的键值，removals 为要删除的键"""
+        with self._lock:
+            self._refresh()
+            for key, value in (changes or {}).items():
+                self._status[key] = value
+                self._pending[key] = value
+            for key in removals:
+                self._status.pop(key, None)
+                self._pending[key] = _DELETED
+            if not self._pending:
+                return
+            if self.flush_delay <= 0:
+                self.flush()
+            elif self._timer is None:
+                # 第一次修改时启动计时器，窗口内的后续修改一起写入
+                self._timer = threading.Timer(self.flush_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def set(self, key, value):
+        """设置单个任务状态"""
+        self.update({key: value})
+
+    def flush(self):
+        """把未写入的修改写入磁盘"""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending or self.path is None:
+                self._pending.clear()
+                return
+            pending, self._pending = self._pending, {}
+            try:
+                with file_lock(self.path):
+                    # 以磁盘上的最新内容为基础合并，避免覆盖其他进程的修改
+                    status = _read_json(self.path)
+                    for key, value in pending.items():
+                        if value is _DELETED:
+                            status.pop(key, None)
+                        else:
+                            status[key] = value
+                    _write_json_atomic(self.path, status)
+            except OSError as e:
+                # 写入失败时保留修改，下次再试
+                self._pending = pending
+                logger.warning("Status file write failed", extra={"data": {"path": str(self.path), "error": str(e)}})
+                return
+            self._status = status
+            self._signature = self._file_signature()
+            self.flushes += 1
+
+    def stats(self):
+        with self._lock:
+            return {'pending': len(self._pending), 'flushes': self.flushes}
@@ -0,0 +1,245 @@
+# storage.py - 数据库快照的持久化存储
+#
+# Serverless 部署（Vercel）时数据库位于 /tmp，冷启动后通常是空的。
+# 设置环境变量 TODO_SNAPSHOT_URL 后：
+#   - 冷启动时从存储读取快照（压缩的 SQLite 页镜像），直接写成数据库文件
+#   - 数据发生变化后，把新的快照写回存储
+# 支持的存储位置：
+#   file:///path/to/dir 或目录路径   本地目录（测试、单机部署）
+#   s3://bucket/prefix               S3 兼容对象存储（需要安装 boto3）
+# 压缩优先使用 zstd（已安装 zstandard 包时），否则使用 zlib。
+#
+# 写入是条件写入：存储中的快照版本（本地文件的 mtime/大小、S3 的 ETag）与本实例恢复或
+# 上次保存时的版本不一致，说明其他实例已写入更新的快照，抛出 SnapshotConflict 而不覆盖。
+import os
+import sqlite3
+import tempfile
+import time
+import zlib
+from pathlib import Path
+from urllib.parse import urlparse
+
+from status_store import file_lock
+
+try:
+    import zstandard
+except ImportError:  # zstandard 为可选依赖
+    zstandard = None
+
+SNAPSHOT_NAME = 'tasks.db.snapshot'
+
+# 快照格式：MAGIC + 压缩算法（1 字节）+ 压缩后的页镜像
+MAGIC = b'TODOSNAP1'
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+
+class SnapshotConflict(Exception):
+    """存储中的快照已被其他实例更新（条件写入失败）"""
+
+class LocalDirectorySink:
+    """本地目录存储（版本为文件的 mtime 和大小）"""
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+
+    @staticmethod
+    def _stat_version(stat):
+        return f'{stat.st_mtime_ns}-{stat.st_size}'
+
+    def version(self, name):
+        """当前版本，不存在时返回 None"""
+        try:
+            return self._stat_version(os.stat(self.directory / name))
+        except FileNotFoundError:
+            return None
+
+    def read(self, name):
+        """返回 (内容, 版本)，不存在时返回 (None, None)"""
+        try:
+            with open(self.directory / name, 'rb') as f:
+                return f.read(), self._stat_version(os.fstat(f.fileno()))
+        except FileNotFoundError:
+            return None, None
+
+    def write(self, name, data, expected_version):
+        """当前版本为 expected_version（None 表示不存在）时写入，返回新版本
+
+        临时文件 + 重命名，读方不会看到写了一半的快照；比较和替换在文件锁内完成。
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.directory / name):
+            if self.version(name) != expected_version:
+                raise SnapshotConflict(f'{name} was updated by another instance')
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix=f'.{name}.', suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, self.directory / name)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+                raise
+            return self.version(name)
+
+class S3Sink:
+    """S3 兼容对象存储（凭据和地址按 boto3 的标准环境变量配置，版本为 ETag）
+
+    条件写入使用 If-Match / If-None-Match，需要存储支持（AWS S3 自 2024 年起支持）。
+    """
+
+    def __init__(self, bucket, prefix=''):
+        try:
+            import boto3
+        except ImportError:
+            raise RuntimeError('S3 snapshot storage requires boto3 (pip install boto3)')
+        self.bucket = bucket
+        self.prefix = prefix.strip('/')
+        self._client = boto3.client('s3', endpoint_url=os.environ.get('TODO_S3_ENDPOINT_URL') or None)
+
+    def _key(self, name):
+        return f'{self.prefix}/{name}' if self.prefix else name
+
+    def version(self, name):
+        from botocore.exceptions import ClientError
+        try:
+            return self._client.head_object(Bucket=self.bucket, Key=self._key(name))['ETag']
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return None
+            raise
+
+    def read(self, name):
+        try:
+            response = self._client.get_object(Bucket=self.bucket, Key=self._key(name))
+        except self._client.exceptions.NoSuchKey:
+            return None, None
+        return response['Body'].read(), response['ETag']
+
+    def write(self, name, data, expected_version):
+        from botocore.exceptions import ClientError
+        condition = {'IfMatch': expected_version} if expected_version else {'IfNoneMatch': '*'}
+        try:
+            response = self._client.put_object(Bucket=self.bucket, Key=self._key(name), Body=data, **condition)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                raise SnapshotConflict(f'{name} was updated by another instance') from e
+            raise
+        return response['ETag']
+
+def open_sink(url):
+    """根据地址创建存储"""
+    parsed = urlparse(url)
+    # Windows 盘符（C:\...）会被解析成单字母 scheme，按目录处理
+    if parsed.scheme == '' or len(parsed.scheme) == 1:
+        return LocalDirectorySink(url)
+    if parsed.scheme == 'file':
+        return LocalDirectorySink(parsed.path)
+    if parsed.scheme == 's3':
+        return S3Sink(parsed.netloc, parsed.path)
+    raise ValueError(f'Unsupported snapshot storage: {url}')
+
+def encode_snapshot(image):
+    """压缩页镜像（每次写入后都会保存快照，使用较快的压缩级别）"""
+    if zstandard:
+        return MAGIC + bytes([CODEC_ZSTD]) + zstandard.ZstdCompressor(level=3).compress(image)
+    return MAGIC + bytes([CODEC_ZLIB]) + zlib.compress(image, 1)
+
+def decode_snapshot(data):
+    """解压快照，格式不正确时抛出 ValueError"""
+    if not data.startswith(MAGIC) or len(data) <= len(MAGIC):
+        raise ValueError('Not a task database snapshot')
+    codec = data[len(MAGIC)]
+    payload = data[len(MAGIC) + 1:]
+    if codec == CODEC_ZLIB:
+        return zlib.decompress(payload)
+    if codec == CODEC_ZSTD:
+        if zstandard is None:
+            raise ValueError('Snapshot is zstd-compressed but zstandard is not installed')
+        return zstandard.ZstdDecompressor().decompress(payload)
+    raise ValueError(f'Unknown snapshot codec: {codec}')
+
+def load_database(image, conn):
+    """把页镜像通过在线备份写入已打开的数据库（其他连接无需重新打开）"""
+    # WAL 模式的镜像（文件头第 18、19 字节为 2）无法在内存数据库中打开，改为回滚日志模式
+    if image[18:20] == b'\x02\x02':
+        image = image[:18] + b'\x01\x01' + image[20:]
+    memory = sqlite3.connect(':memory:')
+    try:
+        memory.deserialize(image)
+        memory.backup(conn)
+    finally:
+        memory.close()
+
+def dump_database(conn):
+    """通过在线备份得到一致的数据库页镜像（不阻塞其他读写）"""
+    memory = sqlite3.connect(':memory:')
+    try:
+        conn.backup(memory)
+        return memory.serialize()
+    finally:
+        memory.close()
+
+class SnapshotStore:
+    """把数据库快照保存到存储 / 从存储恢复"""
+
+    def __init__(self, sink, name=SNAPSHOT_NAME):
+        self.sink = sink
+        self.name = name
+
+    def version(self):
+        """存储中快照的当前版本，没有快照时返回 None"""
+        return self.sink.version(self.name)
+
+    def save(self, conn, expected_version):
+        """存储中的快照仍是 expected_version 时保存，返回 {'bytes', 'raw_bytes', 'ms', 'version'}
+
+        其他实例已写入更新的快照时抛出 SnapshotConflict。
+        """
+        start = time.perf_counter()
+        image = dump_database(conn)
+        data = encode_snapshot(image)
+        version = self.sink.write(self.name, data, expected_version)
+        return {'bytes': len(data), 'raw_bytes': len(image), 'ms': (time.perf_counter() - start) * 1000,
+                'version': version}
+
+    def restore(self, db_path):
+        """把快照写成数据库文件
+
+        存储中没有快照时返回 None，否则返回 {'bytes', 'raw_bytes', 'ms', 'version'}。
+        """
+        start = time.perf_counter()
+        data, version = self.sink.read(self.name)
+        if data is None:
+            return None
+        image = decode_snapshot(data)
+
+        db_path = Path(db_path)
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        # 旧的 WAL/共享内存文件与新镜像不匹配，必须一起删除
+        for suffix in ('-wal', '-shm'):
+            try:
+                os.unlink(f'{db_path}{suffix}')
+            except FileNotFoundError:
+                pass
+        fd, tmp_path = tempfile.mkstemp(dir=db_path.parent, prefix=f'.{db_path.name}.', suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(image)
+        os.replace(tmp_path, db_path)
+        return {'bytes': len(data), 'raw_bytes': len(image), 'ms': (time.perf_counter() - start) * 1000,
+                'version': version}
+
+    def restore_into(self, conn):
+        """用存储中的快照替换已打开的数据库的内容
+
+        存储中没有快照时返回 None，否则返回 {'bytes', 'raw_bytes', 'ms', 'version'}。
+        """
+        start = time.perf_counter()
+        data, version = self.sink.read(self.name)
+        if data is None:
+            return None
+        image = decode_snapshot(data)
+        load_database(image, conn)
+        return {'bytes': len(data), 'raw_bytes': len(image), 'ms': (time.perf_counter() - start) * 1000,
+                'version': version}
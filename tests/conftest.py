@@ -0,0 +1,29 @@
+# tests/conftest.py - 公共夹具：每个测试使用独立的临时数据库
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT))
+
+import database  # noqa: E402
+
+
+@pytest.fixture
+def db_file(tmp_path, monkeypatch):
+    """临时数据库文件（测试结束后恢复 database.DB_FILE 并关闭池中的连接）"""
+    path = tmp_path / 'tasks.db'
+    database.close_db_connection()
+    monkeypatch.setattr(database, 'DB_FILE', path)
+    database.init_database()
+    yield path
+    database.close_db_connection()
+
+
+@pytest.fixture
+def client(db_file):
+    """使用临时数据库的应用测试客户端"""
+    from app import create_app
+    app = create_app({'DB_FILE': db_file, 'TESTING': True})
+    return app.test_client()
@@ -0,0 +1,68 @@
+# tests/test_async_api.py - ASGI 应用：异步接口与同步接口返回相同的数据，其余路径交给 Flask
+import asyncio
+
+import pytest
+
+pytest.importorskip('starlette')
+pytest.importorskip('a2wsgi')
+pytest.importorskip('aiosqlite')
+httpx = pytest.importorskip('httpx')
+
+from async_api import create_asgi_app  # noqa: E402
+from database import create_tasks_bulk, get_all_tasks  # noqa: E402
+
+
+def run_with_client(db_file, requests):
+    """用 ASGI 应用执行 requests(client) 协程，返回其结果"""
+    app = create_asgi_app({'DB_FILE': db_file, 'TESTING': True})
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+                return await requests(client)
+        finally:
+            await app.state.runtime.close()
+
+    return asyncio.run(main())
+
+
+def test_async_routes_match_sync_routes(db_file):
+    create_tasks_bulk([{'text': f'任务 {i}', 'priority': ('urgent', 'high', 'normal')[i % 3], 'progress': i * 10}
+                       for i in range(11)])
+
+    async def requests(client):
+        pairs = {}
+        for name in ('stats', 'tasks?limit=4&priority=high'):
+            pairs[name] = [(await client.get(f'/api{prefix}/{name}')).json() for prefix in ('', '/async')]
+        return pairs
+
+    for sync_data, async_data in run_with_client(db_file, requests).values():
+        assert sync_data['success']
+        assert async_data == sync_data
+
+
+def test_async_progress_update(db_file):
+    create_tasks_bulk([{'text': '任务'}])
+    task_id = get_all_tasks()[0].id
+
+    async def requests(client):
+        return (await client.post(f'/api/async/task/{task_id}/progress', json={'progress': 100})).json()
+
+    data = run_with_client(db_file, requests)
+
+    assert data['success']
+    assert data['task']['completed']
+    assert data['stats']['completed_count'] == 1
+    assert get_all_tasks()[0].status == 'completed'
+
+
+def test_pages_are_served_by_flask(db_file):
+    async def requests(client):
+        return await client.get('/'), await client.get('/api/async/tasks', params={'cursor': '!'})
+
+    page, bad_cursor = run_with_client(db_file, requests)
+
+    assert page.status_code == 200
+    assert 'text/html' in page.headers['content-type']
+    assert bad_cursor.status_code == 400
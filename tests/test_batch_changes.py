@@ -0,0 +1,27 @@
+# tests/test_batch_changes.py - 批量修改接口的逐项校验
+from database import create_task, get_task
+
+
+def test_invalid_items_do_not_fail_the_batch(client):
+    good = create_task('正常任务')['task_id']
+    other = create_task('另一个任务')['task_id']
+
+    response = client.post('/api/tasks/batch', json={'changes': [
+        {'task_id': good, 'progress': 50},
+        {'task_id': other, 'progress': [1]},
+        {'task_id': other, 'text': {'zh': '对象'}},
+        {'task_id': other, 'note': ['备注'], 'progress': 10},
+        {'task_id': ['列表'], 'progress': 10},
+        {'task_id': other, 'category': '工作'},
+    ]})
+
+    assert response.status_code == 200
+    results = response.get_json()['results']
+    assert [r['success'] for r in results] == [True, False, False, False, False, True]
+    assert results[1]['error'] == 'Invalid value for progress'
+    assert results[2]['error'] == 'Invalid value for text'
+    assert results[4]['error'] == 'Invalid task_id'
+    assert get_task(good)['progress'] == 50
+    assert get_task(other)['progress'] == 0
+    assert get_task(other)['category'] == '工作'
+    assert get_task(other)['text'] == '另一个任务'
@@ -0,0 +1,30 @@
+# tests/test_changes_stream.py - 变更推送（SSE）的开关和连接数上限
+from app import create_app
+
+
+def test_stream_disabled_uses_polling(db_file):
+    client = create_app({'DB_FILE': db_file, 'CHANGES_STREAM': False}).test_client()
+
+    assert client.get('/api/changes/stream').status_code == 404
+    assert client.get('/api/changes?since=0').get_json()['success']
+    page = client.get('/').get_data(as_text=True)
+    assert 'data-change-version' in page
+    assert 'data-changes-stream' not in page
+
+
+def test_stream_limit(db_file):
+    client = create_app({'DB_FILE': db_file, 'CHANGES_STREAM': True, 'MAX_CHANGE_STREAMS': 1}).test_client()
+    assert 'data-changes-stream' in client.get('/').get_data(as_text=True)
+
+    first = client.get('/api/changes/stream', buffered=False)
+    assert first.status_code == 200
+    assert next(first.response) == b'retry: 3000\n\n'
+
+    rejected = client.get('/api/changes/stream', buffered=False)
+    assert rejected.status_code == 503
+
+    # 连接关闭后释放名额
+    first.close()
+    second = client.get('/api/changes/stream', buffered=False)
+    assert second.status_code == 200
+    second.close()
@@ -0,0 +1,73 @@
+# tests/test_connection_pool.py - 进程内连接池：每个请求一个线程时也复用连接
+import threading
+import urllib.request
+
+import pytest
+from werkzeug.serving import make_server
+
+import database
+from app import create_app
+
+
+@pytest.fixture
+def opened(monkeypatch):
+    """记录新建连接的次数"""
+    count = [0]
+    connect = database.get_db_connection
+
+    def counting_connect():
+        count[0] += 1
+        return connect()
+
+    monkeypatch.setattr(database, 'get_db_connection', counting_connect)
+    return count
+
+
+def test_threaded_server_reuses_connections(db_file, opened):
+    server = make_server('127.0.0.1', 0, create_app({'DB_FILE': db_file}), threaded=True)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True)
+    thread.start()
+    try:
+        for _ in range(20):
+            with urllib.request.urlopen(f'http://127.0.0.1:{server.server_port}/api/stats') as response:
+                assert response.status == 200
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert opened[0] <= 2
+
+
+def test_nested_checkout_shares_one_transaction(db_file, opened):
+    with pytest.raises(RuntimeError):
+        with database.db_connection() as outer:
+            with database.db_connection() as inner:
+                assert inner is outer
+                inner.execute("INSERT INTO tasks (id, text, created_at, updated_at) VALUES ('t1', '任务', '', '')")
+            raise RuntimeError
+
+    with database.db_connection() as conn:
+        assert conn.execute('SELECT COUNT(*) FROM tasks').fetchone()[0] == 0
+    assert opened[0] <= 1
+
+
+def test_connections_are_shared_across_threads(db_file, opened):
+    def query():
+        with database.db_connection() as conn:
+            conn.execute('SELECT 1').fetchone()
+
+    for _ in range(5):
+        thread = threading.Thread(target=query)
+        thread.start()
+        thread.join()
+
+    assert opened[0] <= 1
+
+
+def test_apps_in_one_process_must_share_db_file(db_file, tmp_path):
+    create_app({'DB_FILE': db_file})
+    create_app({'DB_FILE': db_file})
+
+    with pytest.raises(RuntimeError, match='DB_FILE'):
+        create_app({'DB_FILE': tmp_path / 'other.db'})
+    assert database.DB_FILE == db_file
@@ -0,0 +1,256 @@
+# tests/test_github_fetcher.py - GitHubFetcher / AsyncGitHubFetcher（本地 http.server 模拟 GitHub API）
+import asyncio
+import base64
+import json
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+import pytest
+
+from github_fetcher import AsyncGitHubFetcher, GitHubFetcher
+
+PREFIX = '/repos/owner/repo/contents/'
+
+
+class FakeGitHub:
+    """GitHub contents API：files 为 {路径: 内容}，支持 If-None-Match，记录每个请求"""
+
+    def __init__(self):
+        self.files = {}
+        self.delay = 0
+        self.status = None  # 设置后所有请求返回该状态码
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def etag(self, path):
+        return f'"{zlib.crc32(self.files[path].encode("utf-8")):x}"'
+
+
+@pytest.fixture
+def github():
+    fake = FakeGitHub()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # 保持连接，用来确认客户端复用连接
+
+        def do_GET(self):
+            with fake._lock:
+                fake.in_flight += 1
+                fake.max_in_flight = max(fake.max_in_flight, fake.in_flight)
+            try:
+                time.sleep(fake.delay)
+                self.handle_contents()
+            finally:
+                with fake._lock:
+                    fake.in_flight -= 1
+
+        def handle_contents(self):
+            path = unquote(urlsplit(self.path).path)[len(PREFIX):]
+            fake.requests.append({'path': path, 'client': self.client_address,
+                                  'if_none_match': self.headers.get('If-None-Match')})
+            if fake.status is not None:
+                return self.reply(fake.status, b'{}')
+            if path not in fake.files:
+                return self.reply(404, b'{"message": "Not Found"}')
+            etag = fake.etag(path)
+            if self.headers.get('If-None-Match') == etag:
+                return self.reply(304, b'', etag)
+            content = base64.b64encode(fake.files[path].encode('utf-8')).decode('ascii')
+            self.reply(200, json.dumps({'content': content}).encode(), etag)
+
+        def reply(self, status, body, etag=None):
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            if etag:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, args=(0.05,), daemon=True).start()
+    fake.url = f'http://127.0.0.1:{server.server_port}'
+    yield fake
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_fetcher(tmp_path):
+    def make(cls, url):
+        return cls('owner', 'repo', ref='main', api_url=url, cache_dir=tmp_path / 'cache', timeout=5)
+    return make
+
+
+def run_async(fetcher, coro_fn):
+    """在新的事件循环中执行协程并关闭客户端"""
+    async def main():
+        try:
+            return await coro_fn(fetcher)
+        finally:
+            await fetcher.aclose()
+    return asyncio.run(main())
+
+
+# ---------------------------------------------------------------------------
+# GitHubFetcher
+# ---------------------------------------------------------------------------
+
+def test_etag_304_uses_cache(github, make_fetcher):
+    github.files['工作待办清单.md'] = '- [ ] 任务'
+    fetcher = make_fetcher(GitHubFetcher, github.url)
+
+    assert fetcher.fetch('工作待办清单.md') == '- [ ] 任务'
+    assert fetcher.fetch('工作待办清单.md') == '- [ ] 任务'
+
+    first, second = github.requests
+    assert first['if_none_match'] is None
+    assert second['if_none_match'] == github.etag('工作待办清单.md')
+
+    # 磁盘缓存：新实例同样发送条件请求
+    fresh = make_fetcher(GitHubFetcher, github.url)
+    assert fresh.fetch('工作待办清单.md') == '- [ ] 任务'
+    assert github.requests[-1]['if_none_match'] == github.etag('工作待办清单.md')
+
+
+def test_changed_file_is_refetched(github, make_fetcher):
+    github.files['a.md'] = '旧内容'
+    fetcher = make_fetcher(GitHubFetcher, github.url)
+    assert fetcher.fetch('a.md') == '旧内容'
+
+    github.files['a.md'] = '新内容'
+    assert fetcher.fetch('a.md') == '新内容'
+
+
+def test_shared_session_reuses_connection(github, make_fetcher):
+    github.files['a.md'] = 'A'
+    fetcher = make_fetcher(GitHubFetcher, github.url)
+
+    for _ in range(5):
+        assert fetcher.fetch('a.md') == 'A'
+
+    assert len({r['client'] for r in github.requests}) == 1
+
+
+def test_fetch_first_probes_concurrently(github, make_fetcher):
+    github.files['second.md'] = '第二个'
+    github.files['third.md'] = '第三个'
+    github.delay = 0.3
+    fetcher = make_fetcher(GitHubFetcher, github.url)
+
+    started = time.perf_counter()
+    assert fetcher.fetch_first(['first.md', 'second.md', 'third.md']) == ('second.md', '第二个')
+    elapsed = time.perf_counter() - started
+
+    assert github.max_in_flight >= 2
+    assert elapsed < 0.3 * 2
+    assert fetcher.fetch_first(['missing.md']) == (None, None)
+
+
+def test_server_error_falls_back_to_cache(github, make_fetcher):
+    github.files['a.md'] = '缓存内容'
+    fetcher = make_fetcher(GitHubFetcher, github.url)
+    assert fetcher.fetch('a.md') == '缓存内容'
+
+    github.status = 500
+    assert fetcher.fetch('a.md') == '缓存内容'
+    assert fetcher.fetch('b.md') is None
+
+
+def test_unreachable_server_falls_back_to_cache(github, make_fetcher):
+    github.files['a.md'] = '缓存内容'
+    assert make_fetcher(GitHubFetcher, github.url).fetch('a.md') == '缓存内容'
+
+    # 新实例（只有磁盘缓存），API 地址无法连接
+    offline = make_fetcher(GitHubFetcher, 'http://127.0.0.1:1')
+    assert offline.fetch('a.md') == '缓存内容'
+    assert offline.fetch('b.md') is None
+
+
+def test_not_found_drops_cache(github, make_fetcher):
+    github.files['a.md'] = '内容'
+    fetcher = make_fetcher(GitHubFetcher, github.url)
+    assert fetcher.fetch('a.md') == '内容'
+
+    del github.files['a.md']
+    assert fetcher.fetch('a.md') is None
+    assert github.requests[-1]['if_none_match'] is not None
+    fetcher.fetch('a.md')
+    assert github.requests[-1]['if_none_match'] is None
+
+
+# ---------------------------------------------------------------------------
+# AsyncGitHubFetcher（需要 httpx）
+# ---------------------------------------------------------------------------
+
+def test_async_etag_304_uses_cache(github, make_fetcher):
+    pytest.importorskip('httpx')
+    github.files['a.md'] = '异步内容'
+
+    async def fetch_twice(fetcher):
+        return [await fetcher.fetch('a.md'), await fetcher.fetch('a.md')]
+
+    assert run_async(make_fetcher(AsyncGitHubFetcher, github.url), fetch_twice) == ['异步内容'] * 2
+    assert github.requests[1]['if_none_match'] == github.etag('a.md')
+
+
+def test_async_shares_cache_with_sync(github, make_fetcher):
+    pytest.importorskip('httpx')
+    github.files['a.md'] = '共享缓存'
+    assert make_fetcher(GitHubFetcher, github.url).fetch('a.md') == '共享缓存'
+
+    async def fetch(fetcher):
+        return await fetcher.fetch('a.md')
+
+    assert run_async(make_fetcher(AsyncGitHubFetcher, github.url), fetch) == '共享缓存'
+    assert github.requests[-1]['if_none_match'] == github.etag('a.md')
+
+
+def test_async_client_reuses_connection(github, make_fetcher):
+    pytest.importorskip('httpx')
+    github.files['a.md'] = 'A'
+
+    async def fetch_many(fetcher):
+        return [await fetcher.fetch('a.md') for _ in range(5)]
+
+    assert run_async(make_fetcher(AsyncGitHubFetcher, github.url), fetch_many) == ['A'] * 5
+    assert len({r['client'] for r in github.requests}) == 1
+
+
+def test_async_fetch_first_probes_concurrently(github, make_fetcher):
+    pytest.importorskip('httpx')
+    github.files['second.md'] = '第二个'
+    github.delay = 0.3
+
+    async def probe(fetcher):
+        started = time.perf_counter()
+        result = await fetcher.fetch_first(['first.md', 'second.md', 'third.md'])
+        return result, time.perf_counter() - started
+
+    result, elapsed = run_async(make_fetcher(AsyncGitHubFetcher, github.url), probe)
+    assert result == ('second.md', '第二个')
+    assert github.max_in_flight >= 2
+    assert elapsed < 0.3 * 2
+
+
+def test_async_errors_fall_back_to_cache(github, make_fetcher):
+    pytest.importorskip('httpx')
+    github.files['a.md'] = '缓存内容'
+    assert make_fetcher(GitHubFetcher, github.url).fetch('a.md') == '缓存内容'
+
+    async def fetch_both(fetcher):
+        return await fetcher.fetch('a.md'), await fetcher.fetch('b.md')
+
+    github.status = 500
+    assert run_async(make_fetcher(AsyncGitHubFetcher, github.url), fetch_both) == ('缓存内容', None)
+    offline = make_fetcher(AsyncGitHubFetcher, 'http://127.0.0.1:1')
+    assert run_async(offline, fetch_both) == ('缓存内容', None)
@@ -0,0 +1,28 @@
+# tests/test_history_maintenance.py - 更新历史的合并与归档
+import database
+from database import PROGRESS_NOTE, create_task, run_history_maintenance
+
+
+def test_slider_updates_are_coalesced(client):
+    task_id = create_task('拖动滑块的任务')['task_id']
+    # 与 static/app.js 拖动进度滑块时发送的请求相同
+    for progress in range(5, 105, 5):
+        response = client.post(f'/api/task/{task_id}/progress',
+                               json={'progress': progress, 'user': 'User', 'note': PROGRESS_NOTE})
+        assert response.get_json()['success']
+
+    metrics = run_history_maintenance()
+
+    assert metrics['coalesced'] == 19
+    updates = database.get_task_updates(task_id, limit=50)
+    slider_updates = [u for u in updates if u['note'] == PROGRESS_NOTE]
+    assert [u['progress'] for u in slider_updates] == [100]
+
+
+def test_manual_notes_are_kept(client):
+    task_id = create_task('带备注的任务')['task_id']
+    for progress in (10, 20, 30):
+        client.post(f'/api/task/{task_id}/progress',
+                    json={'progress': progress, 'user': 'User', 'note': f'完成了 {progress}%'})
+
+    assert run_history_maintenance()['coalesced'] == 0
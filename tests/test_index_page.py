@@ -0,0 +1,68 @@
+# tests/test_index_page.py - 首页每个分组只渲染第一页，其余由 /api/tasks 按游标加载
+import base64
+import json
+import re
+
+from database import create_tasks_bulk
+
+
+def rendered_ids(html, css_class):
+    return re.findall(rf'class="task-item {css_class}"[^>]*>\s*<input[^>]*data-task="([0-9a-f]+)"', html)
+
+
+def load_rest(client, params, cursor):
+    """按页面的方式用游标加载分组剩余的任务"""
+    ids = []
+    while cursor:
+        data = client.get('/api/tasks', query_string=dict(params, limit=50, cursor=cursor)).get_json()
+        assert data['success']
+        ids += [task['id'] for task in data['tasks']]
+        cursor = data['next_cursor']
+    return ids
+
+
+def test_index_renders_first_page_of_each_group(client):
+    create_tasks_bulk([{'text': f'已完成 {i}', 'progress': 100} for i in range(25)]
+                      + [{'text': f'普通 {i}', 'progress': 30} for i in range(12)]
+                      + [{'text': f'高优先级 {i}', 'priority': 'high'} for i in range(60)])
+
+    html = client.get('/').get_data(as_text=True)
+
+    assert len(rendered_ids(html, 'completed')) == 10
+    assert len(rendered_ids(html, 'normal')) == 5
+    assert len(rendered_ids(html, 'high')) == 10
+    assert 'id="completed-more-count">15<' in html
+    assert 'data-stat="completed_count">25<' in html
+    assert 'data-stat="high_count">60<' in html
+    assert 'data-stat="normal_count">12<' in html
+
+    # 每个分组用页面上的游标加载剩余任务，不重复也不遗漏
+    for css_class, params, total in [('high', {'priority': 'high', 'completed': 0}, 60),
+                                     ('normal', {'priority': 'normal', 'completed': 0}, 12),
+                                     ('completed', {'completed': 1}, 25)]:
+        first = rendered_ids(html, css_class)
+        if css_class == 'completed':
+            cursor = re.search(r'id="completed-more"[^>]*data-next-cursor="([^"]+)"', html).group(1)
+        else:
+            cursor = re.search(rf"data-next-cursor=\"([^\"]+)\" onclick=\"showMore\('{css_class}'", html).group(1)
+        rest = load_rest(client, params, cursor)
+        assert len(set(first + rest)) == len(first + rest) == total
+
+
+def test_filters_are_applied_by_the_api(client):
+    create_tasks_bulk([{'text': f'任务 {i}', 'assignee': 'alice' if i % 2 else 'bob', 'progress': i * 10}
+                       for i in range(11)])
+
+    data = client.get('/api/tasks', query_string={'assignee': 'alice', 'status': 'in_progress'}).get_json()
+
+    assert {task['assignee'] for task in data['tasks']} == {'alice'}
+    assert len(data['tasks']) == 5
+
+
+def test_cursor_values_must_be_scalars(client):
+    cursor = base64.urlsafe_b64encode(json.dumps([{'a': 1}, 'x', 'y']).encode()).decode().rstrip('=')
+
+    response = client.get('/api/tasks', query_string={'cursor': cursor})
+
+    assert response.status_code == 400
+    assert not response.get_json()['success']
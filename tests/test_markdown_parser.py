@@ -0,0 +1,107 @@
+# tests/test_markdown_parser.py - 推荐改变清单解析：与原来的正则实现结果一致
+import random
+import re
+
+import pytest
+
+from markdown_parser import iter_recommendations, parse_recommendations
+
+
+def reference_parse_recommendations(content):
+    """原 app.parse_recommendations 的实现（每节切片后再搜索），作为对照"""
+    recommendations = []
+    pattern = r'#### \[(\d{4}-\d{2}-\d{2})\] 推荐改变 #(\d+)'
+    matches = re.finditer(pattern, content)
+
+    for match in matches:
+        date = match.group(1)
+        num = match.group(2)
+        start = match.end()
+        next_match = re.search(r'#### \[', content[start:])
+        end = start + next_match.start() if next_match else len(content)
+        section = content[start:end]
+
+        content_match = re.search(r'##### 改变内容\n(.+?)(?=#####|$)', section, re.DOTALL)
+        reason_match = re.search(r'##### 推荐理由\n(.+?)(?=#####|$)', section, re.DOTALL)
+
+        if content_match:
+            recommendations.append({
+                'date': date,
+                'num': num,
+                'content': content_match.group(1).strip(),
+                'reason': reason_match.group(1).strip() if reason_match else ''
+            })
+
+    return recommendations
+
+
+FIXED_CASES = [
+    '',
+    '# 推荐改变清单\n\n没有推荐',
+    '#### [2024-01-02] 推荐改变 #1\n##### 改变内容\n每天整理桌面\n##### 推荐理由\n减少查找时间\n',
+    # 没有推荐理由
+    '#### [2024-01-02] 推荐改变 #1\n##### 改变内容\n只有内容',
+    # 没有改变内容的节被跳过
+    '#### [2024-01-02] 推荐改变 #1\n##### 推荐理由\n只有理由\n#### [2024-01-03] 推荐改变 #2\n##### 改变内容\nB\n',
+    # 推荐理由在改变内容之前
+    '#### [2024-01-02] 推荐改变 #7\n##### 推荐理由\n理由\n##### 改变内容\n内容\n\n',
+    # 不是推荐的 "#### [" 节截断上一节
+    '#### [2024-01-02] 推荐改变 #1\n##### 改变内容\nA\n#### [备注] 其他\n##### 推荐理由\n不属于 #1\n',
+    # 多行正文、Windows 换行、正文中出现 ####
+    '#### [2024-01-02] 推荐改变 #1\r\n##### 改变内容\n第一行\n第二行 #### 标记\n\n##### 推荐理由\n  前后空白  \n',
+    # 标题格式不完整
+    '#### [2024-1-2] 推荐改变 #1\n##### 改变内容\nA\n#### [2024-01-02] 推荐改变 #\n##### 改变内容\nB\n',
+    # 紧挨着的标题、文件末尾的空节
+    '#### [2024-01-02] 推荐改变 #1#### [2024-01-03] 推荐改变 #2\n##### 改变内容\nC\n#### [2024-01-04] 推荐改变 #3',
+    # 改变内容为空时跨到下一个 #####
+    '#### [2024-01-02] 推荐改变 #1\n##### 改变内容\n##### 推荐理由\nR\n',
+]
+
+
+@pytest.mark.parametrize('content', FIXED_CASES)
+def test_fixed_cases_match_reference(content):
+    assert parse_recommendations(content) == reference_parse_recommendations(content)
+
+
+# 随机文档的组成片段：标题、小节标题、正文和各种边界写法
+FRAGMENTS = [
+    '#### [{date}] 推荐改变 #{num}\n',
+    '#### [{date}] 推荐改变 #{num}',
+    '#### [笔记] 不是推荐\n',
+    '#### [',
+    '##### 改变内容\n',
+    '##### 推荐理由\n',
+    '##### 其他\n',
+    '#####',
+    '正文内容\n',
+    '多行\n正文\n',
+    '  \n',
+    '\n',
+    '\r\n',
+    '#',
+    '- [ ] 任务\n',
+]
+
+
+def random_document(rng):
+    parts = []
+    for _ in range(rng.randint(0, 30)):
+        fragment = rng.choice(FRAGMENTS)
+        parts.append(fragment.format(date=f'2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+                                     num=rng.randint(1, 999)))
+    return ''.join(parts)
+
+
+@pytest.mark.parametrize('seed', range(20))
+def test_generated_documents_match_reference(seed):
+    rng = random.Random(seed)
+    for _ in range(500):
+        content = random_document(rng)
+        assert parse_recommendations(content) == reference_parse_recommendations(content), content
+
+
+def test_iter_recommendations_is_lazy():
+    content = ''.join(f'#### [2024-01-02] 推荐改变 #{i}\n##### 改变内容\n内容 {i}\n' for i in range(3))
+    items = iter_recommendations(content)
+    assert next(items)['num'] == '0'
+    assert [item['num'] for item in items] == ['1', '2']
@@ -0,0 +1,22 @@
+# tests/test_migrations.py - 结构迁移
+import database
+from database import MIGRATIONS, create_tasks_bulk, get_task_stats, migrate_database
+
+
+def test_task_stats_recount_runs_in_one_step(db_file):
+    steps = dict((version, steps) for version, _, steps in MIGRATIONS)[4]
+    # 清空和重新计数是同一个步骤（同一个事务）
+    assert steps[-1] is database._recount_task_stats
+
+
+def test_task_stats_recount_after_migration(db_file):
+    create_tasks_bulk([{'text': f'任务 {i}', 'priority': 'urgent' if i % 2 else 'normal', 'assignee': 'a'}
+                       for i in range(10)])
+    expected = get_task_stats()
+
+    # 计数表被破坏后重新执行迁移 4，结果与原来的计数一致
+    with database.db_connection() as conn:
+        conn.execute('UPDATE task_stats SET count = count + 100')
+        conn.execute('PRAGMA user_version = 3')
+    assert 4 in migrate_database()
+    assert get_task_stats() == expected
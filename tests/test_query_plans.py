@@ -0,0 +1,30 @@
+# tests/test_query_plans.py - 热点查询的执行计划回归检查
+import pytest
+
+import database
+from database import check_query_plans, create_tasks_bulk
+
+
+@pytest.fixture
+def seeded(db_file):
+    create_tasks_bulk([{'text': f'任务 {i}', 'priority': ('urgent', 'high', 'normal')[i % 3],
+                        'assignee': f'user{i % 7}', 'progress': (i * 13) % 101}
+                       for i in range(2000)])
+    with database.db_connection() as conn:
+        conn.execute('ANALYZE')
+    return db_file
+
+
+def test_hot_queries_use_indexes(seeded):
+    assert check_query_plans() == []
+
+
+def test_filtered_scan_through_index_is_reported(seeded, monkeypatch):
+    # 没有 category 索引：规划器按优先级索引顺序逐行筛选，应当报告
+    query = 'SELECT * FROM tasks WHERE category = ? ORDER BY priority DESC, created_at DESC, id DESC'
+    monkeypatch.setattr(database, 'HOT_QUERIES', [('by category', query, ['工作'])])
+
+    problems = check_query_plans()
+
+    assert len(problems) == 1
+    assert problems[0].startswith('by category: SCAN tasks USING INDEX')
@@ -0,0 +1,146 @@
+# tests/test_snapshot.py - 数据库快照：条件写入和防抖保存
+import time
+
+import pytest
+
+import database
+from database import create_task, get_all_tasks
+from storage import LocalDirectorySink, SnapshotStore
+
+
+class CountingSink(LocalDirectorySink):
+    """记录写入次数的本地目录存储"""
+
+    def __init__(self, directory):
+        super().__init__(directory)
+        self.writes = 0
+
+    def write(self, name, data, expected_version):
+        version = super().write(name, data, expected_version)
+        self.writes += 1
+        return version
+
+
+@pytest.fixture
+def sink(tmp_path, monkeypatch):
+    sink = CountingSink(tmp_path / 'store')
+    monkeypatch.setattr(database, '_snapshot_store', SnapshotStore(sink))
+    monkeypatch.setattr(database, '_snapshot_version', None)
+    monkeypatch.setattr(database, '_snapshot_saved_at', float('-inf'))
+    yield sink
+    database.flush_snapshot()
+    database.close_db_connection()
+
+
+def open_instance(path, monkeypatch):
+    """切换到另一个数据库文件（模拟另一个实例冷启动）"""
+    database.close_db_connection()
+    monkeypatch.setattr(database, 'DB_FILE', path)
+    database.init_database()
+
+
+def task_texts():
+    return sorted(task.text for task in get_all_tasks())
+
+
+def test_conflicting_snapshot_is_not_overwritten(tmp_path, sink, monkeypatch):
+    open_instance(tmp_path / 'a.db', monkeypatch)
+    create_task('实例 A 的任务')
+    assert database.save_snapshot()['version'] is not None
+
+    # 实例 B 从 A 的快照恢复，写入并保存
+    open_instance(tmp_path / 'b.db', monkeypatch)
+    assert task_texts() == ['实例 A 的任务']
+    create_task('实例 B 的任务')
+    assert database.save_snapshot() is not None
+
+    # 实例 A 基于旧快照的修改不能覆盖 B 的快照，A 改为恢复 B 的快照
+    open_instance(tmp_path / 'a.db', monkeypatch)
+    create_task('实例 A 的第二个任务')
+    assert database.save_snapshot() is None
+    assert not database._read_snapshot_state()['conflict']
+    assert sink.writes == 2
+    assert task_texts() == ['实例 A 的任务', '实例 B 的任务']
+
+    # 之后的修改基于 B 的快照，可以正常保存
+    create_task('实例 A 的第三个任务')
+    assert database.save_snapshot() is not None
+
+    open_instance(tmp_path / 'c.db', monkeypatch)
+    assert task_texts() == ['实例 A 的任务', '实例 A 的第三个任务', '实例 B 的任务']
+
+
+def test_writes_are_rejected_until_conflict_is_resolved(tmp_path, sink, monkeypatch):
+    from app import create_app
+    open_instance(tmp_path / 'a.db', monkeypatch)
+    create_task('实例 A 的任务')
+    database.save_snapshot()
+    open_instance(tmp_path / 'b.db', monkeypatch)
+    create_task('实例 B 的任务')
+    database.save_snapshot()
+
+    open_instance(tmp_path / 'a.db', monkeypatch)
+    client = create_app({'DB_FILE': tmp_path / 'a.db', 'SNAPSHOT_INTERVAL': 0}).test_client()
+    restore_into = database._snapshot_store.restore_into
+
+    def unavailable(conn):
+        raise OSError('storage unavailable')
+
+    monkeypatch.setattr(database._snapshot_store, 'restore_into', unavailable)
+    with client.post('/api/task/create', json={'text': '冲突前的任务'}) as response:
+        assert response.get_json()['success']
+    assert database._read_snapshot_state()['conflict']
+
+    response = client.post('/api/task/create', json={'text': '冲突后的任务'})
+    assert response.status_code == 409
+    assert not response.get_json()['success']
+
+    # 存储恢复可用后，下一个写请求先恢复最新快照再执行
+    monkeypatch.setattr(database._snapshot_store, 'restore_into', restore_into)
+    with client.post('/api/task/create', json={'text': '恢复后的任务'}) as response:
+        assert response.get_json()['success']
+    assert task_texts() == ['实例 A 的任务', '实例 B 的任务', '恢复后的任务']
+    assert sink.writes == 3
+
+
+def test_serverless_uploads_every_write(tmp_path, sink, monkeypatch):
+    from app import create_app, ServerlessConfig
+    assert ServerlessConfig.SNAPSHOT_INTERVAL == 0
+    open_instance(tmp_path / 'a.db', monkeypatch)
+    client = create_app({'DB_FILE': tmp_path / 'a.db', 'SNAPSHOT_INTERVAL': 0}).test_client()
+
+    for i in range(3):
+        with client.post('/api/task/create', json={'text': f'任务 {i}'}) as response:
+            assert response.get_json()['success']
+        assert sink.writes == i + 1
+    assert database._snapshot_timer is None
+
+
+def test_unchanged_database_is_not_uploaded(tmp_path, sink, monkeypatch):
+    open_instance(tmp_path / 'a.db', monkeypatch)
+    create_task('任务')
+    database.save_snapshot()
+
+    # 重新打开同一个数据库文件（如 worker 重启）时沿用已记录的快照版本
+    monkeypatch.setattr(database, '_schema_ready_for', None)
+    open_instance(tmp_path / 'a.db', monkeypatch)
+    assert database.save_snapshot() is None
+    assert sink.writes == 1
+
+
+def test_uploads_are_debounced_after_the_response(tmp_path, sink, monkeypatch):
+    open_instance(tmp_path / 'a.db', monkeypatch)
+    from app import create_app
+    client = create_app({'DB_FILE': tmp_path / 'a.db', 'SNAPSHOT_INTERVAL': 0.3}).test_client()
+
+    for i in range(5):
+        with client.post('/api/task/create', json={'text': f'任务 {i}'}) as response:
+            assert response.get_json()['success']
+
+    # 第一次写入立即上传，其余在间隔到达后合并为一次
+    assert sink.writes == 1
+    time.sleep(0.6)
+    assert sink.writes == 2
+
+    open_instance(tmp_path / 'b.db', monkeypatch)
+    assert len(get_all_tasks()) == 5
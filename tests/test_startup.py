@@ -0,0 +1,19 @@
+# tests/test_startup.py - 冷启动回归检查（阈值较宽，只拦截明显的退化，如导入阶段做 DDL 或网络请求）
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+MAX_IMPORT_MS = 3000
+MAX_FIRST_RESPONSE_MS = 10000
+
+
+def test_cold_start_within_budget():
+    result = subprocess.run(
+        [sys.executable, 'benchmark_startup.py', '--runs', '1', '--max-import-ms', str(MAX_IMPORT_MS),
+         '--max-first-response-ms', str(MAX_FIRST_RESPONSE_MS)],
+        cwd=ROOT, capture_output=True, text=True, timeout=120)
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert '(status 200,' in result.stdout
@@ -0,0 +1,82 @@
+# tests/test_sync_markdown.py - Markdown 清单增量同步
+import database
+from database import sync_markdown_tasks
+from markdown_parser import parse_markdown_tasks
+
+SOURCE = 'github:owner/repo@main:工作待办清单.md'
+
+
+def task_list(count, start=0):
+    lines = ['# 工作待办清单', '', '## 日常工作']
+    lines += [f'- [ ] 同步任务 {i}' for i in range(start, start + count)]
+    return '\n'.join(lines)
+
+
+def task_count():
+    with database.db_connection() as conn:
+        return conn.execute('SELECT COUNT(*) FROM tasks').fetchone()[0]
+
+
+def test_removed_tasks_are_deleted(db_file):
+    sync_markdown_tasks(SOURCE, task_list(3), parse_markdown_tasks)
+    result = sync_markdown_tasks(SOURCE, task_list(2), parse_markdown_tasks)
+
+    assert result['removed'] == 1
+    assert result['removal_skipped'] == 0
+    assert task_count() == 2
+
+
+def test_empty_list_does_not_delete(db_file):
+    sync_markdown_tasks(SOURCE, task_list(3), parse_markdown_tasks)
+    result = sync_markdown_tasks(SOURCE, 'oops', parse_markdown_tasks)
+
+    assert result['removed'] == 0
+    assert result['removal_skipped'] == 3
+    assert task_count() == 3
+
+
+def test_mass_removal_is_skipped(db_file):
+    sync_markdown_tasks(SOURCE, task_list(20), parse_markdown_tasks)
+    result = sync_markdown_tasks(SOURCE, task_list(5), parse_markdown_tasks)
+
+    assert result['removal_skipped'] == 15
+    assert task_count() == 20
+
+    # 清单恢复后不会重复导入被保留的任务
+    result = sync_markdown_tasks(SOURCE, task_list(20), parse_markdown_tasks)
+    assert result['added'] == 0
+    assert task_count() == 20
+
+
+def test_skipped_removal_is_rechecked_and_can_be_confirmed(db_file):
+    sync_markdown_tasks(SOURCE, task_list(20), parse_markdown_tasks)
+    sync_markdown_tasks(SOURCE, task_list(5), parse_markdown_tasks)
+
+    # 跳过删除时不记录游标：同样的内容再次同步时仍然检查，而不是当作未变化
+    result = sync_markdown_tasks(SOURCE, task_list(5), parse_markdown_tasks)
+    assert not result['unchanged']
+    assert result['removal_skipped'] == 15
+
+    result = sync_markdown_tasks(SOURCE, task_list(5), parse_markdown_tasks, allow_mass_removal=True)
+    assert result['removed'] == 15
+    assert result['removal_skipped'] == 0
+    assert task_count() == 5
+    assert sync_markdown_tasks(SOURCE, task_list(5), parse_markdown_tasks)['unchanged']
+
+
+def test_sync_route_confirms_mass_removal(db_file, monkeypatch):
+    from app import create_app
+
+    app = create_app({'DB_FILE': db_file, 'TESTING': True, 'GITHUB_SYNC': True})
+    content = [task_list(20)]
+    monkeypatch.setattr(app.extensions['todo']['github_fetcher'], 'fetch_first',
+                        lambda paths: (paths[0], content[0]))
+    client = app.test_client()
+    assert client.post('/api/sync').get_json() == {'success': True, 'changed': True}
+
+    content[0] = task_list(5)
+    assert client.post('/api/sync').get_json()['changed'] is False
+    assert task_count() == 20
+
+    assert client.post('/api/sync', query_string={'allow_mass_removal': 1}).get_json()['changed'] is True
+    assert task_count() == 5
@@ -0,0 +1,12 @@
+# tests/test_task_records.py - Task 记录的 JSON 转换
+from database import TASK_FIELDS, create_tasks_bulk, get_all_tasks, tasks_to_dicts
+
+
+def test_tasks_to_dicts_matches_to_dict(db_file):
+    create_tasks_bulk([{'text': f'任务 {i}', 'assignee': 'alice', 'notes': '备注', 'progress': i * 50}
+                       for i in range(3)])
+    tasks = get_all_tasks()
+
+    assert tasks_to_dicts(tasks) == [task.to_dict() for task in tasks]
+    assert list(tasks_to_dicts(tasks)[0]) == list(TASK_FIELDS) + ['completed']
+    assert [data['completed'] for data in tasks_to_dicts(tasks)] == [task.completed for task in tasks]